@@ -5,6 +5,17 @@ from pydantic import BaseSettings, AnyUrl, validator, PostgresDsn, AnyHttpUrl
 
 class AppConfig(BaseSettings):
     PROJECT_NAME: str = "LeisureBites Backend"
+    ENVIRONMENT: str = "development"  # or "production"
+
+    # production server (app.server)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: Optional[int] = None  # 2 x CPUs + 1 by default
+    SERVER_MAX_REQUESTS: int = 10000  # a worker is replaced after serving this many requests
+    SERVER_MAX_REQUESTS_JITTER: int = 1000
+    SERVER_GRACEFUL_TIMEOUT: int = 30  # seconds in-flight requests get to finish on shutdown
+    SERVER_TIMEOUT: int = 60
+    SERVER_KEEPALIVE: int = 5
     API_V1_PREFIX: str = "/api/v1"
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
     SECRET_KEY: str
@@ -18,6 +29,9 @@ class AppConfig(BaseSettings):
     SQLALCHEMY_DATABASE_URI: Optional[AnyUrl] = None
     SQLALCHEMY_READ_DATABASE_URI: Optional[AnyUrl] = None
     SQLALCHEMY_ECHO: bool = False
+    SLOW_QUERY_THRESHOLD_MS: int = 200
+    # same statement executed this many times in a request is logged as a likely N+1
+    N_PLUS_ONE_THRESHOLD: int = 5
 
     @validator("SQLALCHEMY_DATABASE_URI", pre=True)
     @classmethod
@@ -51,10 +65,37 @@ class AppConfig(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
 
+    READINESS_CACHE_SECONDS: float = 2
+    READINESS_TIMEOUT_SECONDS: float = 2
+    READINESS_MAX_POOL_USAGE: float = 0.9  # share of pool_size + max_overflow checked out
+
+    # concurrent requests per worker and route class (app.utility.admission), then queued requests
+    ADMISSION_LIMITS: Dict[str, int] = {"booking": 15, "auth": 10, "catalog": 25}
+    ADMISSION_MAX_QUEUE: Dict[str, int] = {"booking": 30, "auth": 10, "catalog": 20}
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 2
+    ADMISSION_SHED_POOL_USAGE: float = 0.8  # primary pool usage from which only bookings are admitted
+    ADMISSION_RETRY_AFTER_SECONDS: int = 2
+
+    POPULARITY_HALF_LIFE_DAYS: int = 14
+    POPULARITY_WINDOW_DAYS: int = 120
+
+    GEO_INDEX_REFRESH_SECONDS: int = 300
+    AUTOCOMPLETE_REFRESH_SECONDS: int = 900
+    AUTOCOMPLETE_POLL_SECONDS: float = 1.0
+
+    ARTIST_DIRECTORY_CACHE_SECONDS: int = 600
+    ARTIST_CALENDAR_CACHE_SECONDS: int = 3600
+    CALENDAR_TIMEZONE: str = "Asia/Kolkata"
+
     AWS_ACCESS_KEY_ID: str
     AWS_SECRET_ACCESS_KEY: str
 
     MINIMUM_SIZE_FOR_COMPRESSION: int = 1000
+    COMPRESSION_LEVELS: Dict[str, int] = {"br": 5, "zstd": 3, "gzip": 6}
+    # per request path, e.g. {"/api/v1/categories": {"br": 11}}
+    COMPRESSION_ROUTE_LEVELS: Dict[str, Dict[str, int]] = {}
+    COMPRESSION_CACHE_MAX_BYTES: int = 67108864
+    HTTP_CACHE_MAX_AGE_SECONDS: int = 60
 
     CLOUD_STORAGE_PROVIDER: str = "aws"
 
@@ -76,6 +117,30 @@ class AppConfig(BaseSettings):
     def set_s3_bucket_url(cls, v: Optional[str], values: dict) -> Any:
         return f"{values['S3_URI_BASE']}/{values['S3_BUCKET_NAME']}"
 
+    LOG_FORMAT: str = "json"  # or "text"
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: Dict[str, str] = {}  # per module, e.g. {"app.utility.router": "WARNING"}
+    LOG_FILE_PATH: Optional[str] = None
+    # rotation of LOG_FILE_PATH, left to logrotate or the log shipper under app.server with several workers
+    LOG_FILE_MAX_BYTES: int = 10000000
+    LOG_FILE_BACKUP_COUNT: int = 5
+
+    # share of requests whose bodies are logged, per route path (e.g. "/api/v1/experience") or default
+    REQUEST_LOG_SAMPLE_RATE: float = 0.1
+    REQUEST_LOG_ROUTE_SAMPLE_RATES: Dict[str, float] = {}
+    REQUEST_LOG_MAX_BODY_BYTES: int = 2048
+
+    TRACE_EXPORTER: Optional[str] = None  # "file" or "otlp", requests are not traced without one
+    TRACE_SAMPLE_RATE: float = 0.01
+    TRACE_SLOW_REQUEST_MS: int = 1000  # traces of slower requests are always exported
+    TRACE_FILE_PATH: str = "traces/traces.jsonl"
+    TRACE_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+
+    PROFILE_DIR: str = "profiles"
+    PROFILE_SAMPLE_RATE: float = 0.0  # share of requests profiled continuously, off by default
+    PROFILE_MAX_PER_MINUTE: int = 2  # per worker, for sampled requests only
+    PROFILE_MAX_FILES: int = 500
+
     class Config:
         case_sensitive = True
         env_file = ".env"
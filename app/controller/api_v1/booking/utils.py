@@ -7,6 +7,10 @@ from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.controller.api_v1.booking.schema import Venue, CheckoutDetails
+from app.controller.api_v1.experience.documents import refresh_experience_document_slots
+from app.controller.api_v1.experience.popularity import record_experience_booking
+from app.controller.api_v1.supplier.utils import invalidate_artist_calendar
+from app.dependencies.tracing import start_span
 from app.models.artist_slot import ArtistSlot
 from app.models.booking import Booking, BookingType, BookingStatus
 from app.models.customer import Customer
@@ -97,12 +101,12 @@ def get_promo_discount(
 
             if promo.promo_code_type == PromoCodeType.discount_flat:
                 promo_code_id = promo.id
-                promo_discount = min(promo.flat_discount_amount, promo.max_discount_amount)
+                promo_discount = float(min(promo.flat_discount_amount, promo.max_discount_amount))
             elif promo.promo_code_type == PromoCodeType.discount_percent:
                 promo_code_id = promo.id
                 promo_discount = min(
-                    round(promo.discount_percent * total_order_amount / 100, 2),
-                    promo.max_discount_amount
+                    round(float(promo.discount_percent) * total_order_amount / 100, 2),
+                    float(promo.max_discount_amount)
                 )
         else:
             promo_error_message = "Invalid promo code"
@@ -295,6 +299,8 @@ def handle_booking_confirmation(
     booking: Booking,
     db: Session,
 ) -> None:
+    popularity_entry = None
+    booked_artist_slot = None
     if booking.booking_type == BookingType.experience:
         experience_slot: ExperienceSlot = db.query(ExperienceSlot).filter(
             ExperienceSlot.id == booking.experience_slot_id,
@@ -309,6 +315,13 @@ def handle_booking_confirmation(
             )
 
         experience_slot.remaining_guest_limit -= booking.no_of_guests
+        refresh_experience_document_slots(experience_slot.experience_id, db)
+        experience: Experience = experience_slot.experience
+        popularity_entry = {
+            "experience_id": experience.id,
+            "category_id": experience.category_id,
+            "venue_city": experience.venue_city,
+        }
     elif booking.booking_type == BookingType.artist:
         artist_slot: ArtistSlot = db.query(ArtistSlot).filter(
             ArtistSlot.id == booking.artist_slot_id,
@@ -322,6 +335,7 @@ def handle_booking_confirmation(
                 detail="No slot is available for booking"
             )
         artist_slot.is_booked = True
+        booked_artist_slot = (artist_slot.artist_id, artist_slot.start_time)
 
     payment = db.query(Payment).filter(
         Payment.booking_id == booking.id,
@@ -339,10 +353,17 @@ def handle_booking_confirmation(
             detail="Payment verification failed"
         )
 
+    confirmation_time = datetime.now(tz=pytz.UTC)
     payment.status = PaymentStatus.success
     booking.status = BookingStatus.confirmed
-    booking.confirmation_time = datetime.now(tz=pytz.UTC)
-    db.commit()
+    booking.confirmation_time = confirmation_time
+    with start_span("db commit"):
+        db.commit()
+
+    if popularity_entry:
+        record_experience_booking(**popularity_entry, confirmation_time=confirmation_time)
+    if booked_artist_slot:
+        invalidate_artist_calendar(*booked_artist_slot)
 
 
 def send_booking_approval_email(
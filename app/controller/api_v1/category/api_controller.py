@@ -1,9 +1,10 @@
 from typing import Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 
 from app.controller.api_v1.category.schema import Category as CategoryResponse
+from app.controller.api_v1.category.utils import check_categories_not_modified
 from app.dependencies.db import get_db
 from app.models.category import Category, CategoryType
 from app.utility.response import CustomJSONResponse
@@ -14,8 +15,14 @@ router = APIRouter(route_class=RequestResponseLoggingRoute)
 
 @router.get("/categories", response_class=CustomJSONResponse)
 def get_categories(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
 ) -> Any:
+    not_modified_response = check_categories_not_modified(CategoryType.experience, request, response, db)
+    if not_modified_response:
+        return not_modified_response
+
     categories = db.query(Category).filter(
         Category.type == CategoryType.experience,
         Category.is_active.is_(True)
@@ -25,13 +32,20 @@ def get_categories(
     for category in categories:
         resp.append(CategoryResponse(**category.__dict__))
 
-    return resp
+    # returned directly (skipping jsonable_encoder), so with the cache headers set on `response`
+    return CustomJSONResponse(resp, headers=response.headers)
 
 
 @router.get("/artist/categories", response_class=CustomJSONResponse)
 def get_categories(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
 ) -> Any:
+    not_modified_response = check_categories_not_modified(CategoryType.artist, request, response, db)
+    if not_modified_response:
+        return not_modified_response
+
     categories = db.query(Category).filter(
         Category.type == CategoryType.artist,
         Category.is_active.is_(True)
@@ -41,4 +55,5 @@ def get_categories(
     for category in categories:
         resp.append(CategoryResponse(**category.__dict__))
 
-    return resp
+    # returned directly (skipping jsonable_encoder), so with the cache headers set on `response`
+    return CustomJSONResponse(resp, headers=response.headers)
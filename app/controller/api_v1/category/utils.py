@@ -0,0 +1,28 @@
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.category import Category, CategoryType
+from app.utility.http_cache import check_conditional_request, get_version_etag
+
+
+def check_categories_not_modified(
+    category_type: CategoryType,
+    request: Request,
+    response: Response,
+    db: Session
+) -> Optional[Response]:
+    """ 304 response if client's category list is current, versioned by latest update and count """
+    last_modified, no_of_categories = db.query(
+        func.max(Category.updated_time), func.count(Category.id)
+    ).filter(
+        Category.type == category_type
+    ).one()
+    return check_conditional_request(
+        request,
+        response,
+        etag=get_version_etag("categories", category_type.value, last_modified, no_of_categories),
+        last_modified=last_modified
+    )
@@ -107,4 +107,4 @@ def get_customer_bookings(
             )
         )
 
-    return bookings_resp
+    return CustomJSONResponse(bookings_resp)
@@ -1,6 +1,7 @@
 from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, Query, Body
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, Query, Body, Request
 from sqlalchemy.orm import Session
 
 from app.controller.api_v1.experience.schema import (
@@ -10,15 +11,34 @@ from app.controller.api_v1.experience.schema import (
     ExperienceFilter
 )
 from app.controller.api_v1.category.schema import Category as CategoryResponse
-from app.controller.api_v1.experience.utils import validate_new_slot
+from app.controller.api_v1.experience.documents import (
+    get_experience_document,
+    get_experience_documents,
+    refresh_experience_documents
+)
+from app.controller.api_v1.experience.popularity import get_popular_experience_ids
+from app.controller.api_v1.experience.similarity import get_similar_experience_ids, SIMILAR_EXPERIENCES_COUNT
+from app.controller.api_v1.experience.utils import (
+    validate_new_slot,
+    get_experience_facets,
+    normalize_city,
+    experience_geo_index
+)
 from app.dependencies.db import get_db
 from app.models.supplier import Supplier
 from app.models.category import Category
 from app.models.experience import Experience, ExperienceImage, ExperienceStatus, ExperienceSlot
 from app.utility.auth import get_current_supplier
 from app.utility.cloud_storage import cs_utils, get_cloud_file_path
-from app.utility.constants import EXPERIENCE_IMAGE_DIR
-from app.utility.response import CustomJSONResponse
+from app.utility.constants import (
+    EXPERIENCE_IMAGE_DIR,
+    DEFAULT_NEARBY_RADIUS_KM,
+    MAX_NEARBY_RADIUS_KM,
+    MAX_NEARBY_RESULTS
+)
+from app.utility.geo import parse_near
+from app.utility.http_cache import check_conditional_request, get_version_etag
+from app.utility.response import CustomJSONResponse, dumps_json, get_raw_json_response
 from app.utility.router import RequestResponseLoggingRoute
 
 router = APIRouter(route_class=RequestResponseLoggingRoute)
@@ -26,62 +46,70 @@ router = APIRouter(route_class=RequestResponseLoggingRoute)
 
 @router.get("/popular", response_class=CustomJSONResponse)
 def get_popular_experiences(
+    category_id: Optional[int] = Query(None),
+    city: Optional[str] = Query(None),
+    limit: int = Query(10, gt=0, le=50),
     db: Session = Depends(get_db),
 ) -> Any:
-    """ Get Popular Experiences """
-    pass
+    """ Get Popular Experiences, optionally of a category and/or city """
+    experience_ids = get_popular_experience_ids(category_id=category_id, city=city, limit=limit)
+    return get_raw_json_response(b"[" + b",".join(get_experience_documents(experience_ids, db)) + b"]")
 
 
 @router.get("/similar", response_class=CustomJSONResponse)
 def get_similar_experiences(
     experience_id: int = Query(...),
+    limit: int = Query(10, gt=0, le=SIMILAR_EXPERIENCES_COUNT),
     db: Session = Depends(get_db),
 ) -> Any:
-    """ Get Similar Experiences """
-    pass
+    """ Get Similar Experiences (precomputed by similar experiences job) """
+    similar_ids = get_similar_experience_ids(experience_id=experience_id, limit=limit)
+    return get_raw_json_response(b"[" + b",".join(get_experience_documents(similar_ids, db)) + b"]")
 
 
 @router.get("", response_class=CustomJSONResponse)
 def get_experience_by_id(
+    request: Request,
     experience_id: int = Query(...),
     db: Session = Depends(get_db),
 ) -> Any:
-    """ Get Experience by Id """
-    experience: Experience = db.query(Experience).filter(
-        Experience.id == experience_id,
-        Experience.status == ExperienceStatus.approved
-    ).first()
-
-    if not experience:
+    """ Get Experience by Id, supports conditional requests (ETag / Last-Modified) """
+    experience_document = get_experience_document(experience_id, db)
+    if not experience_document:
+        # e.g. approved outside the app, built now for this and later reads
+        refresh_experience_documents([experience_id], db)
+        db.commit()
+        experience_document = get_experience_document(experience_id, db)
+    # only approved experiences of an active category have a document
+    if not experience_document:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"No experience found with id {experience_id}"
         )
 
-    image_urls = []
-    for image in experience.images:
-        image_urls.append(cs_utils.get_full_image_url(image.url))
-
-    host = experience.host
-
-    return ExperienceResponse(
-        **experience.__dict__,
-        host_name=host.name,
-        host_profile_image=host.profile_image,
-        experience_id=experience.id,
-        image_urls=image_urls,
-        category=experience.category.name,
-        slots=experience.slots
+    document, last_modified = experience_document
+    document_response = get_raw_json_response(document)
+    not_modified_response = check_conditional_request(
+        request,
+        document_response,
+        etag=get_version_etag("experience", experience_id, last_modified.isoformat()),
+        last_modified=last_modified
     )
+    return not_modified_response or document_response
 
 
 @router.post("/category/all", response_class=CustomJSONResponse)
 def get_experiences_by_category(
     filter_request: Optional[ExperienceFilter] = Body(None),
     category_id: int = Query(...),
+    near: Optional[str] = Query(None, description="latitude,longitude"),
+    radius: float = Query(DEFAULT_NEARBY_RADIUS_KM, gt=0, le=MAX_NEARBY_RADIUS_KM, description="radius in km"),
     db: Session = Depends(get_db),
 ) -> Any:
-    """ Get all Experiences of a category """
+    """
+    Get all Experiences of a category, facet counts are over the whole category.
+    With `near`, only experiences within radius are returned, nearest first
+    """
     category: Category = db.query(Category).filter(
         Category.is_active.is_(True),
         Category.id == category_id
@@ -91,18 +119,35 @@ def get_experiences_by_category(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Category with id {category_id} is inactive or does not exist"
         )
-    filers = [
+    category_filters = [
         Experience.category_id == category_id,
         Experience.status == ExperienceStatus.approved
     ]
+    filers = list(category_filters)
     if filter_request:
         if filter_request.min_price:
             filers.append(Experience.price_per_guest >= filter_request.min_price)
         if filter_request.max_price:
             filers.append(Experience.price_per_guest <= filter_request.max_price)
         if filter_request.venue_city:
-            filers.append(Experience.venue_city == filter_request.venue_city)
-    experiences: List[Experience] = db.query(Experience).filter(*filers).all()
+            filers.append(Experience.normalized_venue_city == normalize_city(filter_request.venue_city))
+        if filter_request.min_duration:
+            filers.append(Experience.duration >= filter_request.min_duration)
+        if filter_request.max_duration:
+            filers.append(Experience.duration <= filter_request.max_duration)
+        if filter_request.language:
+            filers.append(Experience.language == filter_request.language)
+    experiences = db.query(
+        Experience.id, Experience.venue_city, Experience.price_per_guest
+    ).filter(*filers).all()
+    distances = {}
+    if near:
+        # the nearest of the matching experiences, not the matching ones of the nearest overall
+        latitude, longitude = parse_near(near)
+        distances = dict(experience_geo_index.query_radius(
+            latitude, longitude, radius, MAX_NEARBY_RESULTS, allowed_ids=[experience.id for experience in experiences]
+        ))
+        experiences = [experience for experience in experiences if experience.id in distances]
 
     experience_metadata = {
         "category": CategoryResponse(**category.__dict__),
@@ -110,29 +155,22 @@ def get_experiences_by_category(
         "min_price": 10000000,
         "max_price": 0
     }
-    resp = []
     for experience in experiences:
-        image_urls = []
-        for image in experience.images:
-            image_urls.append(cs_utils.get_full_image_url(image.url))
-        host = experience.host
-        resp.append(ExperienceResponse(
-            **experience.__dict__,
-            host_name=host.name,
-            host_profile_image=host.profile_image,
-            experience_id=experience.id,
-            image_urls=image_urls,
-            category=category.name
-        ))
         experience_metadata["all_venues"].add(experience.venue_city)
         experience_metadata["min_price"] = min(experience_metadata["min_price"], experience.price_per_guest)
         experience_metadata["max_price"] = max(experience_metadata["max_price"], experience.price_per_guest)
 
-    # return resp
-    return {
-        "experiences": resp,
-        "metadata": experience_metadata
-    }
+    experience_ids = [experience.id for experience in experiences]
+    if near:
+        experience_ids.sort(key=lambda experience_id: distances[experience_id])
+    documents = get_experience_documents(experience_ids, db, distances=distances)
+
+    return get_raw_json_response(
+        b'{"experiences":[' + b",".join(documents)
+        + b'],"metadata":' + dumps_json(experience_metadata)
+        + b',"facets":' + orjson.dumps(get_experience_facets(category_filters, db).dict())
+        + b"}"
+    )
 
 
 @router.get("/host/all", response_class=CustomJSONResponse)
@@ -166,7 +204,7 @@ def get_all_experiences_of_host(
             category=experience.category.name
         ))
 
-    return resp
+    return CustomJSONResponse(resp)
 
 
 @router.post("/create", response_class=CustomJSONResponse)
@@ -192,6 +230,7 @@ def create_experience(
         setattr(experience, key, value)
 
     experience.host_id = supplier.id
+    experience.normalized_venue_city = normalize_city(experience.venue_city)
     db.add(experience)
     db.commit()
     db.refresh(experience)
@@ -235,6 +274,7 @@ def upload_image(
 
     if images_db:
         db.bulk_save_objects(images_db)
+        refresh_experience_documents([experience_id], db)
         db.commit()
 
     return "Images uploaded successfully"
@@ -273,8 +313,11 @@ def add_slot(
     slot.start_time = add_slot_request.start_time
     slot.end_time = add_slot_request.end_time
     slot.remaining_guest_limit = experience.guest_limit
+    if not experience.duration:
+        experience.duration = int((slot.end_time - slot.start_time).total_seconds() // 60)
 
     db.add(slot)
+    refresh_experience_documents([experience_id], db)
     db.commit()
 
     return "Slot added successfully"
@@ -0,0 +1,195 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+import pytz
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, joinedload
+
+from app.controller.api_v1.experience.schema import ExperienceSlot as ExperienceSlotResponse
+from app.controller.api_v1.experience.utils import get_experiences_by_ids, get_experience_response
+from app.dependencies.logger import ApplicationLogger
+from app.models.experience import (
+    Experience,
+    ExperienceDocument,
+    ExperienceImage,
+    ExperienceSlot,
+    ExperienceStatus
+)
+from app.utility.cloud_storage import cs_utils
+
+logger = ApplicationLogger.get_logger(__name__)
+
+# Read model of approved experiences: one experience_document row per experience holding the
+# serialized experience response (host, category and image urls included, slots and distance
+# left out) and its upcoming active slots. Rows are written in the same transaction as the
+# change to any of their source rows, so reads are a primary key lookup returning bytes.
+# Upcoming slots are filtered once more on read since slots turn past without any write.
+# Changes made outside the app (e.g. approvals) are picked up by the rebuild job, a missing
+# document is also built on the experience's first detail read.
+
+
+def serialize_experience(experience: Experience, image_urls: Optional[List[str]] = None) -> bytes:
+    response = get_experience_response(experience, image_urls)
+    return orjson.dumps(response.dict(exclude={"slots", "distance"}))
+
+
+def serialize_slots(slots: List[ExperienceSlot]) -> bytes:
+    return orjson.dumps([ExperienceSlotResponse.from_orm(slot).dict() for slot in slots])
+
+
+def get_upcoming_slots(experience_ids: List[int], db: Session) -> Dict[int, List[ExperienceSlot]]:
+    slots = db.query(ExperienceSlot).filter(
+        ExperienceSlot.experience_id.in_(experience_ids),
+        ExperienceSlot.is_active.is_(True),
+        ExperienceSlot.start_time >= func.now()
+    ).order_by(ExperienceSlot.start_time).all()
+
+    slots_by_experience = {experience_id: [] for experience_id in experience_ids}
+    for slot in slots:
+        slots_by_experience[slot.experience_id].append(slot)
+    return slots_by_experience
+
+
+def refresh_experience_documents(experience_ids: List[int], db: Session) -> None:
+    """
+    Rebuild documents of given experiences within the caller's transaction, call it before commit.
+    Experiences which are not approved or whose category is inactive lose their document
+    """
+    if not experience_ids:
+        return
+    # sessions don't autoflush, pending rows (e.g. a new slot) must be written for the queries to see them
+    db.flush()
+    # images and slots are queried instead of read through relationships, which may be stale in this session
+    experiences = db.query(Experience).options(
+        joinedload(Experience.host),
+        joinedload(Experience.category)
+    ).filter(
+        Experience.id.in_(experience_ids)
+    ).all()
+    images = db.query(ExperienceImage.experience_id, ExperienceImage.url).filter(
+        ExperienceImage.experience_id.in_(experience_ids),
+        ExperienceImage.is_active.is_(True)
+    ).order_by(ExperienceImage.id).all()
+    image_urls = {experience_id: [] for experience_id in experience_ids}
+    for experience_id, url in images:
+        image_urls[experience_id].append(cs_utils.get_full_image_url(url))
+    slots = get_upcoming_slots(experience_ids, db)
+
+    documents = []
+    for experience in experiences:
+        if experience.status != ExperienceStatus.approved or not experience.category:
+            continue
+        documents.append({
+            "experience_id": experience.id,
+            "document": serialize_experience(experience, image_urls[experience.id]).decode(),
+            "slots": serialize_slots(slots[experience.id]).decode(),
+        })
+
+    listed_ids = {document["experience_id"] for document in documents}
+    unlisted_ids = [experience_id for experience_id in experience_ids if experience_id not in listed_ids]
+    if unlisted_ids:
+        db.query(ExperienceDocument).filter(
+            ExperienceDocument.experience_id.in_(unlisted_ids)
+        ).delete(synchronize_session=False)
+    if documents:
+        statement = insert(ExperienceDocument).values(documents)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[ExperienceDocument.experience_id],
+            set_={
+                "document": statement.excluded.document,
+                "slots": statement.excluded.slots,
+                "updated_time": func.now(),
+            }
+        ))
+
+
+def refresh_experience_document_slots(experience_id: int, db: Session) -> None:
+    """ Rewrite only the slots of an experience document (e.g. on booking), before commit """
+    db.flush()
+    slots = get_upcoming_slots([experience_id], db)[experience_id]
+    db.query(ExperienceDocument).filter(
+        ExperienceDocument.experience_id == experience_id
+    ).update({
+        ExperienceDocument.slots: serialize_slots(slots).decode(),
+        ExperienceDocument.updated_time: func.now(),
+    }, synchronize_session=False)
+
+
+def get_document_bytes(document: str, slots: Optional[bytes] = None, distance: Optional[float] = None) -> bytes:
+    """ experience response bytes, slots and distance are spliced in front of the stored fields """
+    return b'{"slots":' + (slots or b"null") + b',"distance":' + orjson.dumps(distance) + b"," + document[1:].encode()
+
+
+def split_slots(slots: str) -> Tuple[bytes, Optional[datetime]]:
+    """ stored slots still upcoming (serialized) and start time of the latest one which turned past """
+    now = datetime.now(tz=pytz.utc)
+    upcoming, last_past_start = [], None
+    for slot in orjson.loads(slots):
+        start_time = datetime.fromisoformat(slot["start_time"])
+        if start_time.tzinfo is None:
+            start_time = start_time.replace(tzinfo=pytz.utc)
+        if start_time >= now:
+            upcoming.append(slot)
+        else:
+            last_past_start = start_time
+    return orjson.dumps(upcoming), last_past_start
+
+
+def get_experience_document(experience_id: int, db: Session) -> Optional[Tuple[bytes, datetime]]:
+    """ experience detail response bytes and when it last changed, None if there is no document """
+    row = db.query(
+        ExperienceDocument.document, ExperienceDocument.slots, ExperienceDocument.updated_time
+    ).filter(
+        ExperienceDocument.experience_id == experience_id
+    ).first()
+    if not row:
+        return None
+    document, slots, updated_time = row
+    upcoming_slots, last_past_start = split_slots(slots)
+    last_modified = max(updated_time, last_past_start) if last_past_start else updated_time
+    return get_document_bytes(document, slots=upcoming_slots), last_modified
+
+
+def get_experience_documents(
+    experience_ids: List[int],
+    db: Session,
+    distances: Optional[Dict[int, float]] = None
+) -> List[bytes]:
+    """ listing response bytes (no slots) of approved experiences in given order """
+    if not experience_ids:
+        return []
+    distances = distances or {}
+    documents = dict(db.query(ExperienceDocument.experience_id, ExperienceDocument.document).filter(
+        ExperienceDocument.experience_id.in_(experience_ids)
+    ).all())
+
+    missing_ids = [experience_id for experience_id in experience_ids if experience_id not in documents]
+    if missing_ids:
+        logger.warning("No document for experiences %s, run rebuild_experience_documents", missing_ids)
+        for experience in get_experiences_by_ids(missing_ids, db):
+            if experience.category:
+                documents[experience.id] = serialize_experience(experience).decode()
+
+    return [
+        get_document_bytes(documents[experience_id], distance=distances.get(experience_id))
+        for experience_id in experience_ids if experience_id in documents
+    ]
+
+
+def rebuild_experience_documents(db: Session, batch_size: int = 500) -> int:
+    """ Rebuild documents of all experiences, returns no of documents """
+    experience_ids = [experience_id for experience_id, in db.query(Experience.id).order_by(Experience.id).all()]
+    for i in range(0, len(experience_ids), batch_size):
+        refresh_experience_documents(experience_ids[i:i + batch_size], db)
+        db.commit()
+    # documents of experiences which no longer exist
+    db.query(ExperienceDocument).filter(
+        ExperienceDocument.experience_id.notin_(db.query(Experience.id).scalar_subquery())
+    ).delete(synchronize_session=False)
+    db.commit()
+
+    no_of_documents = db.query(func.count(ExperienceDocument.experience_id)).scalar()
+    logger.info("Experience documents rebuilt, %s documents", no_of_documents)
+    return no_of_documents
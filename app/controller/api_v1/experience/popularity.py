@@ -0,0 +1,183 @@
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+import pytz
+from sqlalchemy import extract, func, literal
+from sqlalchemy.orm import Session
+
+from app.config import config
+from app.controller.api_v1.experience.utils import normalize_city
+from app.dependencies.logger import ApplicationLogger
+from app.dependencies.redis import redis_client
+from app.models.booking import Booking, BookingStatus, BookingType
+from app.models.experience import Experience, ExperienceSlot, ExperienceStatus
+from app.utility.constants import POPULAR_EXPERIENCES_PREFIX
+
+logger = ApplicationLogger.get_logger(__name__)
+
+ALL = "all"
+EPOCH_KEY = POPULAR_EXPERIENCES_PREFIX + "epoch"
+RANKING_KEYS_KEY = POPULAR_EXPERIENCES_PREFIX + "keys"
+REBUILD_EPOCH_KEY = POPULAR_EXPERIENCES_PREFIX + "rebuild_epoch"
+DELTA_KEYS_KEY = POPULAR_EXPERIENCES_PREFIX + "delta_keys"
+REBUILD_SUFFIX = ":rebuild"
+DELTA_SUFFIX = ":delta"
+# a rebuild marker left by a crashed job expires, the next rebuild clears its deltas
+REBUILD_MARKER_TTL_SECONDS = 60 * 60
+ZADD_CHUNK_SIZE = 1000
+
+# Popularity is a time decayed count of confirmed bookings. Scores use forward decay:
+# a booking confirmed at time t adds 2 ** ((t - epoch) / half_life), so newer bookings
+# weigh more without ever rewriting older scores. The rebuild job recomputes every
+# ranking from the booking table and moves the epoch to "now" to keep scores small.
+# Bookings recorded while a rebuild runs are also added, scored on the new epoch, to
+# delta rankings, which are merged into the rebuilt ones when they are swapped in. A
+# booking committed just before the rebuild's query but recorded after it started is
+# counted twice, which is negligible, none is lost.
+
+
+def get_popularity_key(category_id: Optional[int] = None, city: Optional[str] = None) -> str:
+    return f"{POPULAR_EXPERIENCES_PREFIX}{category_id or ALL}:{normalize_city(city) or ALL}"
+
+
+def get_popularity_keys(category_id: int, city: Optional[str]) -> List[str]:
+    """ all rankings an experience of given category and city is part of """
+    return list(dict.fromkeys([
+        get_popularity_key(),
+        get_popularity_key(category_id=category_id),
+        get_popularity_key(city=city),
+        get_popularity_key(category_id=category_id, city=city),
+    ]))
+
+
+def get_half_life_seconds() -> float:
+    return config.POPULARITY_HALF_LIFE_DAYS * 24 * 60 * 60
+
+
+def get_popularity_epoch() -> float:
+    epoch = redis_client.get(EPOCH_KEY)
+    if epoch is None:
+        redis_client.set(EPOCH_KEY, time.time(), nx=True)
+        epoch = redis_client.get(EPOCH_KEY)
+    return float(epoch)
+
+
+def get_booking_score(confirmation_time: datetime, epoch: float) -> float:
+    return 2 ** ((confirmation_time.timestamp() - epoch) / get_half_life_seconds())
+
+
+def record_experience_booking(
+    experience_id: int,
+    category_id: int,
+    venue_city: Optional[str],
+    confirmation_time: datetime,
+) -> None:
+    """
+    Incrementally add a confirmed booking to the popularity rankings.
+    Failures are only logged, rebuild_popularity_rankings corrects any drift
+    """
+    try:
+        score = get_booking_score(confirmation_time, get_popularity_epoch())
+        rebuild_epoch = redis_client.get(REBUILD_EPOCH_KEY)
+        rebuild_score = get_booking_score(confirmation_time, float(rebuild_epoch)) if rebuild_epoch else None
+        # in a transaction, so a rebuild is swapped in before or after both the ranking and delta updates
+        pipeline = redis_client.pipeline(transaction=True)
+        for key in get_popularity_keys(category_id, venue_city):
+            pipeline.zincrby(key, score, experience_id)
+            pipeline.sadd(RANKING_KEYS_KEY, key)
+            if rebuild_score is not None:
+                pipeline.zincrby(key + DELTA_SUFFIX, rebuild_score, experience_id)
+                pipeline.sadd(DELTA_KEYS_KEY, key)
+        pipeline.execute()
+    except Exception as ex:
+        logger.error("Can't update popularity of experience %s: %s", experience_id, ex.__repr__())
+
+
+def start_rebuild(epoch: float) -> None:
+    """ clear deltas left by a crashed rebuild and have bookings recorded from now on added to new deltas """
+    def clear_deltas(pipeline) -> None:
+        delta_keys = [key + DELTA_SUFFIX for key in pipeline.smembers(DELTA_KEYS_KEY)]
+        pipeline.multi()
+        if delta_keys:
+            pipeline.delete(*delta_keys)
+        pipeline.delete(DELTA_KEYS_KEY)
+        pipeline.set(REBUILD_EPOCH_KEY, epoch, ex=REBUILD_MARKER_TTL_SECONDS)
+
+    redis_client.transaction(clear_deltas, DELTA_KEYS_KEY)
+
+
+def swap_rebuilt_rankings(rebuilt_keys: Set[str], epoch: float) -> None:
+    """ replace the rankings by the rebuilt ones merged with their deltas, together with the new epoch """
+    def swap(pipeline) -> None:
+        delta_keys = pipeline.smembers(DELTA_KEYS_KEY)
+        stale_keys = pipeline.smembers(RANKING_KEYS_KEY) - rebuilt_keys - delta_keys
+        keys = rebuilt_keys | delta_keys
+        pipeline.multi()
+        for key in keys:
+            pipeline.zunionstore(key, [key + REBUILD_SUFFIX, key + DELTA_SUFFIX])
+            pipeline.delete(key + REBUILD_SUFFIX, key + DELTA_SUFFIX)
+        if stale_keys:
+            pipeline.delete(*stale_keys)
+        pipeline.delete(RANKING_KEYS_KEY, DELTA_KEYS_KEY, REBUILD_EPOCH_KEY)
+        if keys:
+            pipeline.sadd(RANKING_KEYS_KEY, *keys)
+        pipeline.set(EPOCH_KEY, epoch)
+
+    # retried when a booking of a new ranking is recorded meanwhile
+    redis_client.transaction(swap, DELTA_KEYS_KEY, RANKING_KEYS_KEY)
+
+
+def rebuild_popularity_rankings(db: Session) -> int:
+    """ Recompute all popularity rankings from confirmed bookings, returns no of ranked experiences """
+    epoch = time.time()
+    start_rebuild(epoch)
+    window_start = datetime.now(tz=pytz.utc) - timedelta(days=config.POPULARITY_WINDOW_DAYS)
+    score = func.sum(func.power(
+        2.0,
+        (extract("epoch", Booking.confirmation_time) - literal(epoch)) / get_half_life_seconds()
+    ))
+    rows = db.query(
+        Experience.id, Experience.category_id, Experience.venue_city, score
+    ).join(
+        ExperienceSlot, ExperienceSlot.experience_id == Experience.id
+    ).join(
+        Booking, Booking.experience_slot_id == ExperienceSlot.id
+    ).filter(
+        Booking.booking_type == BookingType.experience,
+        Booking.status.in_([BookingStatus.confirmed, BookingStatus.completed]),
+        Booking.confirmation_time >= window_start,
+        Experience.status == ExperienceStatus.approved
+    ).group_by(Experience.id).all()
+
+    rankings: Dict[str, Dict[int, float]] = {}
+    for experience_id, category_id, venue_city, experience_score in rows:
+        for key in get_popularity_keys(category_id, venue_city):
+            rankings.setdefault(key, {})[experience_id] = float(experience_score)
+
+    pipeline = redis_client.pipeline(transaction=False)
+    for key, scores in rankings.items():
+        pipeline.delete(key + REBUILD_SUFFIX)
+        members = list(scores.items())
+        for i in range(0, len(members), ZADD_CHUNK_SIZE):
+            pipeline.zadd(key + REBUILD_SUFFIX, dict(members[i:i + ZADD_CHUNK_SIZE]))
+    pipeline.execute()
+
+    swap_rebuilt_rankings(set(rankings), epoch)
+
+    logger.info("Popularity rankings rebuilt for %s experiences", len(rows))
+    return len(rows)
+
+
+def get_popular_experience_ids(
+    category_id: Optional[int],
+    city: Optional[str],
+    limit: int
+) -> List[int]:
+    """ most popular first, none when the rankings can't be read """
+    try:
+        experience_ids = redis_client.zrevrange(get_popularity_key(category_id, city), 0, limit - 1)
+    except Exception as ex:
+        logger.error("Can't read popular experiences: %s", ex.__repr__())
+        return []
+    return [int(experience_id) for experience_id in experience_ids]
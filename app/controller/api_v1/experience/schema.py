@@ -35,7 +35,12 @@ class Experience(BaseModel):
     venue_city: Optional[str]
     venue_state: Optional[str]
     venue_country: Optional[str]
+    latitude: Optional[float]
+    longitude: Optional[float]
+    language: Optional[str]
+    duration: Optional[int]
     image_urls: List[str]
+    distance: Optional[float]
     slots: Optional[List[ExperienceSlot]]
 
     @validator("host_profile_image")
@@ -60,6 +65,15 @@ class ExperienceCreate(BaseModel):
     venue_city: Optional[str] = Field(None, min_length=1)
     venue_state: Optional[str] = Field(None, min_length=1)
     venue_country: Optional[str] = Field(None, min_length=1)
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    language: Optional[str] = Field(None, min_length=1)
+    duration: Optional[int] = Field(None, gt=0, description="duration in minutes")
+
+    @validator("language")
+    @classmethod
+    def normalize_language(cls, v: Optional[str]) -> Optional[str]:
+        return v.strip().lower() if v else v
 
 
 class ExperienceSlotAdd(BaseModel):
@@ -81,3 +95,20 @@ class ExperienceFilter(BaseModel):
     max_price: Optional[int]
     venue_city: Optional[str]
     language: Optional[str]
+
+    @validator("language")
+    @classmethod
+    def normalize_language(cls, v: Optional[str]) -> Optional[str]:
+        return v.strip().lower() if v else v
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class ExperienceFacets(BaseModel):
+    cities: List[FacetCount] = []
+    languages: List[FacetCount] = []
+    price_buckets: List[FacetCount] = []
+    duration_buckets: List[FacetCount] = []
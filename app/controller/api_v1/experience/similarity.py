@@ -0,0 +1,191 @@
+from typing import List
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.controller.api_v1.experience.utils import normalize_city
+from app.dependencies.logger import ApplicationLogger
+from app.dependencies.redis import redis_client
+from app.models.booking import Booking, BookingStatus, BookingType
+from app.models.experience import Experience, ExperienceSlot, ExperienceStatus, ExperienceMode
+from app.utility.constants import SIMILAR_EXPERIENCES_KEY
+
+logger = ApplicationLogger.get_logger(__name__)
+
+SIMILAR_EXPERIENCES_COUNT = 20
+PRICE_BANDS = [250, 500, 1000, 2000, 5000, 10000]
+CO_BOOKING_DIMENSIONS = 64
+BLOCK_SIZE = 1024
+HSET_CHUNK_SIZE = 1000
+
+# weight of each feature in the similarity score, neighbours always share the category
+CO_BOOKING_WEIGHT = 3.0
+CITY_WEIGHT = 2.0
+PRICE_WEIGHT = 1.0
+MODE_WEIGHT = 0.5
+
+
+def get_one_hot(codes: np.ndarray, weight: float) -> np.ndarray:
+    """ one hot encode non negative codes, scaled so that a match adds `weight` to the dot product """
+    one_hot = np.zeros((len(codes), int(codes.max(initial=-1)) + 1), dtype=np.float32)
+    known = codes >= 0
+    one_hot[np.nonzero(known)[0], codes[known]] = np.sqrt(weight)
+    return one_hot
+
+
+def get_co_booking_vectors(
+    experience_index: np.ndarray,
+    customer_index: np.ndarray,
+    no_of_experiences: int,
+) -> np.ndarray:
+    """
+    Random projection of the experience x customer booking matrix: each customer gets a
+    random +1/-1 vector and an experience is the normalized sum of its customers' vectors,
+    so the dot product of two experiences approximates their share of common customers
+    """
+    vectors = np.zeros((no_of_experiences, CO_BOOKING_DIMENSIONS), dtype=np.float32)
+    if not len(customer_index):
+        return vectors
+
+    rng = np.random.default_rng(seed=0)
+    customer_vectors = rng.choice(
+        np.array([-1, 1], dtype=np.float32), size=(customer_index.max() + 1, CO_BOOKING_DIMENSIONS)
+    )
+    np.add.at(vectors, experience_index, customer_vectors[customer_index])
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def get_experience_features(
+    modes: np.ndarray,
+    price_bands: np.ndarray,
+    co_booking_vectors: np.ndarray,
+) -> np.ndarray:
+    """ feature matrix whose row dot products are the similarity scores, except for city """
+    return np.hstack([
+        get_one_hot(modes, MODE_WEIGHT),
+        get_one_hot(price_bands, PRICE_WEIGHT),
+        np.sqrt(CO_BOOKING_WEIGHT, dtype=np.float32) * co_booking_vectors,
+    ])
+
+
+def get_similar_experience_matrix(
+    category_ids: np.ndarray,
+    city_ids: np.ndarray,
+    features: np.ndarray,
+    top_k: int = SIMILAR_EXPERIENCES_COUNT,
+) -> np.ndarray:
+    """
+    Returns a (no of experiences x top_k) matrix of row indices of the most similar
+    experiences of the same category, best first, padded with -1.
+    Scores are computed per category, block by block to bound memory. City is matched
+    by comparing codes instead of a wide one hot block, unknown cities should get
+    distinct negative codes so that they never match.
+    """
+    neighbours = np.full((len(category_ids), top_k), -1, dtype=np.int64)
+    for category_id in np.unique(category_ids):
+        members = np.nonzero(category_ids == category_id)[0]
+        k = min(top_k, len(members) - 1)
+        if k <= 0:
+            continue
+        member_features = features[members]
+        member_cities = city_ids[members]
+        for start in range(0, len(members), BLOCK_SIZE):
+            end = min(start + BLOCK_SIZE, len(members))
+
+            scores = member_features[start:end] @ member_features.T
+            same_city = member_cities[start:end, None] == member_cities[None, :]
+            np.add(scores, np.float32(CITY_WEIGHT), out=scores, where=same_city)
+            scores[np.arange(end - start), np.arange(start, end)] = -np.inf
+
+            candidates = np.argpartition(scores, -k, axis=1)[:, -k:]
+            candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+            order = np.argsort(-candidate_scores, axis=1, kind="stable")
+            neighbours[members[start:end], :k] = members[np.take_along_axis(candidates, order, axis=1)]
+
+    return neighbours
+
+
+def rebuild_similar_experiences(db: Session) -> int:
+    """ Recompute neighbour lists of all approved experiences, returns no of experiences """
+    experiences = db.query(
+        Experience.id, Experience.category_id, Experience.venue_city, Experience.mode, Experience.price_per_guest
+    ).filter(
+        Experience.status == ExperienceStatus.approved
+    ).order_by(Experience.id).all()
+
+    experience_ids = np.array([experience.id for experience in experiences], dtype=np.int64)
+    category_ids = np.array([experience.category_id for experience in experiences], dtype=np.int64)
+    cities = {}
+    city_ids = np.array([
+        cities.setdefault(normalize_city(experience.venue_city), len(cities))
+        if experience.venue_city else -(i + 1)
+        for i, experience in enumerate(experiences)
+    ], dtype=np.int64)
+    modes = np.array([experience.mode == ExperienceMode.physical for experience in experiences], dtype=np.int64)
+    price_bands = np.digitize(
+        np.array([float(experience.price_per_guest) for experience in experiences]), PRICE_BANDS
+    )
+
+    co_bookings = db.query(
+        ExperienceSlot.experience_id, Booking.customer_id
+    ).join(
+        Booking, Booking.experience_slot_id == ExperienceSlot.id
+    ).filter(
+        Booking.booking_type == BookingType.experience,
+        Booking.status.in_([BookingStatus.confirmed, BookingStatus.completed])
+    ).distinct().all()
+    co_booking_pairs = np.array(co_bookings, dtype=np.int64).reshape(-1, 2)
+
+    # map experience and customer ids to dense row indices
+    experience_index = np.searchsorted(experience_ids, co_booking_pairs[:, 0])
+    known = experience_index < len(experience_ids)
+    known[known] = experience_ids[experience_index[known]] == co_booking_pairs[known, 0]
+    _, customer_index = np.unique(co_booking_pairs[known, 1], return_inverse=True)
+
+    co_booking_vectors = get_co_booking_vectors(
+        experience_index=experience_index[known],
+        customer_index=customer_index,
+        no_of_experiences=len(experience_ids),
+    )
+    features = get_experience_features(
+        modes=modes,
+        price_bands=price_bands,
+        co_booking_vectors=co_booking_vectors,
+    )
+    neighbours = get_similar_experience_matrix(category_ids=category_ids, city_ids=city_ids, features=features)
+
+    mapping = {}
+    id_list = experience_ids.tolist()
+    for experience_id, row in zip(id_list, neighbours.tolist()):
+        similar_ids = [str(id_list[i]) for i in row if i >= 0]
+        if similar_ids:
+            mapping[experience_id] = ",".join(similar_ids)
+
+    # write to a temporary hash and swap it in, so readers never see a partial build
+    rebuild_key = SIMILAR_EXPERIENCES_KEY + ":rebuild"
+    pipeline = redis_client.pipeline(transaction=False)
+    pipeline.delete(rebuild_key)
+    items = list(mapping.items())
+    for i in range(0, len(items), HSET_CHUNK_SIZE):
+        pipeline.hset(rebuild_key, mapping=dict(items[i:i + HSET_CHUNK_SIZE]))
+    pipeline.execute()
+    if mapping:
+        redis_client.rename(rebuild_key, SIMILAR_EXPERIENCES_KEY)
+    else:
+        redis_client.delete(SIMILAR_EXPERIENCES_KEY)
+
+    logger.info("Similar experiences rebuilt for %s experiences", len(mapping))
+    return len(mapping)
+
+
+def get_similar_experience_ids(
+    experience_id: int,
+    limit: int
+) -> List[int]:
+    similar_ids = redis_client.hget(SIMILAR_EXPERIENCES_KEY, experience_id)
+    if not similar_ids:
+        return []
+    return [int(similar_id) for similar_id in similar_ids.split(",")[:limit]]
@@ -1,5 +1,20 @@
 import pytz
 from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.config import config
+from app.controller.api_v1.experience.schema import (
+    Experience as ExperienceResponse,
+    ExperienceFacets,
+    FacetCount
+)
+from app.dependencies.db import ReadSessionLocal
+from app.models.experience import Experience, ExperienceStatus
+from app.utility.cloud_storage import cs_utils
+from app.utility.geo import RefreshingGeoIndex
 
 
 def validate_new_slot(
@@ -23,3 +38,138 @@ def validate_new_slot(
             return False
 
     return True
+
+
+def normalize_city(city):
+    """ lower-cased, single-spaced city name used for lookups and cache keys """
+    if not city:
+        return None
+    return " ".join(city.split()).lower()
+
+
+def get_experiences_by_ids(
+    experience_ids: List[int],
+    db: Session
+) -> List[Experience]:
+    """ load approved experiences with images, host and category in given order """
+    if not experience_ids:
+        return []
+    experiences: List[Experience] = db.query(Experience).options(
+        selectinload(Experience.images),
+        joinedload(Experience.host),
+        joinedload(Experience.category)
+    ).filter(
+        Experience.id.in_(experience_ids),
+        Experience.status == ExperienceStatus.approved
+    ).all()
+
+    experiences_by_id = {experience.id: experience for experience in experiences}
+    return [experiences_by_id[i] for i in experience_ids if i in experiences_by_id]
+
+
+def get_experience_response(
+    experience: Experience,
+    image_urls: Optional[List[str]] = None
+) -> ExperienceResponse:
+    """ experience listing response (no slots), relationships are expected to be loaded already """
+    if image_urls is None:
+        image_urls = [cs_utils.get_full_image_url(image.url) for image in experience.images]
+    host = experience.host
+    # loaded relationships are in __dict__ too, and category would clash with the category name
+    fields = {
+        key: value for key, value in experience.__dict__.items()
+        if key not in ("host", "category", "images", "slots")
+    }
+    return ExperienceResponse(
+        **fields,
+        host_name=host.name,
+        host_profile_image=host.profile_image,
+        experience_id=experience.id,
+        image_urls=image_urls,
+        category=experience.category.name
+    )
+
+
+PRICE_BUCKETS = [500, 1000, 2000, 5000]
+DURATION_BUCKETS = [60, 120, 240]  # minutes
+
+
+def get_bucket_expression(column, boundaries: List[int]):
+    """ sql expression for index of the bucket a value falls in, NULL for NULL values """
+    return case(
+        (column.is_(None), None),
+        *[(column < boundary, i) for i, boundary in enumerate(boundaries)],
+        else_=len(boundaries)
+    )
+
+
+def get_bucket_label(index: int, boundaries: List[int]) -> str:
+    lower = boundaries[index - 1] if index > 0 else 0
+    if index == len(boundaries):
+        return f"{lower}+"
+    return f"{lower}-{boundaries[index]}"
+
+
+def get_experience_facets(
+    filters: list,
+    db: Session
+) -> ExperienceFacets:
+    """ per city, language, price and duration bucket counts, computed in one GROUPING SETS query """
+    facet_source = db.query(
+        Experience.normalized_venue_city.label("city"),
+        Experience.language.label("language"),
+        get_bucket_expression(Experience.price_per_guest, PRICE_BUCKETS).label("price_bucket"),
+        get_bucket_expression(Experience.duration, DURATION_BUCKETS).label("duration_bucket"),
+    ).filter(*filters).subquery()
+
+    columns = [
+        facet_source.c.city,
+        facet_source.c.language,
+        facet_source.c.price_bucket,
+        facet_source.c.duration_bucket
+    ]
+    rows = db.query(
+        *columns,
+        *[func.grouping(column) for column in columns],
+        func.count()
+    ).group_by(func.grouping_sets(*columns)).all()
+
+    counts = {column.name: {} for column in columns}
+    for row in rows:
+        for column, value, grouped in zip(columns, row[:4], row[4:8]):
+            if not grouped and value is not None:
+                counts[column.name][value] = row[8]
+
+    return ExperienceFacets(
+        cities=[
+            FacetCount(value=city, count=count)
+            for city, count in sorted(counts["city"].items(), key=lambda item: -item[1])
+        ],
+        languages=[
+            FacetCount(value=language, count=count)
+            for language, count in sorted(counts["language"].items(), key=lambda item: -item[1])
+        ],
+        price_buckets=[
+            FacetCount(value=get_bucket_label(bucket, PRICE_BUCKETS), count=count)
+            for bucket, count in sorted(counts["price_bucket"].items())
+        ],
+        duration_buckets=[
+            FacetCount(value=get_bucket_label(bucket, DURATION_BUCKETS), count=count)
+            for bucket, count in sorted(counts["duration_bucket"].items())
+        ],
+    )
+
+
+def load_experience_locations():
+    db = ReadSessionLocal()
+    try:
+        return db.query(Experience.id, Experience.latitude, Experience.longitude).filter(
+            Experience.status == ExperienceStatus.approved,
+            Experience.latitude.isnot(None),
+            Experience.longitude.isnot(None)
+        ).all()
+    finally:
+        db.close()
+
+
+experience_geo_index = RefreshingGeoIndex(load_experience_locations, config.GEO_INDEX_REFRESH_SECONDS)
@@ -1,8 +1,24 @@
-from fastapi import APIRouter, Response
+import orjson
+from fastapi import APIRouter, Response, status
+
+from app.controller.api_v1.healthcheck.utils import readiness_check
 
 router = APIRouter()
 
 
 @router.get("/health-check")
 def check_server_health():
+    """ Liveness, does not touch any dependency """
     return Response("OK")
+
+
+@router.get("/readiness")
+def check_server_readiness():
+    """ Whether this worker can serve traffic: primary, replica and redis reachable and db pools not saturated """
+    result = readiness_check.get_result()
+    return Response(
+        orjson.dumps(result),
+        status_code=status.HTTP_200_OK if result["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        media_type="application/json",
+        headers={"Cache-Control": "no-store"}
+    )
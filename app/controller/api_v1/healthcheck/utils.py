@@ -0,0 +1,111 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+from redis import Redis
+from sqlalchemy.engine import Engine
+
+from app.config import config
+from app.dependencies.db import (
+    ENGINE_OPTIONS,
+    READ_DB_ENGINE_OPTIONS,
+    db_engine_provider,
+    read_db_engine_provider
+)
+from app.dependencies.logger import ApplicationLogger
+from app.dependencies.provider import LazyProvider
+
+logger = ApplicationLogger.get_logger(__name__)
+
+# checks run here so a probe waits at most READINESS_TIMEOUT_SECONDS, a hung check keeps its thread
+# until it returns (e.g. after pool_timeout of a db checkout)
+check_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="readiness")
+
+# separate client with short timeouts, the app's client would wait up to its socket_timeout
+redis_probe_client = LazyProvider(lambda: Redis(
+    host=config.REDIS_SERVER,
+    port=config.REDIS_PORT,
+    db=config.REDIS_DB,
+    socket_timeout=config.READINESS_TIMEOUT_SECONDS,
+    socket_connect_timeout=config.READINESS_TIMEOUT_SECONDS,
+))
+
+
+def check_database(engine: Engine, engine_options: Dict[str, Any]) -> Dict[str, Any]:
+    """ pool usage of this worker and a round trip, skipped when the pool is saturated (it would wait) """
+    capacity = engine_options["pool_size"] + engine_options["max_overflow"]
+    pool_usage = round(engine.pool.checkedout() / capacity, 2)
+    if pool_usage >= config.READINESS_MAX_POOL_USAGE:
+        return {"ok": False, "pool_usage": pool_usage, "error": "pool saturated"}
+    try:
+        with engine.connect() as connection:
+            connection.exec_driver_sql("SELECT 1")
+    except Exception as ex:
+        logger.warning("Readiness check of %s failed: %s", engine.pool.engine_name, ex.__repr__())
+        return {"ok": False, "pool_usage": pool_usage, "error": type(ex).__name__}
+    return {"ok": True, "pool_usage": pool_usage}
+
+
+def check_redis() -> Dict[str, Any]:
+    try:
+        redis_probe_client.get().ping()
+    except Exception as ex:
+        logger.warning("Readiness check of redis failed: %s", ex.__repr__())
+        return {"ok": False, "error": type(ex).__name__}
+    return {"ok": True}
+
+
+class ReadinessCheck:
+    """
+    Dependency health of this worker, checked at most once per READINESS_CACHE_SECONDS.
+    Probes arriving while a check runs get the previous result instead of waiting, unless the check
+    has been running for longer than READINESS_TIMEOUT_SECONDS
+    """
+
+    def __init__(self):
+        self.__result: Optional[Dict[str, Any]] = None
+        self.__checked_at = 0.0
+        self.__check_started_at = 0.0
+        self.__running_checks: Dict[str, Future] = {}
+        self.__lock = threading.Lock()
+
+    def __run_checks(self, checks: Dict[str, Callable[[], Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        """ all checks at once, one still running after READINESS_TIMEOUT_SECONDS fails and isn't started again """
+        for name, check in checks.items():
+            if name not in self.__running_checks:
+                self.__running_checks[name] = check_executor.submit(check)
+        wait(self.__running_checks.values(), timeout=config.READINESS_TIMEOUT_SECONDS)
+        results = {}
+        for name in checks:
+            future = self.__running_checks[name]
+            if future.done():
+                results[name] = future.result()
+                del self.__running_checks[name]
+            else:
+                logger.warning("Readiness check of %s timed out", name)
+                results[name] = {"ok": False, "error": "timeout"}
+        return results
+
+    def get_result(self) -> Dict[str, Any]:
+        if self.__result is not None and time.monotonic() - self.__checked_at < config.READINESS_CACHE_SECONDS:
+            return self.__result
+        if not self.__lock.acquire(blocking=self.__result is None):
+            if time.monotonic() - self.__check_started_at > config.READINESS_TIMEOUT_SECONDS:
+                return {"ready": False, "error": "check timed out"}
+            return self.__result
+        try:
+            self.__check_started_at = time.monotonic()
+            checks = self.__run_checks({
+                "primary": lambda: check_database(db_engine_provider.get(), ENGINE_OPTIONS),
+                "replica": lambda: check_database(read_db_engine_provider.get(), READ_DB_ENGINE_OPTIONS),
+                "redis": check_redis,
+            })
+            self.__result = {"ready": all(check["ok"] for check in checks.values()), **checks}
+            self.__checked_at = time.monotonic()
+            return self.__result
+        finally:
+            self.__lock.release()
+
+
+readiness_check = ReadinessCheck()
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from app.dependencies.metrics import get_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_prometheus_metrics():
+    """ Metrics of all workers in Prometheus text format """
+    return Response(get_metrics(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,39 @@
+import os
+from enum import Enum
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse, PlainTextResponse
+
+from app.dependencies.profiler import PROFILE_ID_PATTERN, get_profile_path, get_profile_summary
+from app.models.admin import Admin
+from app.utility.auth import get_current_admin
+from app.utility.router import RequestResponseLoggingRoute
+
+router = APIRouter(route_class=RequestResponseLoggingRoute)
+
+
+class ProfileFormat(str, Enum):
+    pstats = "pstats"
+    text = "text"
+
+
+@router.get("/{profile_id}")
+def get_profile(
+    profile_id: str,
+    format: ProfileFormat = ProfileFormat.pstats,
+    admin: Admin = Depends(get_current_admin)
+):
+    """
+    Profile of a request by its X-Request-ID / X-Profile-ID, as a pstats file (e.g. for snakeviz)
+    or as text listing functions by cumulative time
+    """
+    if not PROFILE_ID_PATTERN.match(profile_id) or not os.path.exists(get_profile_path(profile_id)):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    if format == ProfileFormat.text:
+        return PlainTextResponse(get_profile_summary(profile_id))
+    return FileResponse(
+        get_profile_path(profile_id), media_type="application/octet-stream", filename=f"{profile_id}.prof"
+    )
@@ -0,0 +1,19 @@
+from typing import Any
+
+from fastapi import APIRouter, Query
+
+from app.controller.api_v1.search.utils import autocomplete_index
+from app.utility.constants import MAX_AUTOCOMPLETE_RESULTS
+from app.utility.response import CustomJSONResponse
+from app.utility.router import RequestResponseLoggingRoute
+
+router = APIRouter(route_class=RequestResponseLoggingRoute)
+
+
+@router.get("/autocomplete", response_class=CustomJSONResponse)
+def autocomplete(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, gt=0, le=MAX_AUTOCOMPLETE_RESULTS),
+) -> Any:
+    """ Experiences, artists and cities whose name has a word starting with `q`, names starting with `q` first """
+    return CustomJSONResponse(autocomplete_index.search(q, limit))
@@ -0,0 +1,16 @@
+from enum import Enum
+from typing import Union
+
+from pydantic import BaseModel
+
+
+class SuggestionType(str, Enum):
+    experience = "experience"
+    artist = "artist"
+    city = "city"
+
+
+class AutocompleteSuggestion(BaseModel):
+    type: SuggestionType
+    id: Union[int, str]
+    label: str
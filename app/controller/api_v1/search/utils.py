@@ -0,0 +1,157 @@
+import threading
+import time
+from typing import Callable, Hashable, Iterable, List, Optional, Tuple, Union
+
+from app.config import config
+from app.controller.api_v1.search.schema import AutocompleteSuggestion, SuggestionType
+from app.dependencies.db import ReadSessionLocal
+from app.dependencies.logger import ApplicationLogger
+from app.dependencies.redis import redis_client
+from app.models.experience import Experience, ExperienceStatus
+from app.models.supplier import Supplier, SupplierType, SupplierStatus
+from app.utility.constants import AUTOCOMPLETE_EVENTS_KEY
+from app.utility.prefix_index import PrefixIndex
+
+logger = ApplicationLogger.get_logger(__name__)
+
+AUTOCOMPLETE_EVENTS_MAXLEN = 10000
+AUTOCOMPLETE_EVENTS_BATCH_SIZE = 1000
+
+
+def load_autocomplete_labels() -> List[Tuple[Tuple[str, Union[int, str]], str]]:
+    """ (type, id) keyed labels of approved experiences, approved artists and their cities """
+    db = ReadSessionLocal()
+    try:
+        experiences = db.query(Experience.id, Experience.title, Experience.normalized_venue_city).filter(
+            Experience.status == ExperienceStatus.approved
+        ).all()
+        artists = db.query(Supplier.id, Supplier.name, Supplier.normalized_city).filter(
+            Supplier.type == SupplierType.artist,
+            Supplier.status == SupplierStatus.approved
+        ).all()
+    finally:
+        db.close()
+
+    labels = []
+    cities = set()
+    for experience_id, title, city in experiences:
+        labels.append(((SuggestionType.experience.value, experience_id), title))
+        cities.add(city)
+    for artist_id, name, city in artists:
+        if name:
+            labels.append(((SuggestionType.artist.value, artist_id), name))
+        cities.add(city)
+    cities.discard(None)
+    labels.extend(((SuggestionType.city.value, city), city.title()) for city in cities)
+    return labels
+
+
+def publish_autocomplete_event(
+    suggestion_type: SuggestionType,
+    suggestion_id: Union[int, str],
+    label: Optional[str]
+) -> None:
+    """
+    Add, rename (label) or remove (no label) a suggestion in every worker's index.
+    Failures are only logged, the periodic rebuild picks up the change anyway
+    """
+    try:
+        redis_client.xadd(
+            AUTOCOMPLETE_EVENTS_KEY,
+            {"type": suggestion_type.value, "id": suggestion_id, "label": label or ""},
+            maxlen=AUTOCOMPLETE_EVENTS_MAXLEN,
+            approximate=True
+        )
+    except Exception as ex:
+        logger.error("Can't publish autocomplete event: %s", ex.__repr__())
+
+
+class AutocompleteIndex:
+    """
+    PrefixIndex kept in every worker: rebuilt from `loader` every refresh_seconds and in
+    between updated from the change events stream, polled at most every poll_seconds.
+    One thread rebuilds or polls while the others keep searching the current index.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Iterable[Tuple[Hashable, str]]],
+        refresh_seconds: int,
+        poll_seconds: float
+    ):
+        self.__loader = loader
+        self.__refresh_seconds = refresh_seconds
+        self.__poll_seconds = poll_seconds
+        self.__index: Optional[PrefixIndex] = None
+        self.__built_at = 0.0
+        self.__polled_at = 0.0
+        self.__last_event_id = "0-0"
+        self.__lock = threading.Lock()
+
+    def get_index(self) -> PrefixIndex:
+        now = time.monotonic()
+        if self.__index is None or now - self.__built_at > self.__refresh_seconds:
+            # first build blocks everyone, later ones only the thread which got the lock
+            if self.__lock.acquire(blocking=self.__index is None):
+                try:
+                    if self.__index is None or time.monotonic() - self.__built_at > self.__refresh_seconds:
+                        self.refresh()
+                except Exception as ex:
+                    if self.__index is None:
+                        raise ex
+                    logger.error("Can't refresh autocomplete index, serving previous one: %s", ex.__repr__())
+                    self.__built_at = time.monotonic()
+                finally:
+                    self.__lock.release()
+        elif now - self.__polled_at > self.__poll_seconds:
+            if self.__lock.acquire(blocking=False):
+                try:
+                    self.apply_events()
+                except Exception as ex:
+                    logger.error("Can't apply autocomplete events: %s", ex.__repr__())
+                finally:
+                    self.__polled_at = time.monotonic()
+                    self.__lock.release()
+        return self.__index
+
+    def refresh(self) -> None:
+        # events published while loading are replayed on top, applying them twice is harmless
+        try:
+            last_events = redis_client.xrevrange(AUTOCOMPLETE_EVENTS_KEY, count=1)
+            last_event_id = last_events[0][0] if last_events else "0-0"
+        except Exception as ex:
+            logger.error("Can't read autocomplete events: %s", ex.__repr__())
+            last_event_id = None
+
+        index = PrefixIndex(self.__loader())
+        self.__index = index
+        if last_event_id is not None:
+            self.__last_event_id = last_event_id
+        self.__built_at = self.__polled_at = time.monotonic()
+        logger.info("Autocomplete index rebuilt with %s labels", len(index))
+
+    def apply_events(self) -> None:
+        streams = redis_client.xread(
+            {AUTOCOMPLETE_EVENTS_KEY: self.__last_event_id}, count=AUTOCOMPLETE_EVENTS_BATCH_SIZE
+        )
+        for _, events in streams:
+            for event_id, event in events:
+                key = (event["type"], event["id"] if event["type"] == SuggestionType.city else int(event["id"]))
+                if event["label"]:
+                    self.__index.upsert(key, event["label"])
+                else:
+                    self.__index.remove(key)
+                self.__last_event_id = event_id
+
+    def search(self, prefix: str, limit: int) -> List[AutocompleteSuggestion]:
+        return [
+            AutocompleteSuggestion(type=suggestion_type, id=suggestion_id, label=label)
+            for (suggestion_type, suggestion_id), label in self.get_index().search(prefix, limit)
+        ]
+
+
+autocomplete_index = AutocompleteIndex(
+    load_autocomplete_labels,
+    refresh_seconds=config.AUTOCOMPLETE_REFRESH_SECONDS,
+    poll_seconds=config.AUTOCOMPLETE_POLL_SECONDS
+)
@@ -1,16 +1,34 @@
-from typing import Any, List
+from datetime import date
+from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, Request, Response
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
+from app.controller.api_v1.search.schema import SuggestionType
+from app.controller.api_v1.search.utils import publish_autocomplete_event
+from app.controller.api_v1.experience.documents import refresh_experience_documents
 from app.controller.api_v1.security.utils import get_password_hash
+from app.controller.api_v1.experience.utils import normalize_city
 from app.controller.api_v1.supplier.schema import (
     Supplier as SupplierResponse,
     SupplierComplete as SupplierCompleteResponse,
-    SupplierUpdate,
-    Artist as ArtistResponse
+    SupplierUpdate
+)
+from app.controller.api_v1.supplier.utils import (
+    artist_geo_index,
+    get_artist_ids,
+    get_host_experience_ids,
+    get_artist_filters,
+    get_artist_page,
+    get_nearby_artist_page,
+    get_artist_directory_cache_key,
+    get_cached_artist_directory_page,
+    set_cached_artist_directory_page,
+    invalidate_artist_directory,
+    get_artist_calendar
 )
 from app.dependencies.db import get_db
 from app.dependencies.logger import ApplicationLogger
@@ -20,8 +38,16 @@ from app.models.experience import Experience, ExperienceSlot, ExperienceStatus
 from app.models.supplier import Supplier, SupplierType, SupplierStatus
 from app.utility.auth import get_current_supplier
 from app.utility.cloud_storage import cs_utils, get_cloud_file_path
-from app.utility.constants import PROFILE_IMAGE_DIR
-from app.utility.response import CustomJSONResponse
+from app.utility.constants import (
+    PROFILE_IMAGE_DIR,
+    DEFAULT_NEARBY_RADIUS_KM,
+    MAX_NEARBY_RADIUS_KM,
+    MAX_NEARBY_RESULTS,
+    MAX_CALENDAR_DAYS
+)
+from app.utility.geo import parse_near
+from app.utility.http_cache import check_conditional_request, get_conditional_raw_response, get_version_etag
+from app.utility.response import CustomJSONResponse, get_raw_json_response
 from app.utility.router import RequestResponseLoggingRoute
 from app.utility.schema import UserCreate
 
@@ -62,10 +88,12 @@ def register_supplier(
 
 @router.get("/profile", response_class=CustomJSONResponse)
 def get_supplier_profile(
+    request: Request,
+    response: Response,
     supplier_id: int = Query(...),
     db: Session = Depends(get_db),
 ) -> Any:
-    """ Get Supplier Profile """
+    """ Get Supplier Profile, supports conditional requests (ETag / Last-Modified) """
     supplier = db.query(Supplier).filter(Supplier.id == supplier_id).first()
     if not supplier:
         raise HTTPException(
@@ -77,6 +105,14 @@ def get_supplier_profile(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User is inactive"
         )
+    not_modified_response = check_conditional_request(
+        request,
+        response,
+        etag=get_version_etag("supplier", supplier.id, supplier.updated_time.isoformat()),
+        last_modified=supplier.updated_time
+    )
+    if not_modified_response:
+        return not_modified_response
     return SupplierResponse(**supplier.__dict__)
 
 
@@ -107,10 +143,26 @@ def update_supplier_profile(
         if field in supplier_dict:
             setattr(supplier, field, supplier_dict[field])
 
+    if "city" in supplier_dict:
+        supplier.normalized_city = normalize_city(supplier.city)
+
     if supplier.status == SupplierStatus.created:
         supplier.status = SupplierStatus.approval_pending
 
+    if supplier.type == SupplierType.host:
+        refresh_experience_documents(get_host_experience_ids(supplier.id, db), db)
+
+    is_artist = supplier.type == SupplierType.artist
+    is_listed_artist = is_artist and supplier.status == SupplierStatus.approved
+    supplier_id, name, normalized_city = supplier.id, supplier.name, supplier.normalized_city
     db.commit()
+    if is_artist:
+        invalidate_artist_directory()
+    if is_listed_artist:
+        if "name" in supplier_dict:
+            publish_autocomplete_event(SuggestionType.artist, supplier_id, name)
+        if "city" in supplier_dict and normalized_city:
+            publish_autocomplete_event(SuggestionType.city, normalized_city, normalized_city.title())
     return "Supplier Profile updated successfully"
 
 
@@ -131,29 +183,98 @@ def update_supplier_profile_image(
         )
 
     supplier.profile_image = cloud_file_path
+    if supplier.type == SupplierType.host:
+        refresh_experience_documents(get_host_experience_ids(supplier.id, db), db)
+
+    is_artist = supplier.type == SupplierType.artist
     db.commit()
+    if is_artist:
+        invalidate_artist_directory()
 
     return "Image uploaded successfully"
 
 
 @router.get("/all_artists", response_class=CustomJSONResponse)
 def get_all_artists(
+    request: Request,
+    category: Optional[str] = Query(None),
+    city: Optional[str] = Query(None),
+    language: Optional[str] = Query(None),
+    min_price: Optional[int] = Query(None, ge=0),
+    max_price: Optional[int] = Query(None, ge=0),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(20, gt=0, le=100),
+    near: Optional[str] = Query(None, description="latitude,longitude"),
+    radius: float = Query(DEFAULT_NEARBY_RADIUS_KM, gt=0, le=MAX_NEARBY_RADIUS_KM, description="radius in km"),
     db: Session = Depends(get_db),
 ) -> Any:
-    """ Get All Artists """
-    artists: List[Supplier] = db.query(Supplier).filter(
-        Supplier.type == SupplierType.artist,
-        Supplier.status == SupplierStatus.approved
-    ).all()
-
-    resp = []
-    for artist in artists:
-        resp.append(ArtistResponse(
-            **artist.__dict__,
-            category=artist.primary_category
+    """
+    Get Artists page by page, pass `next_cursor` of the previous page as `cursor`.
+    With `near`, only artists within radius are returned, nearest first
+    """
+    filters = get_artist_filters(
+        category=category,
+        city=city,
+        language=language,
+        min_price=min_price,
+        max_price=max_price
+    )
+    if near:
+        latitude, longitude = parse_near(near)
+        distances = dict(artist_geo_index.query_radius(
+            latitude, longitude, radius, MAX_NEARBY_RESULTS, allowed_ids=get_artist_ids(filters, db)
         ))
+        page = get_nearby_artist_page(filters=filters, distances=distances, cursor=cursor, limit=limit, db=db)
+        return get_conditional_raw_response(request, get_raw_json_response(orjson.dumps(page)))
+
+    cache_key = None
+    try:
+        cache_key = get_artist_directory_cache_key({
+            "category": category,
+            "city": city,
+            "language": language,
+            "min_price": min_price,
+            "max_price": max_price,
+            "cursor": cursor,
+            "limit": limit,
+        })
+        cached_page = get_cached_artist_directory_page(cache_key)
+        if cached_page is not None:
+            return get_conditional_raw_response(request, get_raw_json_response(cached_page))
+    except Exception as ex:
+        logger.error("Can't read artist directory cache: %s", ex.__repr__())
+
+    page = orjson.dumps(get_artist_page(filters=filters, cursor=cursor, limit=limit, db=db))
+    if cache_key:
+        try:
+            set_cached_artist_directory_page(cache_key, page)
+        except Exception as ex:
+            logger.error("Can't write artist directory cache: %s", ex.__repr__())
+
+    return get_conditional_raw_response(request, get_raw_json_response(page))
+
+
+@router.get("/artist/calendar", response_class=CustomJSONResponse)
+def get_artist_availability_calendar(
+    artist_id: int = Query(...),
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Get per day availability (open, booked slots and price range) of an artist.
+    Months missing from the cache are read from the primary, a lagging replica read right after
+    a booking's invalidation would be cached for ARTIST_CALENDAR_CACHE_SECONDS
+    """
+    if end_date < start_date or (end_date - start_date).days >= MAX_CALENDAR_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range should be of at most {MAX_CALENDAR_DAYS} days"
+        )
+    return CustomJSONResponse(
+        get_artist_calendar(artist_id=artist_id, start_date=start_date, end_date=end_date, db=db)
+    )
 
-    return resp
 
 # @router.get("/bookings", response_class=CustomJSONResponse)
 # def get_supplier_bookings(
@@ -1,4 +1,5 @@
 import re
+from datetime import date
 from typing import Optional, Any
 
 from pydantic import BaseModel, EmailStr, Field, validator
@@ -17,6 +18,8 @@ class Supplier(BaseModel):
     city: Optional[str]
     state: Optional[str]
     country: Optional[str]
+    latitude: Optional[float]
+    longitude: Optional[float]
     language: Optional[str]
     status: SupplierStatus
     primary_category: Optional[str]
@@ -46,6 +49,8 @@ class SupplierUpdate(BaseModel):
     city: Optional[str] = Field(None, min_length=1)
     state: Optional[str] = Field(None, min_length=1)
     country: Optional[str] = Field(None, min_length=1)
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     language: Optional[str] = Field(None, min_length=1)
     aadhar_number: Optional[str] = Field(None, min_length=1)
     primary_category: Optional[str] = Field(None, min_length=1)
@@ -64,3 +69,12 @@ class SupplierUpdate(BaseModel):
 class Artist(Supplier):
     category: Optional[str]
     starting_price: Optional[int]
+    distance: Optional[float]
+
+
+class ArtistCalendarDay(BaseModel):
+    date: date
+    open_slots: int
+    booked_slots: int
+    min_price: Optional[float]
+    max_price: Optional[float]
@@ -0,0 +1,283 @@
+import base64
+import hashlib
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+import orjson
+import pytz
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import config
+from app.controller.api_v1.experience.utils import normalize_city
+from app.controller.api_v1.supplier.schema import Artist as ArtistResponse, ArtistCalendarDay
+from app.dependencies.db import ReadSessionLocal
+from app.dependencies.logger import ApplicationLogger
+from app.dependencies.redis import redis_client
+from app.models.artist_slot import ArtistSlot
+from app.models.experience import Experience
+from app.models.supplier import Supplier, SupplierType, SupplierStatus
+from app.utility.constants import ARTIST_DIRECTORY_PREFIX, ARTIST_CALENDAR_PREFIX
+from app.utility.geo import RefreshingGeoIndex
+
+logger = ApplicationLogger.get_logger(__name__)
+
+ARTIST_DIRECTORY_VERSION_KEY = ARTIST_DIRECTORY_PREFIX + "version"
+
+
+def load_artist_locations():
+    db = ReadSessionLocal()
+    try:
+        return db.query(Supplier.id, Supplier.latitude, Supplier.longitude).filter(
+            Supplier.type == SupplierType.artist,
+            Supplier.status == SupplierStatus.approved,
+            Supplier.latitude.isnot(None),
+            Supplier.longitude.isnot(None)
+        ).all()
+    finally:
+        db.close()
+
+
+artist_geo_index = RefreshingGeoIndex(load_artist_locations, config.GEO_INDEX_REFRESH_SECONDS)
+
+
+def get_host_experience_ids(host_id: int, db: Session) -> List[int]:
+    return [experience_id for experience_id, in db.query(Experience.id).filter(Experience.host_id == host_id).all()]
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps(position)).decode()
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        position = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(position, dict):
+            raise ValueError("cursor is not an object")
+        return position
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def get_artist_filters(
+    category: Optional[str],
+    city: Optional[str],
+    language: Optional[str],
+    min_price: Optional[int],
+    max_price: Optional[int],
+) -> list:
+    filters = [
+        Supplier.type == SupplierType.artist,
+        Supplier.status == SupplierStatus.approved
+    ]
+    if category:
+        filters.append(Supplier.primary_category == category)
+    if city:
+        filters.append(Supplier.normalized_city == normalize_city(city))
+    if language:
+        filters.append(func.lower(Supplier.language).contains(language.strip().lower(), autoescape=True))
+    if min_price is not None:
+        filters.append(Supplier.starting_price >= min_price)
+    if max_price is not None:
+        filters.append(Supplier.starting_price <= max_price)
+    return filters
+
+
+def get_artist_ids(filters: list, db: Session) -> List[int]:
+    return [artist_id for artist_id, in db.query(Supplier.id).filter(*filters).all()]
+
+
+def get_artist_page(
+    filters: list,
+    cursor: Optional[str],
+    limit: int,
+    db: Session,
+) -> Dict[str, Any]:
+    """ one page of artists ordered by id (keyset pagination) """
+    if cursor:
+        filters = filters + [Supplier.id > decode_cursor(cursor).get("id", 0)]
+    artists: List[Supplier] = db.query(Supplier).filter(*filters).order_by(Supplier.id).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(artists) > limit:
+        artists = artists[:limit]
+        next_cursor = encode_cursor({"id": artists[-1].id})
+
+    return {
+        "artists": [
+            ArtistResponse(**artist.__dict__, category=artist.primary_category).dict()
+            for artist in artists
+        ],
+        "next_cursor": next_cursor
+    }
+
+
+def get_nearby_artist_page(
+    filters: list,
+    distances: Dict[int, float],
+    cursor: Optional[str],
+    limit: int,
+    db: Session,
+) -> Dict[str, Any]:
+    """ one page of artists ordered by distance, the candidate list is bounded so offsets are cheap """
+    offset = decode_cursor(cursor).get("offset", 0) if cursor else 0
+    artists: List[Supplier] = db.query(Supplier).filter(*filters, Supplier.id.in_(list(distances))).all()
+    artists.sort(key=lambda artist: (distances[artist.id], artist.id))
+
+    next_cursor = None
+    if len(artists) > offset + limit:
+        next_cursor = encode_cursor({"offset": offset + limit})
+
+    return {
+        "artists": [
+            ArtistResponse(
+                **artist.__dict__,
+                category=artist.primary_category,
+                distance=distances[artist.id]
+            ).dict()
+            for artist in artists[offset:offset + limit]
+        ],
+        "next_cursor": next_cursor
+    }
+
+
+def get_artist_directory_cache_key(params: Dict[str, Any]) -> str:
+    version = redis_client.get(ARTIST_DIRECTORY_VERSION_KEY) or 0
+    digest = hashlib.md5(orjson.dumps(params, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    return f"{ARTIST_DIRECTORY_PREFIX}{version}:{digest}"
+
+
+def get_cached_artist_directory_page(cache_key: str) -> Optional[bytes]:
+    page = redis_client.get(cache_key)
+    return page.encode() if page is not None else None
+
+
+def set_cached_artist_directory_page(cache_key: str, page: bytes) -> None:
+    redis_client.set(cache_key, page, ex=config.ARTIST_DIRECTORY_CACHE_SECONDS)
+
+
+def invalidate_artist_directory() -> None:
+    """ bump the directory version, pages cached under older versions expire on their own """
+    try:
+        redis_client.incr(ARTIST_DIRECTORY_VERSION_KEY)
+    except Exception as ex:
+        logger.error("Can't invalidate artist directory cache: %s", ex.__repr__())
+
+
+def get_month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def get_next_month_start(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def get_artist_calendar_key(artist_id: int, month_start: date) -> str:
+    return f"{ARTIST_CALENDAR_PREFIX}{artist_id}:{month_start.strftime('%Y-%m')}"
+
+
+def load_artist_calendar(
+    artist_id: int,
+    start_month: date,
+    end_month: date,
+    db: Session
+) -> Dict[date, Dict[str, list]]:
+    """ per day [open slots, booked slots, min open price, max open price] of every month in range """
+    timezone = pytz.timezone(config.CALENDAR_TIMEZONE)
+    day = func.date(func.timezone(config.CALENDAR_TIMEZONE, ArtistSlot.start_time))
+    is_open = ArtistSlot.is_booked.is_(False)
+    rows = db.query(
+        day,
+        func.count().filter(is_open),
+        func.count().filter(ArtistSlot.is_booked.is_(True)),
+        func.min(ArtistSlot.price).filter(is_open),
+        func.max(ArtistSlot.price).filter(is_open),
+    ).filter(
+        ArtistSlot.artist_id == artist_id,
+        ArtistSlot.is_active.is_(True),
+        ArtistSlot.start_time >= timezone.localize(datetime.combine(start_month, datetime.min.time())),
+        ArtistSlot.start_time < timezone.localize(
+            datetime.combine(get_next_month_start(end_month), datetime.min.time())
+        ),
+    ).group_by(day).all()
+
+    months = {}
+    month = start_month
+    while month <= end_month:
+        months[month] = {}
+        month = get_next_month_start(month)
+    for slot_day, open_slots, booked_slots, min_price, max_price in rows:
+        months[get_month_start(slot_day)][slot_day.isoformat()] = [
+            open_slots,
+            booked_slots,
+            float(min_price) if min_price is not None else None,
+            float(max_price) if max_price is not None else None,
+        ]
+    return months
+
+
+def get_artist_calendar(
+    artist_id: int,
+    start_date: date,
+    end_date: date,
+    db: Session
+) -> List[ArtistCalendarDay]:
+    """ availability of days having slots in [start_date, end_date], cached per artist and month """
+    month_starts = []
+    month = get_month_start(start_date)
+    while month <= end_date:
+        month_starts.append(month)
+        month = get_next_month_start(month)
+
+    keys = [get_artist_calendar_key(artist_id, month) for month in month_starts]
+    try:
+        cached_months = redis_client.mget(keys)
+    except Exception as ex:
+        logger.error("Can't read artist calendar cache: %s", ex.__repr__())
+        cached_months = [None] * len(keys)
+
+    months = {
+        month: orjson.loads(cached_month)
+        for month, cached_month in zip(month_starts, cached_months) if cached_month is not None
+    }
+    missing = [month for month in month_starts if month not in months]
+    if missing:
+        loaded_months = load_artist_calendar(artist_id, missing[0], missing[-1], db)
+        try:
+            pipeline = redis_client.pipeline(transaction=False)
+            for month in missing:
+                pipeline.set(
+                    get_artist_calendar_key(artist_id, month),
+                    orjson.dumps(loaded_months[month]),
+                    ex=config.ARTIST_CALENDAR_CACHE_SECONDS
+                )
+            pipeline.execute()
+        except Exception as ex:
+            logger.error("Can't write artist calendar cache: %s", ex.__repr__())
+        months.update(loaded_months)
+
+    calendar = []
+    for month in month_starts:
+        for day, (open_slots, booked_slots, min_price, max_price) in sorted(months[month].items()):
+            if start_date.isoformat() <= day <= end_date.isoformat():
+                calendar.append(ArtistCalendarDay(
+                    date=day,
+                    open_slots=open_slots,
+                    booked_slots=booked_slots,
+                    min_price=min_price,
+                    max_price=max_price
+                ))
+    return calendar
+
+
+def invalidate_artist_calendar(artist_id: int, slot_start_time: datetime) -> None:
+    """ drop cached month of a slot, call after a slot is booked, added or changed """
+    month = get_month_start(slot_start_time.astimezone(pytz.timezone(config.CALENDAR_TIMEZONE)).date())
+    try:
+        redis_client.delete(get_artist_calendar_key(artist_id, month))
+    except Exception as ex:
+        logger.error("Can't invalidate artist calendar cache: %s", ex.__repr__())
@@ -1,9 +1,13 @@
-from typing import Generator
+from typing import Any, Dict, Generator
 
+from sqlalchemy.engine import Engine
 from sqlalchemy.engine.create import create_engine
 from sqlalchemy.orm.session import sessionmaker, Session
 
 from app.config import config
+from app.dependencies.metrics import InstrumentedQueuePool, instrument_engine
+from app.dependencies.provider import LazyProvider
+from app.dependencies.query_stats import instrument_query_stats
 
 ENGINE_OPTIONS = {
     "pool_pre_ping": True,
@@ -21,16 +25,44 @@ READ_DB_ENGINE_OPTIONS = {
     "pool_timeout": 30,
 }
 
-db_engine = create_engine(config.SQLALCHEMY_DATABASE_URI, **ENGINE_OPTIONS, echo=config.SQLALCHEMY_ECHO)
-read_db_engine = create_engine(config.SQLALCHEMY_READ_DATABASE_URI, **READ_DB_ENGINE_OPTIONS, echo=config.SQLALCHEMY_ECHO)
 
-SessionLocal = sessionmaker(
-    bind=db_engine,
+def create_db_engine(database_uri: str, engine_options: Dict[str, Any], engine_name: str) -> Engine:
+    engine = create_engine(
+        database_uri, **engine_options, poolclass=InstrumentedQueuePool, echo=config.SQLALCHEMY_ECHO
+    )
+    instrument_engine(engine, engine_name)
+    instrument_query_stats(engine)
+    return engine
+
+
+# created on first session, so in the worker process when the server forks workers
+db_engine_provider = LazyProvider(
+    lambda: create_db_engine(config.SQLALCHEMY_DATABASE_URI, ENGINE_OPTIONS, "primary")
+)
+read_db_engine_provider = LazyProvider(
+    lambda: create_db_engine(config.SQLALCHEMY_READ_DATABASE_URI, READ_DB_ENGINE_OPTIONS, "read")
+)
+
+
+class LazySessionMaker(sessionmaker):
+    """ sessionmaker binding its sessions to an engine created on first use """
+
+    def __init__(self, engine_provider: LazyProvider[Engine], **kwargs: Any):
+        super().__init__(**kwargs)
+        self.engine_provider = engine_provider
+
+    def __call__(self, **local_kw: Any) -> Session:
+        local_kw.setdefault("bind", self.engine_provider.get())
+        return super().__call__(**local_kw)
+
+
+SessionLocal = LazySessionMaker(
+    db_engine_provider,
     autocommit=False,
     autoflush=False,
 )
-ReadSessionLocal = sessionmaker(
-    bind=read_db_engine
+ReadSessionLocal = LazySessionMaker(
+    read_db_engine_provider
 )
 
 
@@ -1,78 +1,173 @@
+import atexit
 import logging
+import os
+import queue
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging import handlers
+from typing import Any, Dict, List, Optional
 
+import orjson
 from asgi_correlation_id import CorrelationIdFilter
 
+from app.config import config
+
+# Per request fields added to every record logged while serving it (route, user id). The dict is
+# shared, so values set from dependencies running in the threadpool are seen by the whole request
+log_context: ContextVar[Optional[Dict[str, Any]]] = ContextVar("log_context", default=None)
+
+# optional per record fields, passed with `extra=`
+EXTRA_FIELDS = ("route", "user_id", "status_code", "latency_ms", "db_queries", "db_ms")
+
+
+def set_log_context(**fields: Any) -> None:
+    """ add fields to records of the current request, no-op outside of a request """
+    context = log_context.get()
+    if context is not None:
+        context.update(fields)
+
+
+class LogContextFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = log_context.get()
+        if context:
+            for field, value in context.items():
+                if not hasattr(record, field):
+                    setattr(record, field, value)
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """ one JSON object per record, for the log shipper """
+
+    def format(self, record: logging.LogRecord) -> str:
+        log = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "line": record.lineno,
+            "process": record.process,
+            "correlation_id": getattr(record, "correlation_id", None),
+            "message": record.getMessage(),
+        }
+        for field in EXTRA_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                log[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            log["exception"] = record.exc_text
+        return orjson.dumps(log, default=str).decode()
+
+
+def get_formatter() -> logging.Formatter:
+    if config.LOG_FORMAT == "json":
+        return JSONFormatter()
+    return logging.Formatter(
+        "%(levelname)s: \t  %(asctime)s (%(processName)s[%(process)d]) -- %(name)s(%(lineno)d) "
+        "[%(correlation_id)s] -- %(message)s",
+        datefmt="%d-%b-%Y %I:%M:%S %p",
+    )
+
+
+class ContextQueueHandler(handlers.QueueHandler):
+    """
+    Only resolves what depends on the caller (message args, traceback) before queueing,
+    formatting and writing is left to the listener thread
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
 
 class ApplicationLogger:
+    """
+    Process wide logging pipeline: loggers of app modules propagate to the `app` logger whose only
+    handler puts records on a queue. A listener thread formats them (JSON by default) and writes
+    to stdout and, with LOG_FILE_PATH, a file rotated unless several processes write it (app.server
+    workers). Levels come from LOG_LEVEL and LOG_LEVELS.
+    A forked process (server worker) starts its own listener thread
+    """
+    ROOT_LOGGER_NAME = "app"
+
+    __queue_handler: Optional[handlers.QueueHandler] = None
+    __queue_listener: Optional[handlers.QueueListener] = None
+    __rotate_file = True
+    __lock = threading.Lock()
+
+    @classmethod
+    def __setup(cls) -> None:
+        log_queue = queue.SimpleQueue()
+        formatter = get_formatter()
+
+        output_handlers = [logging.StreamHandler()]
+        if config.LOG_FILE_PATH:
+            os.makedirs(os.path.dirname(config.LOG_FILE_PATH) or ".", exist_ok=True)
+            if cls.__rotate_file:
+                output_handlers.append(handlers.RotatingFileHandler(
+                    filename=config.LOG_FILE_PATH,
+                    maxBytes=config.LOG_FILE_MAX_BYTES,
+                    backupCount=config.LOG_FILE_BACKUP_COUNT
+                ))
+            else:
+                # reopened once an external rotation (logrotate, the log shipper) moved it away
+                output_handlers.append(handlers.WatchedFileHandler(filename=config.LOG_FILE_PATH))
+        for handler in output_handlers:
+            handler.setFormatter(formatter)
+
+        # correlation id and request context have to be read in the caller's context
+        queue_handler = ContextQueueHandler(log_queue)
+        queue_handler.addFilter(CorrelationIdFilter(uuid_length=32))
+        queue_handler.addFilter(LogContextFilter())
+
+        root_logger = logging.getLogger(cls.ROOT_LOGGER_NAME)
+        root_logger.setLevel(config.LOG_LEVEL)
+        root_logger.addHandler(queue_handler)
+        root_logger.propagate = False
+        for module_name, level in config.LOG_LEVELS.items():
+            logging.getLogger(module_name).setLevel(level)
+
+        cls.__queue_handler = queue_handler
+        cls.__start_listener(log_queue, output_handlers)
+        os.register_at_fork(after_in_child=cls.__restart_after_fork)
+
+    @classmethod
+    def __start_listener(cls, log_queue: queue.SimpleQueue, output_handlers: List[logging.Handler]) -> None:
+        cls.__queue_listener = handlers.QueueListener(log_queue, *output_handlers)
+        cls.__queue_listener.start()
+        atexit.register(cls.__queue_listener.stop)
+
+    @classmethod
+    def __restart_after_fork(cls) -> None:
+        """ threads do not survive a fork, records of the child would stay queued without a listener """
+        log_queue = queue.SimpleQueue()
+        cls.__queue_handler.queue = log_queue
+        cls.__start_listener(log_queue, list(cls.__queue_listener.handlers))
+
+    @classmethod
+    def disable_file_rotation(cls) -> None:
+        """
+        Write LOG_FILE_PATH without rotating it, for several processes appending to it whose
+        rollovers would rename the file under each other. Call it before the first get_logger
+        """
+        with cls.__lock:
+            if cls.__queue_listener is not None:
+                raise RuntimeError("Logging is already set up, disable file rotation before the first get_logger")
+            cls.__rotate_file = False
+
     @classmethod
     def get_logger(cls, module_name):
-        cid_filter = CorrelationIdFilter(uuid_length=32)
-        formatter = logging.Formatter(
-            "%(levelname)s: \t  %(asctime)s (%(processName)s[%(process)d]) -- %(name)s(%(lineno)d) "
-            "[%(correlation_id)s] -- %(message)s",
-            datefmt="%d-%b-%Y %I:%M:%S %p",
-        )
-
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        console_handler.addFilter(cid_filter)
-
-        logger = logging.getLogger(module_name)
-        logger.setLevel(logging.INFO)
-        logger.addHandler(console_handler)
-        logger.propagate = False
-
-        return logger
-
-
-# import logging
-# from logging import handlers
-# import os
-#
-# from asgi_correlation_id import CorrelationIdFilter
-#
-# from app.config import config
-#
-# LOG_FILE_PATH = config.LOG_FILE_DIR + '/file.log'
-# ERROR_LOG_FILE_PATH = config.LOG_FILE_DIR + '/error.log'
-
-
-# class ApplicationLogger:
-#     @classmethod
-#     def get_logger(cls, module_name):
-#         if not os.path.exists(config.LOG_FILE_DIR):
-#             os.makedirs(config.LOG_FILE_DIR)
-#
-#         cid_filter = CorrelationIdFilter(uuid_length=32)
-#         formatter = logging.Formatter(
-#             "%(levelname)s: \t  %(asctime)s (%(processName)s[%(process)d]) -- %(name)s(%(lineno)d) "
-#             "[%(correlation_id)s] -- %(message)s",
-#             datefmt="%d-%b-%Y %I:%M:%S %p",
-#         )
-#
-#         console_handler = logging.StreamHandler()
-#         console_handler.setFormatter(formatter)
-#         console_handler.addFilter(cid_filter)
-#
-#         all_log_handler = handlers.RotatingFileHandler(
-#             filename=LOG_FILE_PATH, mode="a", maxBytes=2000000, backupCount=5, encoding=None, delay=False
-#         )
-#         all_log_handler.setFormatter(formatter)
-#         all_log_handler.addFilter(cid_filter)
-#
-#         error_log_handler = handlers.RotatingFileHandler(
-#             filename=ERROR_LOG_FILE_PATH, mode="a", maxBytes=2000000, backupCount=3, encoding=None, delay=False
-#         )
-#         error_log_handler.setLevel(logging.ERROR)
-#         error_log_handler.setFormatter(formatter)
-#         error_log_handler.addFilter(cid_filter)
-#
-#         logger = logging.getLogger(module_name)
-#         logger.setLevel(logging.INFO)
-#         logger.addHandler(console_handler)
-#         logger.addHandler(all_log_handler)
-#         logger.addHandler(error_log_handler)
-#         logger.propagate = False
-#
-#         return logger
+        with cls.__lock:
+            if cls.__queue_listener is None:
+                cls.__setup()
 
+        if module_name == "__main__" or not module_name.startswith(cls.ROOT_LOGGER_NAME + "."):
+            module_name = f"{cls.ROOT_LOGGER_NAME}.{module_name}"
+        return logging.getLogger(module_name)
@@ -0,0 +1,141 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from app.dependencies.tracing import record_span, start_span
+
+# Metrics live in this process only, unless PROMETHEUS_MULTIPROC_DIR is set (it must be set before
+# start up and emptied between runs), then each worker writes its values to files in that
+# directory and /metrics aggregates all workers, whichever worker serves the scrape.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+FAST_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Request latency by route", ["method", "route"], buckets=LATENCY_BUCKETS
+)
+HTTP_REQUESTS = Counter(
+    "http_requests", "Requests by route and status code", ["method", "route", "status"]
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections", "Connections in use", ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections", "Connections opened beyond pool_size", ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds", "Time to get a connection from the pool", ["engine"], buckets=FAST_LATENCY_BUCKETS
+)
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds", "Redis command latency", ["command"], buckets=FAST_LATENCY_BUCKETS
+)
+EXTERNAL_CALL_DURATION = Histogram(
+    "external_call_duration_seconds", "Latency of calls to external services", ["service", "operation", "outcome"],
+    buckets=LATENCY_BUCKETS
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight_requests", "Requests admitted and not finished", ["route_class"], multiprocess_mode="livesum"
+)
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections", "Requests shed with 503", ["route_class", "reason"]
+)
+COMPRESSION_CACHE_LOOKUPS = Counter(
+    "compression_cache_lookups", "Lookups of compressed bodies of responses with an ETag", ["result"]
+)
+
+
+def get_metrics() -> bytes:
+    """ all metrics in prometheus text format """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def observe_request(method: str, route: str, status_code: int, duration: float) -> None:
+    HTTP_REQUEST_DURATION.labels(method, route).observe(duration)
+    HTTP_REQUESTS.labels(method, route, status_code).inc()
+
+
+@contextmanager
+def observe_external_call(service: str, operation: str) -> Iterator[None]:
+    """ latency metric and trace span of a call to an external service """
+    start_time = time.perf_counter()
+    outcome = "error"
+    try:
+        with start_span(f"{service} {operation}", service=service):
+            yield
+        outcome = "ok"
+    finally:
+        EXTERNAL_CALL_DURATION.labels(service, operation, outcome).observe(time.perf_counter() - start_time)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """ QueuePool recording how long getting a connection takes (waiting for a free one or connecting) """
+    engine_name = "default"
+
+    def _do_get(self):
+        start_time = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.labels(self.engine_name).observe(time.perf_counter() - start_time)
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.engine_name = self.engine_name
+        return pool
+
+
+def instrument_engine(engine: Engine, engine_name: str) -> None:
+    """ keep pool gauges of an engine created with InstrumentedQueuePool up to date, overflow as of last checkout """
+    engine.pool.engine_name = engine_name
+    checked_out = DB_POOL_CHECKED_OUT.labels(engine_name)
+    overflow = DB_POOL_OVERFLOW.labels(engine_name)
+
+    def on_checkout(*args) -> None:
+        checked_out.inc()
+        overflow.set(max(engine.pool.overflow(), 0))
+
+    def on_checkin(*args) -> None:
+        checked_out.dec()
+
+    event.listen(engine, "checkout", on_checkout)
+    event.listen(engine, "checkin", on_checkin)
+
+
+def instrument_boto3_client(client, service: str) -> None:
+    """ record latency (and a span) of every API call a boto3 client makes, per operation """
+
+    def before_call(model, context, **kwargs) -> None:
+        context["metrics_call"] = (model.name, time.perf_counter())
+
+    # also handles after-call-error (raised calls), which has no http_response
+    def after_call(context, http_response=None, **kwargs) -> None:
+        call = context.pop("metrics_call", None)
+        if call is None:
+            return
+        operation, start_time = call
+        failed = http_response is None or http_response.status_code >= 400
+        duration = time.perf_counter() - start_time
+        EXTERNAL_CALL_DURATION.labels(service, operation, "error" if failed else "ok").observe(duration)
+        record_span(f"{service} {operation}", duration, error=failed, service=service)
+
+    client.meta.events.register("before-call", before_call)
+    client.meta.events.register("after-call", after_call)
+    client.meta.events.register("after-call-error", after_call)
@@ -0,0 +1,120 @@
+import cProfile
+import functools
+import glob
+import inspect
+import io
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+from asgi_correlation_id import correlation_id
+
+from app.config import config
+from app.dependencies.logger import ApplicationLogger
+
+logger = ApplicationLogger.get_logger(__name__)
+
+# Requests are profiled with cProfile when an admin asks for it (X-Profile header or _profile
+# query param) or, with PROFILE_SAMPLE_RATE, for a share of traffic limited to
+# PROFILE_MAX_PER_MINUTE per worker. The endpoint function is profiled in the thread running it.
+# One request is profiled at a time per worker, others run unprofiled meanwhile. Profiles are saved
+# in PROFILE_DIR as <request id>.prof (pstats format, e.g. for snakeviz), the newest
+# PROFILE_MAX_FILES are kept.
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-fA-F-]{1,64}$")
+
+request_profile: ContextVar[Optional[cProfile.Profile]] = ContextVar("request_profile", default=None)
+
+profile_lock = threading.Lock()
+sampled_profile_times = deque()
+sampled_profile_lock = threading.Lock()
+
+
+def is_sampled() -> bool:
+    """ whether to profile this request in continuous sampling mode, within PROFILE_MAX_PER_MINUTE """
+    if config.PROFILE_SAMPLE_RATE <= 0 or random.random() >= config.PROFILE_SAMPLE_RATE:
+        return False
+    now = time.monotonic()
+    with sampled_profile_lock:
+        while sampled_profile_times and now - sampled_profile_times[0] > 60:
+            sampled_profile_times.popleft()
+        if len(sampled_profile_times) >= config.PROFILE_MAX_PER_MINUTE:
+            return False
+        sampled_profile_times.append(now)
+        return True
+
+
+def get_profile_path(profile_id: str) -> str:
+    return os.path.join(config.PROFILE_DIR, f"{profile_id}.prof")
+
+
+@contextmanager
+def profile_request(requested: bool) -> Iterator[Optional[str]]:
+    """ profile the endpoint called within the block if requested or sampled, yields the profile id """
+    if not (requested or is_sampled()) or not profile_lock.acquire(blocking=False):
+        yield None
+        return
+
+    profile_id = correlation_id.get() or uuid.uuid4().hex
+    profile = cProfile.Profile()
+    token = request_profile.set(profile)
+    try:
+        yield profile_id
+    finally:
+        request_profile.reset(token)
+        profile_lock.release()
+        try:
+            save_profile(profile, profile_id)
+        except Exception as ex:
+            logger.error("Error saving profile: %s", ex.__repr__())
+
+
+def save_profile(profile: cProfile.Profile, profile_id: str) -> None:
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    profile.dump_stats(get_profile_path(profile_id))
+    logger.info("Request profiled, profile id %s", profile_id)
+
+    profile_paths = sorted(glob.glob(os.path.join(config.PROFILE_DIR, "*.prof")), key=os.path.getmtime)
+    for path in profile_paths[:-config.PROFILE_MAX_FILES]:
+        os.remove(path)
+
+
+def get_profile_summary(profile_id: str, no_of_functions: int = 50) -> str:
+    """ functions of a saved profile by cumulative time, as text """
+    output = io.StringIO()
+    stats = pstats.Stats(get_profile_path(profile_id), stream=output)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(no_of_functions)
+    return output.getvalue()
+
+
+def profiled(endpoint: Callable) -> Callable:
+    """ endpoint running under the request's profiler, if any. Signature is kept for FastAPI """
+    if inspect.iscoroutinefunction(endpoint):
+        # async endpoints run on the event loop, their profile includes other requests served meanwhile
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            profile = request_profile.get()
+            if profile is None:
+                return await endpoint(*args, **kwargs)
+            profile.enable()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                profile.disable()
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        profile = request_profile.get()
+        if profile is None:
+            return endpoint(*args, **kwargs)
+        return profile.runcall(endpoint, *args, **kwargs)
+    return wrapper
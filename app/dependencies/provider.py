@@ -0,0 +1,29 @@
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LazyProvider(Generic[T]):
+    """
+    Creates an object (engine, client) on first use instead of at import, once even when
+    first used from several threads at the same time
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self.__factory = factory
+        self.__instance: Optional[T] = None
+        self.__lock = threading.Lock()
+
+    def get(self) -> T:
+        instance = self.__instance
+        if instance is None:
+            with self.__lock:
+                if self.__instance is None:
+                    self.__instance = self.__factory()
+                instance = self.__instance
+        return instance
+
+    @property
+    def is_created(self) -> bool:
+        return self.__instance is not None
@@ -0,0 +1,116 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import config
+from app.dependencies.logger import ApplicationLogger
+from app.dependencies.tracing import record_span
+
+logger = ApplicationLogger.get_logger(__name__)
+
+MAX_LOGGED_PARAMETERS_LENGTH = 500
+MAX_TRACED_STATEMENT_LENGTH = 1000
+
+
+class QueryStats:
+    """ SQL statements executed while serving one request (or inside track_queries) """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def add(self, other: "QueryStats") -> None:
+        self.count += other.count
+        self.duration += other.duration
+        self.statements.update(other.statements)
+
+    def get_repeated_statements(self, threshold: int) -> List[Tuple[str, int]]:
+        """ statements executed at least threshold times, usually lazy loads in a loop (N+1) """
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+# The stats object is shared, so statements run from threadpool code are counted for the request
+query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def instrument_query_stats(engine: Engine) -> None:
+    """
+    count statements and time of an engine into the current QueryStats, log slow statements
+    and add a span per statement to the current trace
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        duration = time.perf_counter() - conn.info["query_start_times"].pop()
+        stats = query_stats.get()
+        if stats is not None:
+            stats.record(statement, duration)
+        record_span("sql", duration, statement=statement[:MAX_TRACED_STATEMENT_LENGTH])
+        if duration * 1000 >= config.SLOW_QUERY_THRESHOLD_MS:
+            logger.warning(
+                "Slow query %.1fms: %s parameters: %.*s",
+                duration * 1000, statement, MAX_LOGGED_PARAMETERS_LENGTH, repr(parameters)
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context) -> None:
+        start_times = exception_context.connection.info.get("query_start_times") \
+            if exception_context.connection is not None else None
+        if start_times:
+            start_times.pop()
+
+
+def log_repeated_statements(stats: QueryStats) -> None:
+    for statement, count in stats.get_repeated_statements(config.N_PLUS_ONE_THRESHOLD):
+        logger.warning("Possible N+1, statement executed %s times: %s", count, statement)
+
+
+def get_server_timing(stats: QueryStats, total_duration: float) -> str:
+    """ Server-Timing header value, shown by browser dev tools """
+    return (
+        f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", '
+        f"app;dur={total_duration * 1000:.1f}"
+    )
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    collect statements executed inside the block, e.g. in tests or jobs. Requests served inside
+    the block count their statements on their own stats and add them to these when done
+    """
+    stats = QueryStats()
+    token = query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        query_stats.reset(token)
+
+
+@contextmanager
+def assert_query_budget(max_queries: int) -> Iterator[QueryStats]:
+    """
+    Fail if the block executes more than max_queries statements, for tests, e.g.
+        with assert_query_budget(3):
+            client.get("/api/v1/experience?experience_id=1")
+    """
+    with track_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        statements = "\n".join(f"{count} x {statement}" for statement, count in stats.statements.most_common())
+        raise AssertionError(f"{stats.count} queries executed, budget is {max_queries}:\n{statements}")
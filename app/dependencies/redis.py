@@ -1,8 +1,43 @@
+import time
+
 from redis import Redis
+from redis.client import Pipeline
 
 from app.config import config
+from app.dependencies.metrics import REDIS_COMMAND_DURATION
+from app.dependencies.tracing import record_span
+
+
+class InstrumentedPipeline(Pipeline):
+    def execute(self, raise_on_error=True):
+        no_of_commands = len(self.command_stack)
+        start_time = time.perf_counter()
+        try:
+            return super().execute(raise_on_error)
+        finally:
+            duration = time.perf_counter() - start_time
+            REDIS_COMMAND_DURATION.labels("PIPELINE").observe(duration)
+            record_span("redis PIPELINE", duration, commands=no_of_commands)
+
+
+class InstrumentedRedis(Redis):
+    """ Redis client recording latency (and a span) of each command, pipelines as one PIPELINE command """
+
+    def execute_command(self, *args, **options):
+        start_time = time.perf_counter()
+        try:
+            return super().execute_command(*args, **options)
+        finally:
+            duration = time.perf_counter() - start_time
+            command = str(args[0]).upper()
+            REDIS_COMMAND_DURATION.labels(command).observe(duration)
+            record_span(f"redis {command}", duration)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
 
-redis_client = Redis(
+redis_client = InstrumentedRedis(
     decode_responses=True,
     host=config.REDIS_SERVER,
     port=config.REDIS_PORT,
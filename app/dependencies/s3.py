@@ -1,22 +1,31 @@
 import traceback
-import boto3
 
 from app.config import config
 from app.dependencies.logger import ApplicationLogger
+from app.dependencies.metrics import instrument_boto3_client
+from app.dependencies.provider import LazyProvider
 
 logger = ApplicationLogger.get_logger(__name__)
 
 
 class S3Utils:
-    """ utility class for s3 """
-    __client = None
+    """ utility class for s3, the client is created on first upload """
 
     def __init__(self):
-        self.__client = boto3.client(
+        self.__client = LazyProvider(self.__create_client)
+
+    @staticmethod
+    def __create_client():
+        # boto3 takes long to import, so it is only imported when needed
+        import boto3
+
+        client = boto3.client(
             service_name="s3",
             aws_access_key_id=config.AWS_ACCESS_KEY_ID,
             aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY
         )
+        instrument_boto3_client(client, "s3")
+        return client
 
     def upload_file(
         self,
@@ -26,7 +35,7 @@ class S3Utils:
     ) -> bool:
         """ Uploads file to AWS S3 """
         try:
-            self.__client.upload_file(local_file_path, bucket_name, cloud_file_path)
+            self.__client.get().upload_file(local_file_path, bucket_name, cloud_file_path)
 
         except Exception:
             logger.error("Can't upload file")
@@ -43,7 +52,7 @@ class S3Utils:
     ) -> bool:
         """ Uploads file obj to AWS S3 """
         try:
-            self.__client.upload_fileobj(file, bucket_name, cloud_file_path)
+            self.__client.get().upload_fileobj(file, bucket_name, cloud_file_path)
 
         except Exception:
             logger.error("Can't upload file")
@@ -2,25 +2,32 @@ import json
 from email.mime.multipart import MIMEMultipart
 from typing import List
 
-import boto3
-
 from app.config import config
 from app.dependencies.logger import ApplicationLogger
+from app.dependencies.metrics import instrument_boto3_client
+from app.dependencies.provider import LazyProvider
 
 logger = ApplicationLogger.get_logger(__name__)
 
 
 class SESUtils:
-    """ utility class for SES """
-    __client = None
+    """ utility class for SES, the client is created on first email """
 
     def __init__(self):
-        self.__client = boto3.client(
+        self.__client = LazyProvider(self.__create_client)
+
+    @staticmethod
+    def __create_client():
+        import boto3
+
+        client = boto3.client(
             service_name="ses",
             aws_access_key_id=config.AWS_ACCESS_KEY_ID,
             aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
             region_name="ap-south-1"
         )
+        instrument_boto3_client(client, "ses")
+        return client
 
     def send_email(
         self,
@@ -28,7 +35,7 @@ class SESUtils:
         source_email: str,
         destination_emails: List[str]
     ) -> None:
-        response = self.__client.send_raw_email(
+        response = self.__client.get().send_raw_email(
             Source=source_email,
             Destinations=destination_emails,
             RawMessage={"Data": email_message.as_string()}
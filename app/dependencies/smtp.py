@@ -4,6 +4,7 @@ from typing import List
 
 from app.config import config
 from app.dependencies.logger import ApplicationLogger
+from app.dependencies.metrics import observe_external_call
 
 logger = ApplicationLogger.get_logger(__name__)
 
@@ -21,14 +22,15 @@ class SMTPUtils:
         source_email: str,
         destination_emails: List[str]
     ) -> None:
-        smtp_session = smtplib.SMTP('smtp.gmail.com', 587)
+        with observe_external_call("smtp", "send_email"):
+            smtp_session = smtplib.SMTP('smtp.gmail.com', 587)
 
-        smtp_session.starttls()
-        smtp_session.login(source_email, self.__email_password)
+            smtp_session.starttls()
+            smtp_session.login(source_email, self.__email_password)
 
-        text = email_message.as_string()
-        smtp_session.sendmail(source_email, destination_emails, text)
-        smtp_session.quit()
+            text = email_message.as_string()
+            smtp_session.sendmail(source_email, destination_emails, text)
+            smtp_session.quit()
 
         logger.info("Email sent to %s", ", ".join(destination_emails))
 
@@ -0,0 +1,230 @@
+import atexit
+import os
+import queue
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+import orjson
+import requests
+from asgi_correlation_id import correlation_id
+
+from app.config import config
+from app.dependencies.logger import ApplicationLogger
+
+logger = ApplicationLogger.get_logger(__name__)
+
+# Spans of a request are only recorded with a TRACE_EXPORTER configured. The request span is the
+# root, SQL statements, Redis commands, boto3 calls and external calls (payment gateway, SMTP) are
+# its children. Once the request ends its trace is exported if sampled (TRACE_SAMPLE_RATE) or
+# slower than TRACE_SLOW_REQUEST_MS, by a background thread so requests never wait on the export.
+# Trace id is the request's correlation id, so a trace can be found from any log line.
+
+MAX_SPANS_PER_TRACE = 1000
+EXPORT_BATCH_SIZE = 100
+HEX_TRACE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_time", "end_time", "attributes", "error")
+
+    def __init__(self, trace_id: str, name: str, parent_id: Optional[str] = None, start_time: Optional[int] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start_time = start_time or time.time_ns()
+        self.end_time: Optional[int] = None
+        self.attributes = attributes or {}
+        self.error = False
+
+    def end(self) -> None:
+        self.end_time = time.time_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_time or time.time_ns()) - self.start_time) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration_ms, 3),
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 2 if self.parent_id is None else 3,  # SERVER, CLIENT
+            "startTimeUnixNano": str(self.start_time),
+            "endTimeUnixNano": str(self.end_time),
+            "attributes": [get_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": 2 if self.error else 1},  # ERROR, OK
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def get_otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class Trace:
+    """ finished spans of one request, shared with the threadpool like the log context """
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+
+    def add(self, span: Span) -> None:
+        if len(self.spans) < MAX_SPANS_PER_TRACE:
+            self.spans.append(span)
+
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def get_trace_id() -> str:
+    request_id = (correlation_id.get() or "").replace("-", "").lower()
+    return request_id if HEX_TRACE_ID.match(request_id) else uuid.uuid4().hex
+
+
+@contextmanager
+def trace_request(name: str, attributes: Dict[str, Any]) -> Iterator[Optional[Span]]:
+    """ root span of a request, yields None when tracing is off. The caller sets its status """
+    if not config.TRACE_EXPORTER:
+        yield None
+        return
+
+    trace = Trace(get_trace_id())
+    span = Span(trace.trace_id, name, attributes=attributes)
+    trace_token = current_trace.set(trace)
+    span_token = current_span.set(span)
+    try:
+        yield span
+    finally:
+        span.end()
+        trace.add(span)
+        current_span.reset(span_token)
+        current_trace.reset(trace_token)
+        if span.duration_ms >= config.TRACE_SLOW_REQUEST_MS or random.random() < config.TRACE_SAMPLE_RATE:
+            span_exporter.export(trace.spans)
+
+
+@contextmanager
+def start_span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """ child span of the current one around a block, no-op outside of a traced request """
+    trace, parent = current_trace.get(), current_span.get()
+    if trace is None:
+        yield None
+        return
+
+    span = Span(trace.trace_id, name, parent_id=parent.span_id if parent else None, attributes=attributes)
+    token = current_span.set(span)
+    try:
+        yield span
+    except Exception:
+        span.error = True
+        raise
+    finally:
+        span.end()
+        trace.add(span)
+        current_span.reset(token)
+
+
+def record_span(name: str, duration: float, error: bool = False, **attributes: Any) -> None:
+    """ child span of the current one for an operation which just finished, timed by the caller (event hooks) """
+    trace = current_trace.get()
+    if trace is None:
+        return
+    parent = current_span.get()
+    end_time = time.time_ns()
+    span = Span(
+        trace.trace_id, name, parent_id=parent.span_id if parent else None,
+        start_time=end_time - int(duration * 1e9), attributes=attributes
+    )
+    span.end_time = end_time
+    span.error = error
+    trace.add(span)
+
+
+class SpanExporter:
+    """ writes finished traces from a background thread, started in the process which exports first """
+
+    def __init__(self):
+        self.queue = queue.SimpleQueue()
+        self.thread: Optional[threading.Thread] = None
+        self.pid: Optional[int] = None
+        self.lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        if self.pid != os.getpid():
+            with self.lock:
+                if self.pid != os.getpid():
+                    # a forked worker does not inherit the parent's thread
+                    self.queue = queue.SimpleQueue()
+                    self.thread = threading.Thread(target=self.run, name="span-exporter", daemon=True)
+                    self.thread.start()
+                    self.pid = os.getpid()
+                    atexit.register(self.stop)
+        self.queue.put(spans)
+
+    def stop(self) -> None:
+        self.queue.put(None)
+        self.thread.join(timeout=5)
+
+    def run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < EXPORT_BATCH_SIZE and not self.queue.empty():
+                batch.append(self.queue.get())
+            stopped = None in batch
+            spans = [span for spans in batch if spans is not None for span in spans]
+            if spans:
+                try:
+                    self.write(spans)
+                except Exception as ex:
+                    logger.error("Trace export failed: %s", ex.__repr__())
+            if stopped:
+                return
+
+    def write(self, spans: List[Span]) -> None:
+        if config.TRACE_EXPORTER == "otlp":
+            # OTLP/HTTP JSON, accepted by an OpenTelemetry collector or compatible backend
+            requests.post(
+                config.TRACE_OTLP_ENDPOINT,
+                data=orjson.dumps({"resourceSpans": [{
+                    "resource": {"attributes": [get_otlp_attribute("service.name", config.PROJECT_NAME)]},
+                    "scopeSpans": [{"scope": {"name": "app"}, "spans": [span.to_otlp() for span in spans]}],
+                }]}),
+                headers={"Content-Type": "application/json"},
+                timeout=5,
+            ).raise_for_status()
+        else:
+            os.makedirs(os.path.dirname(config.TRACE_FILE_PATH) or ".", exist_ok=True)
+            with open(config.TRACE_FILE_PATH, "ab") as f:
+                f.write(b"".join(orjson.dumps(span.to_dict(), default=str) + b"\n" for span in spans))
+
+
+span_exporter = SpanExporter()
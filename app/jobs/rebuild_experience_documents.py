@@ -0,0 +1,11 @@
+from app.controller.api_v1.experience.documents import rebuild_experience_documents
+from app.dependencies.db import SessionLocal
+# models the mapped relationships refer to, which the documents module doesn't import
+from app.models import artist_slot, category, payment, supplier  # noqa: F401
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        rebuild_experience_documents(db)
+    finally:
+        db.close()
@@ -2,7 +2,6 @@ from fastapi import FastAPI
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 
 # from fastapi.testclient import TestClient
@@ -12,12 +11,16 @@ from asgi_correlation_id import CorrelationIdMiddleware, correlation_id
 from app.config import config
 from app.controller.api_v1.api import api_router
 from app.dependencies.logger import ApplicationLogger
+from app.utility.admission import AdmissionControlMiddleware
+from app.utility.compression import CompressionMiddleware
 
 logger = ApplicationLogger.get_logger(__name__)
 
 app = FastAPI(title=config.PROJECT_NAME, docs_url=f"{config.API_V1_PREFIX}/docs")
+# innermost, so shed requests still get a request id and CORS headers
+app.add_middleware(AdmissionControlMiddleware)
 app.add_middleware(CorrelationIdMiddleware)
-app.add_middleware(GZipMiddleware, minimum_size=config.MINIMUM_SIZE_FOR_COMPRESSION)
+app.add_middleware(CompressionMiddleware, minimum_size=config.MINIMUM_SIZE_FOR_COMPRESSION)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[str(origin) for origin in config.BACKEND_CORS_ORIGINS],
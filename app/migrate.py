@@ -0,0 +1,159 @@
+import argparse
+import itertools
+import os
+import re
+import time
+from typing import List, NamedTuple
+
+from app.dependencies.db import db_engine_provider
+from app.dependencies.logger import ApplicationLogger
+
+logger = ApplicationLogger.get_logger(__name__)
+
+# Versioned schema migrations: sql_scripts/<version>_<name>.sql, applied in version order, each once.
+# Applied versions are recorded in schema_migration. A migration runs in one transaction, unless its
+# first line is NO_TRANSACTION_MARKER: then its statements run one by one outside a transaction,
+# as `create index concurrently` (which does not block writes) requires. Those should be idempotent
+# (`if not exists`), a failed one is rerun from its first statement.
+# A concurrent migrator waits for an advisory lock by polling it between transactions: waiting inside a
+# statement would hold a snapshot, which `create index concurrently` of the holder waits for (a deadlock).
+#
+#   python -m app.migrate
+#   python -m app.migrate --baseline 6    # database set up by running the scripts by hand
+
+MIGRATIONS_DIR = "sql_scripts"
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d{4})_(\w+)\.sql$")
+NO_TRANSACTION_MARKER = "-- migrate: no-transaction"
+MIGRATION_LOCK_ID = 7355608
+MIGRATION_LOCK_POLL_SECONDS = 1
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    path: str
+
+
+def get_migrations() -> List[Migration]:
+    migrations = []
+    for file_name in os.listdir(MIGRATIONS_DIR):
+        match = MIGRATION_FILE_PATTERN.match(file_name)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), os.path.join(MIGRATIONS_DIR, file_name)))
+    migrations.sort()
+    versions = [migration.version for migration in migrations]
+    if len(set(versions)) != len(versions):
+        raise ValueError("Duplicate migration versions in " + MIGRATIONS_DIR)
+    return migrations
+
+
+def get_statements(sql: str) -> List[str]:
+    """ statements of a script, which must end with ';' at the end of a line """
+    statements = []
+    for statement in re.split(r";\s*$", sql, flags=re.MULTILINE):
+        lines = [line for line in statement.splitlines() if line.strip() and not line.strip().startswith("--")]
+        if lines:
+            statements.append("\n".join(lines))
+    return statements
+
+
+def get_invalid_indexes(cursor) -> List[str]:
+    cursor.execute(
+        "SELECT indexrelid::regclass::text FROM pg_index "
+        "JOIN pg_class ON pg_class.oid = pg_index.indrelid "
+        "JOIN pg_namespace ON pg_namespace.oid = pg_class.relnamespace "
+        "WHERE NOT indisvalid AND nspname = current_schema()"
+    )
+    return [index_name for index_name, in cursor.fetchall()]
+
+
+def apply_migration(connection, migration: Migration) -> None:
+    with open(migration.path) as migration_file:
+        sql = migration_file.read()
+    cursor = connection.cursor()
+    if sql.startswith(NO_TRANSACTION_MARKER):
+        connection.autocommit = True
+        try:
+            # `if not exists` would skip an index left invalid by a failed concurrent build
+            invalid_indexes = get_invalid_indexes(cursor)
+            if invalid_indexes:
+                raise RuntimeError(
+                    f"Invalid indexes {', '.join(invalid_indexes)}, left by a failed concurrent build or "
+                    "still being built: drop them with `drop index concurrently` and rerun"
+                )
+            for statement in get_statements(sql):
+                cursor.execute(statement)
+        finally:
+            connection.autocommit = False
+    else:
+        cursor.execute(sql)
+    cursor.execute(
+        "INSERT INTO schema_migration (version, name) VALUES (%s, %s)", (migration.version, migration.name)
+    )
+    connection.commit()
+
+
+def acquire_migration_lock(cursor) -> None:
+    """ session advisory lock of MIGRATION_LOCK_ID, polled in autocommit mode so no snapshot is held meanwhile """
+    for attempt in itertools.count():
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+        if cursor.fetchone()[0]:
+            return
+        if attempt == 0:
+            logger.info("Waiting for another migrator to finish")
+        time.sleep(MIGRATION_LOCK_POLL_SECONDS)
+
+
+def migrate(baseline: int = 0) -> None:
+    """ apply pending migrations, versions up to `baseline` are recorded as applied without running them """
+    pooled_connection = db_engine_provider.get().raw_connection()
+    # closed instead of returned to the pool, which releases the advisory lock
+    pooled_connection.detach()
+    connection = pooled_connection.dbapi_connection
+    try:
+        connection.autocommit = True
+        cursor = connection.cursor()
+        acquire_migration_lock(cursor)
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migration ("
+            "version integer PRIMARY KEY, "
+            "name varchar(100) NOT NULL, "
+            "applied_time timestamp with time zone DEFAULT now() NOT NULL)"
+        )
+        cursor.execute("SELECT version FROM schema_migration")
+        applied_versions = {version for version, in cursor.fetchall()}
+        connection.autocommit = False
+
+        for migration in get_migrations():
+            if migration.version in applied_versions:
+                continue
+            if migration.version <= baseline:
+                logger.info("Recording migration %04d_%s as applied", migration.version, migration.name)
+                cursor.execute(
+                    "INSERT INTO schema_migration (version, name) VALUES (%s, %s)",
+                    (migration.version, migration.name)
+                )
+                connection.commit()
+                continue
+            logger.info("Applying migration %04d_%s", migration.version, migration.name)
+            try:
+                apply_migration(connection, migration)
+            except Exception as ex:
+                connection.rollback()
+                logger.error("Migration %04d_%s failed: %s", migration.version, migration.name, ex.__repr__())
+                raise
+        logger.info("Database schema is up to date")
+    finally:
+        pooled_connection.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=f"Apply pending migrations from {MIGRATIONS_DIR}")
+    parser.add_argument("--baseline", type=int, default=0,
+                        help="record versions up to this one as applied, for databases set up by hand")
+    args = parser.parse_args()
+    migrate(args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, INT, NUMERIC, TEXT, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, INT, NUMERIC, TEXT, String, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.expression import true, false, text
 
@@ -6,6 +6,10 @@ from app.models import BaseModel
 
 
 class ArtistSlot(BaseModel):
+    __table_args__ = (
+        Index("ix_artist_slot_artist_id_start_time", "artist_id", "start_time", postgresql_where=text("is_active")),
+    )
+
     id = Column(INT, primary_key=True, autoincrement=True, nullable=False)
     artist_id = Column(INT, ForeignKey("supplier.id"), nullable=False)
     price = Column(NUMERIC(10, 2), nullable=False)
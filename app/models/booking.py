@@ -30,8 +30,8 @@ class Booking(BaseModel):
     id = Column(BIGINT, primary_key=True, autoincrement=True, nullable=False)
     booking_uuid = Column(String(30), unique=True, nullable=False)
     booking_type = Column(Enum(BookingType), nullable=False)
-    customer_id = Column(BIGINT, ForeignKey("customer.id"), nullable=False)
-    supplier_id = Column(INT, ForeignKey("supplier.id"), nullable=False)
+    customer_id = Column(BIGINT, ForeignKey("customer.id"), nullable=False, index=True)
+    supplier_id = Column(INT, ForeignKey("supplier.id"), nullable=False, index=True)
     experience_slot_id = Column(BIGINT, ForeignKey("experience_slot.id"))
     artist_slot_id = Column(BIGINT, ForeignKey("artist_slot.id"))
     no_of_guests = Column(INT, nullable=False)
@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import Column, BIGINT, INT, TEXT, NUMERIC, Enum, String, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, BIGINT, INT, TEXT, NUMERIC, Enum, String, ForeignKey, Boolean, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.expression import true, false, text
 
@@ -20,7 +20,7 @@ class ExperienceStatus(str, enum.Enum):
 
 class ExperienceImage(BaseModel):
     id = Column(BIGINT, primary_key=True, autoincrement=True, nullable=False)
-    experience_id = Column(INT, ForeignKey("experience.id"), nullable=False)
+    experience_id = Column(INT, ForeignKey("experience.id"), nullable=False, index=True)
     url = Column(String(255), nullable=False)
     is_active = Column(Boolean(), server_default=true(), nullable=False)
 
@@ -29,6 +29,10 @@ class ExperienceImage(BaseModel):
 
 
 class ExperienceSlot(BaseModel):
+    __table_args__ = (
+        Index("ix_experience_slot_experience_id_start_time", "experience_id", "start_time"),
+    )
+
     id = Column(BIGINT, primary_key=True, autoincrement=True, nullable=False)
     experience_id = Column(INT, ForeignKey("experience.id"), nullable=False)
     start_time = Column(DateTime(timezone=True), nullable=False)
@@ -45,8 +49,12 @@ class ExperienceSlot(BaseModel):
 
 
 class Experience(BaseModel):
+    __table_args__ = (
+        Index("ix_experience_category_id_status", "category_id", "status"),
+    )
+
     id = Column(INT, primary_key=True, autoincrement=True, nullable=False)
-    host_id = Column(INT, ForeignKey("supplier.id"), nullable=False)
+    host_id = Column(INT, ForeignKey("supplier.id"), nullable=False, index=True)
     category_id = Column(INT, ForeignKey("category.id"), nullable=False)
     host_declaration = Column(TEXT, nullable=False)
     title = Column(String(50), nullable=False)
@@ -60,6 +68,11 @@ class Experience(BaseModel):
     venue_city = Column(String(50))
     venue_state = Column(String(50))
     venue_country = Column(String(50))
+    normalized_venue_city = Column(String(50), index=True)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    language = Column(String(50), index=True)
+    duration = Column(INT, index=True)  # minutes
     status = Column(Enum(ExperienceStatus), server_default=ExperienceStatus.approval_pending, nullable=False)
     # discount_code = Column()
     # cancellation_policy = Column()
@@ -92,3 +105,12 @@ class Experience(BaseModel):
                     "ExperienceSlot.is_active == 'true', "
                     "ExperienceSlot.start_time >= func.now())",
     )
+
+
+# denormalized, pre-serialized read model of approved experiences, see experience/documents.py
+class ExperienceDocument(BaseModel):
+    experience_id = Column(INT, ForeignKey("experience.id"), primary_key=True, nullable=False)
+    document = Column(TEXT, nullable=False)
+    slots = Column(TEXT, nullable=False)
+
+    updated_time = Column(DateTime(timezone=True), server_default=text("NOW()"), nullable=False)
@@ -19,7 +19,7 @@ class PaymentStatus(str, enum.Enum):
 
 class Payment(BaseModel):
     id = Column(BIGINT, primary_key=True, autoincrement=True)
-    booking_id = Column(BIGINT, ForeignKey('booking.id'), nullable=False)
+    booking_id = Column(BIGINT, ForeignKey('booking.id'), nullable=False, index=True)
     amount = Column(NUMERIC(10, 2), nullable=False)
     status = Column(Enum(PaymentStatus), nullable=False)
     transaction_code = Column(String(50), unique=True)
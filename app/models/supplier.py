@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import Column, INT, String, TEXT, DateTime, Enum
+from sqlalchemy import Column, INT, String, TEXT, DateTime, Enum, Float, Index
 from sqlalchemy.sql.expression import text
 
 from app.models import BaseModel
@@ -26,14 +26,25 @@ class SupplierGender(str, enum.Enum):
 
 
 class Supplier(BaseModel, UserMixin):
+    # artist directory, language substring search uses a trigram index (sql_scripts/0004_artist_directory.sql)
+    __table_args__ = (
+        Index("ix_supplier_type_status_id", "type", "status", "id"),
+        Index("ix_supplier_type_status_normalized_city", "type", "status", "normalized_city"),
+        Index("ix_supplier_type_status_primary_category", "type", "status", "primary_category"),
+        Index("ix_supplier_type_status_starting_price", "type", "status", "starting_price"),
+    )
+
     type = Column(Enum(SupplierType), nullable=False)
     description = Column(TEXT)
     alternate_phone_no = Column(String(20))
     gender = Column(Enum(SupplierGender))
     address = Column(TEXT)
     city = Column(String(50))
+    normalized_city = Column(String(50))
     state = Column(String(50))
     country = Column(String(50))
+    latitude = Column(Float)
+    longitude = Column(Float)
     language = Column(String(255))
     aadhar_number = Column(String(20))
     profile_image = Column(String(255))
@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+from typing import Any, Dict
+
+from gunicorn.app.base import BaseApplication
+
+from app.config import config
+from app.dependencies.logger import ApplicationLogger
+
+# Production server: a gunicorn master managing SERVER_WORKERS uvicorn workers. The app is imported
+# once in the master (preload) and shared copy-on-write by the forked workers. Nothing connects
+# at import and engines are created on first use, in the worker, so no connection is shared
+# between processes. A worker is replaced after SERVER_MAX_REQUESTS requests (plus jitter so they
+# do not restart together). On SIGTERM the master stops accepting connections and lets workers
+# finish in-flight requests for up to SERVER_GRACEFUL_TIMEOUT seconds. With more than one worker
+# LOG_FILE_PATH is not rotated in process, as rollovers of several workers would rename the file
+# under each other, and has to be rotated externally (e.g. logrotate, without copytruncate).
+#
+#   python -m app.server
+
+
+def get_no_of_workers() -> int:
+    if config.SERVER_WORKERS:
+        return config.SERVER_WORKERS
+    # CPUs this process may run on, which is less than the machine's in a container with cpusets
+    no_of_cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    return no_of_cpus * 2 + 1
+
+
+def set_up_prometheus_multiprocess_dir() -> None:
+    """ metrics of all workers are aggregated through files, the directory has to be emptied on start """
+    directory = os.environ.setdefault(
+        "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "leisurebites-prometheus")
+    )
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+
+
+def post_fork(server, worker) -> None:
+    from app.dependencies.db import db_engine_provider, read_db_engine_provider
+
+    # engines are normally first created in the worker, one created by the master while
+    # preloading gets new pools, leaving its connections to the master
+    for engine_provider in (db_engine_provider, read_db_engine_provider):
+        if engine_provider.is_created:
+            engine_provider.get().dispose(close=False)
+
+
+def child_exit(server, worker) -> None:
+    from prometheus_client import multiprocess
+
+    # drop gauges of the exited worker from /metrics
+    multiprocess.mark_process_dead(worker.pid)
+
+
+class Server(BaseApplication):
+    def __init__(self, options: Dict[str, Any]):
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+        return app
+
+
+def run() -> None:
+    no_of_workers = get_no_of_workers()
+    if no_of_workers > 1:
+        ApplicationLogger.disable_file_rotation()
+    set_up_prometheus_multiprocess_dir()
+    Server({
+        "bind": f"{config.SERVER_HOST}:{config.SERVER_PORT}",
+        "workers": no_of_workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "max_requests": config.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": config.SERVER_MAX_REQUESTS_JITTER,
+        "graceful_timeout": config.SERVER_GRACEFUL_TIMEOUT,
+        "timeout": config.SERVER_TIMEOUT,
+        "keepalive": config.SERVER_KEEPALIVE,
+        "post_fork": post_fork,
+        "child_exit": child_exit,
+    }).run()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,129 @@
+import asyncio
+from typing import Dict, Optional
+
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import config
+from app.dependencies.db import ENGINE_OPTIONS, db_engine_provider
+from app.dependencies.metrics import ADMISSION_IN_FLIGHT, ADMISSION_REJECTIONS
+
+# Route classes by path prefix (under API_V1_PREFIX), the rest is catalog browsing.
+# Probes and metrics are never limited
+BOOKING = "booking"
+AUTH = "auth"
+CATALOG = "catalog"
+ROUTE_CLASS_PREFIXES = (
+    ("/booking", BOOKING),
+    ("/login", AUTH),
+    ("/logout", AUTH),
+    ("/password-recovery", AUTH),
+    ("/reset-password", AUTH),
+    ("/customer/register", AUTH),
+    ("/supplier/register", AUTH),
+)
+UNLIMITED_PATHS = ("/health-check", "/readiness", "/metrics")
+# classes still admitted when the primary pool is nearly exhausted
+PRIORITY_ROUTE_CLASSES = (BOOKING,)
+
+BUSY_RESPONSE_BODY = orjson.dumps({"message": "Server is busy, please retry", "successful": False})
+
+
+def get_route_class(path: str) -> Optional[str]:
+    if not path.startswith(config.API_V1_PREFIX):
+        return None
+    path = path[len(config.API_V1_PREFIX):]
+    if path.startswith(UNLIMITED_PATHS):
+        return None
+    for prefix, route_class in ROUTE_CLASS_PREFIXES:
+        if path.startswith(prefix):
+            return route_class
+    return CATALOG
+
+
+def get_primary_pool_usage() -> float:
+    if not db_engine_provider.is_created:
+        return 0.0
+    capacity = ENGINE_OPTIONS["pool_size"] + ENGINE_OPTIONS["max_overflow"]
+    return db_engine_provider.get().pool.checkedout() / capacity
+
+
+class RouteClassLimiter:
+    """ at most `limit` requests of a route class in flight, at most `max_queue` more waiting for a slot """
+
+    def __init__(self, limit: int, max_queue: int):
+        self.max_queue = max_queue
+        self.semaphore = asyncio.Semaphore(limit)
+        self.waiting = 0
+
+    async def acquire(self) -> bool:
+        if not self.semaphore.locked():
+            await self.semaphore.acquire()
+            return True
+        if self.waiting >= self.max_queue:
+            return False
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), timeout=config.ADMISSION_QUEUE_TIMEOUT_SECONDS)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+
+    def release(self) -> None:
+        self.semaphore.release()
+
+
+class AdmissionControlMiddleware:
+    """
+    Bounds concurrent requests per route class (ADMISSION_LIMITS) in each worker, so an exhausted
+    DB pool makes requests fail fast with 503 and Retry-After instead of holding threads for the
+    pool timeout. Requests over the limit wait up to ADMISSION_QUEUE_TIMEOUT_SECONDS in a bounded
+    queue (ADMISSION_MAX_QUEUE). Once the primary pool is ADMISSION_SHED_POOL_USAGE used, only
+    booking requests are admitted, the other classes are shed to leave connections to bookings
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.limiters: Dict[str, RouteClassLimiter] = {
+            route_class: RouteClassLimiter(limit, config.ADMISSION_MAX_QUEUE[route_class])
+            for route_class, limit in config.ADMISSION_LIMITS.items()
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route_class = get_route_class(scope["path"]) if scope["type"] == "http" else None
+        limiter = self.limiters.get(route_class)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if route_class not in PRIORITY_ROUTE_CLASSES and get_primary_pool_usage() >= config.ADMISSION_SHED_POOL_USAGE:
+            ADMISSION_REJECTIONS.labels(route_class, "pool_saturated").inc()
+            await send_busy_response(send)
+            return
+        if not await limiter.acquire():
+            ADMISSION_REJECTIONS.labels(route_class, "busy").inc()
+            await send_busy_response(send)
+            return
+
+        in_flight = ADMISSION_IN_FLIGHT.labels(route_class)
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            in_flight.dec()
+            limiter.release()
+
+
+async def send_busy_response(send: Send) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(BUSY_RESPONSE_BODY)).encode()),
+            (b"retry-after", str(config.ADMISSION_RETRY_AFTER_SECONDS).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": BUSY_RESPONSE_BODY})
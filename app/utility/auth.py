@@ -1,5 +1,6 @@
 import base64
 import json
+from typing import Optional
 
 from fastapi import Header, HTTPException, status, Depends
 from jose import jwt
@@ -9,8 +10,9 @@ from sqlalchemy.orm import Session
 from app.config import config
 from app.controller.api_v1.security.schema import UserType
 from app.dependencies.db import get_db
-from app.dependencies.logger import ApplicationLogger
+from app.dependencies.logger import ApplicationLogger, set_log_context
 from app.dependencies.redis import redis_client
+from app.models.admin import Admin
 from app.models.customer import Customer
 from app.models.supplier import Supplier
 from app.utility.constants import AUTH_TOKEN_PREFIX, JWT_ENCODE_ALGORITHM
@@ -73,6 +75,7 @@ def get_current_customer(
             detail="User is inactive"
         )
 
+    set_log_context(user_id=f"customer:{customer.id}")
     logger.info("User %s authenticated successfully", claims['email_id'])
     return customer
 
@@ -104,5 +107,48 @@ def get_current_supplier(
             detail="User is inactive"
         )
 
+    set_log_context(user_id=f"supplier:{supplier.id}")
     logger.info("User %s authenticated successfully", claims['email_id'])
     return supplier
+
+
+def get_current_admin(
+    token: str = Header(None, convert_underscores=False, alias="X-Auth-Token"),
+    db: Session = Depends(get_db)
+) -> Admin:
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Auth Token not found"
+        )
+    claims = get_claims_from_token_and_validate_redis(token)
+    if claims["user_type"] != UserType.admin.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid role for this request"
+        )
+    admin = db.query(Admin).filter(Admin.email_id == claims["email_id"]).first()
+    if not admin:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No admin found"
+        )
+    if not admin.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User is inactive"
+        )
+
+    set_log_context(user_id=f"admin:{admin.id}")
+    logger.info("User %s authenticated successfully", claims['email_id'])
+    return admin
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """ whether token is a valid admin auth token, without a db lookup """
+    if not token:
+        return False
+    try:
+        return get_claims_from_token_and_validate_redis(token)["user_type"] == UserType.admin.value
+    except HTTPException:
+        return False
@@ -0,0 +1,128 @@
+import gzip
+from typing import Dict, Optional, Tuple
+
+import brotli
+import zstandard
+from cachetools import LRUCache
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import config
+from app.dependencies.metrics import COMPRESSION_CACHE_LOOKUPS
+
+# server preference when the client accepts several
+ENCODINGS = ("br", "zstd", "gzip")
+COMPRESSIBLE_CONTENT_TYPES = ("application/json", "text/")
+
+# compressed bodies of responses with an ETag, by (ETag, encoding, level). The ETag identifies the
+# resource version (all of ours include the resource), so the same version is compressed once per worker
+compressed_cache = LRUCache(maxsize=config.COMPRESSION_CACHE_MAX_BYTES, getsizeof=len)
+
+
+def get_accepted_encoding(accept_encoding: str) -> Optional[str]:
+    """ preferred encoding among those the client accepts (q > 0), `*` stands for the ones not listed """
+    accepted, refused = set(), set()
+    for item in accept_encoding.lower().split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding)
+        else:
+            refused.add(coding)
+    for encoding in ENCODINGS:
+        if encoding in accepted or ("*" in accepted and encoding not in refused):
+            return encoding
+    return None
+
+
+def get_compression_level(path: str, encoding: str) -> int:
+    route_levels = config.COMPRESSION_ROUTE_LEVELS.get(path, {})
+    return route_levels.get(encoding, config.COMPRESSION_LEVELS[encoding])
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+async def get_compressed_body(body: bytes, encoding: str, level: int, etag: Optional[str]) -> bytes:
+    """ compressed off the event loop, from the cache for responses with an ETag """
+    key: Optional[Tuple[str, str, int]] = (etag, encoding, level) if etag else None
+    if key:
+        compressed = compressed_cache.get(key)
+        COMPRESSION_CACHE_LOOKUPS.labels("hit" if compressed is not None else "miss").inc()
+        if compressed is not None:
+            return compressed
+    compressed = await run_in_threadpool(compress, body, encoding, level)
+    if key and len(compressed) < compressed_cache.maxsize:
+        compressed_cache[key] = compressed
+    return compressed
+
+
+class CompressionMiddleware:
+    """
+    Compresses JSON and text responses of at least `minimum_size` bytes with the best encoding the
+    client accepts (br, zstd, gzip), at COMPRESSION_LEVELS overridable per path. Streamed responses
+    and responses already encoded are passed through
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = get_accepted_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        level = get_compression_level(scope["path"], encoding)
+        start_message: Dict = {}
+        started = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, started
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or started:
+                await send(message)
+                return
+
+            started = True
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start_message["headers"])
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_CONTENT_TYPES)
+            ):
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = await get_compressed_body(body, encoding, level, headers.get("etag"))
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -3,9 +3,21 @@ AUTH_TOKEN_PREFIX = "TOKEN:"
 JWT_ENCODE_ALGORITHM = "HS256"
 
 PSWD_RESET_PREFIX = "PSWD_RESET_"
+POPULAR_EXPERIENCES_PREFIX = "POPULAR_EXP:"
+SIMILAR_EXPERIENCES_KEY = "SIMILAR_EXP"
+ARTIST_DIRECTORY_PREFIX = "ARTIST_DIR:"
+ARTIST_CALENDAR_PREFIX = "ARTIST_CAL:"
+AUTOCOMPLETE_EVENTS_KEY = "AUTOCOMPLETE:events"
 
 PROFILE_IMAGE_DIR = "profile_images"
 EXPERIENCE_IMAGE_DIR = "experience_images"
 
-EMAIL_TEMPLATES_DIR = "app/resources/email_templates"
+DEFAULT_NEARBY_RADIUS_KM = 25
+MAX_NEARBY_RADIUS_KM = 500
+MAX_NEARBY_RESULTS = 500
+
+MAX_CALENDAR_DAYS = 92
 
+MAX_AUTOCOMPLETE_RESULTS = 20
+
+EMAIL_TEMPLATES_DIR = "app/resources/email_templates"
@@ -0,0 +1,244 @@
+import heapq
+import threading
+import time
+from typing import Callable, Collection, List, Optional, Sequence, Tuple
+
+import numpy as np
+from fastapi import HTTPException, status
+
+from app.dependencies.logger import ApplicationLogger
+
+logger = ApplicationLogger.get_logger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+LEAF_SIZE = 32
+
+
+def parse_near(near: str) -> Tuple[float, float]:
+    """ parse `lat,lng` query parameter """
+    try:
+        latitude, longitude = (float(value) for value in near.split(","))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="near should be of the form latitude,longitude"
+        )
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid latitude or longitude"
+        )
+    return latitude, longitude
+
+
+def to_unit_vectors(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """ points on the unit sphere, euclidean (chord) distance grows with great circle distance """
+    latitudes = np.radians(latitudes)
+    longitudes = np.radians(longitudes)
+    return np.column_stack([
+        np.cos(latitudes) * np.cos(longitudes),
+        np.cos(latitudes) * np.sin(longitudes),
+        np.sin(latitudes),
+    ])
+
+
+class GeoIndex:
+    """
+    Static KD-tree over (id, latitude, longitude) points, built once and replaced on refresh.
+    Points are stored as 3d unit vectors so radius search is exact and has no dateline issues.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[int],
+        latitudes: Sequence[float],
+        longitudes: Sequence[float]
+    ):
+        self.__ids = np.asarray(ids, dtype=np.int64)
+        self.__points = to_unit_vectors(
+            np.asarray(latitudes, dtype=np.float64), np.asarray(longitudes, dtype=np.float64)
+        )
+        self.__order = np.arange(len(self.__ids))
+        # nodes are (start, end, bbox min, bbox max, left child, right child), bbox as plain floats
+        # since per node numpy calls cost more than the arithmetic on 3 values
+        self.__nodes: List[Tuple[int, int, Tuple[float, ...], Tuple[float, ...], int, int]] = []
+        if len(self.__ids):
+            self.__build(0, len(self.__ids))
+        self.__ids = self.__ids[self.__order]
+        self.__points = self.__points[self.__order]
+
+    def __len__(self) -> int:
+        return len(self.__ids)
+
+    def __build(self, start: int, end: int) -> int:
+        points = self.__points[self.__order[start:end]]
+        bbox_min, bbox_max = tuple(points.min(axis=0).tolist()), tuple(points.max(axis=0).tolist())
+        node_id = len(self.__nodes)
+        self.__nodes.append((start, end, bbox_min, bbox_max, -1, -1))
+        if end - start <= LEAF_SIZE:
+            return node_id
+
+        split_dim = int(np.argmax(points.max(axis=0) - points.min(axis=0)))
+        mid = (end - start) // 2
+        partition = np.argpartition(points[:, split_dim], mid)
+        self.__order[start:end] = self.__order[start:end][partition]
+        left = self.__build(start, start + mid)
+        right = self.__build(start + mid, end)
+        self.__nodes[node_id] = (start, end, bbox_min, bbox_max, left, right)
+        return node_id
+
+    def __get_bbox_distances(
+        self,
+        point: List[float],
+        bbox_min: Tuple[float, ...],
+        bbox_max: Tuple[float, ...]
+    ) -> Tuple[float, float]:
+        """ squared distance from point to nearest and farthest corner of bbox """
+        near_squared, far_squared = 0.0, 0.0
+        for value, low, high in zip(point, bbox_min, bbox_max):
+            if value < low:
+                near_squared += (low - value) ** 2
+            elif value > high:
+                near_squared += (value - high) ** 2
+            far_squared += max(value - low, high - value) ** 2
+        return near_squared, far_squared
+
+    def __get_ranges_within(self, point: List[float], max_squared: float) -> List[np.ndarray]:
+        """ point ranges of nodes touching the search sphere, whole subtrees when fully inside """
+        ranges = []
+        stack = [0]
+        while stack:
+            start, end, bbox_min, bbox_max, left, right = self.__nodes[stack.pop()]
+            near_squared, far_squared = self.__get_bbox_distances(point, bbox_min, bbox_max)
+            if near_squared > max_squared:
+                continue
+            if left < 0 or far_squared <= max_squared:
+                ranges.append(np.arange(start, end))
+            else:
+                stack.append(left)
+                stack.append(right)
+        return ranges
+
+    def __get_ranges_nearest(self, point: List[float], max_squared: float, limit: int) -> List[np.ndarray]:
+        """ best first search, stops once no unvisited node can hold one of the `limit` nearest points """
+        point_vector = np.array(point)
+        ranges, found = [], []
+        no_of_found = 0
+        kth_squared = max_squared
+        heap = [(0.0, 0)]
+        while heap:
+            near_squared, node_id = heapq.heappop(heap)
+            if near_squared > kth_squared:
+                break
+            start, end, bbox_min, bbox_max, left, right = self.__nodes[node_id]
+            if left >= 0:
+                for child in (left, right):
+                    child_near, _ = self.__get_bbox_distances(point, *self.__nodes[child][2:4])
+                    if child_near <= kth_squared:
+                        heapq.heappush(heap, (child_near, child))
+                continue
+
+            squared = ((self.__points[start:end] - point_vector) ** 2).sum(axis=1)
+            squared = squared[squared <= kth_squared]
+            if len(squared):
+                ranges.append(np.arange(start, end))
+                found.append(squared)
+                no_of_found += len(squared)
+                if no_of_found >= limit:
+                    found = [np.partition(np.concatenate(found), limit - 1)[:limit]]
+                    no_of_found = limit
+                    kth_squared = float(found[0].max())
+        return ranges
+
+    def query_radius(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        limit: Optional[int] = None,
+        allowed_ids: Optional[Collection[int]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        ids and distances (km) of points within radius_km, nearest first.
+        With allowed_ids, only those points are searched, so `limit` applies after filtering
+        """
+        if not self.__nodes:
+            return []
+        point = to_unit_vectors(np.array([latitude]), np.array([longitude]))[0]
+        chord = 2 * np.sin(min(radius_km / EARTH_RADIUS_KM, np.pi) / 2)
+        max_squared = chord * chord
+
+        if limit is None or allowed_ids is not None:
+            ranges = self.__get_ranges_within(point.tolist(), max_squared)
+        else:
+            ranges = self.__get_ranges_nearest(point.tolist(), max_squared, limit)
+        if not ranges:
+            return []
+
+        positions = np.concatenate(ranges)
+        if allowed_ids is not None:
+            allowed = np.fromiter(allowed_ids, dtype=np.int64, count=len(allowed_ids))
+            positions = positions[np.isin(self.__ids[positions], allowed)]
+        squared = ((self.__points[positions] - point) ** 2).sum(axis=1)
+        inside = squared <= max_squared
+        positions, squared = positions[inside], squared[inside]
+        if limit is not None and limit < len(squared):
+            nearest = np.argpartition(squared, limit - 1)[:limit]
+            positions, squared = positions[nearest], squared[nearest]
+        order = np.argsort(squared, kind="stable")
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.sqrt(squared[order]) / 2, 1))
+        return list(zip(self.__ids[positions[order]].tolist(), distances.tolist()))
+
+
+class RefreshingGeoIndex:
+    """
+    GeoIndex rebuilt from `loader` (returning (id, latitude, longitude) rows) when older than
+    refresh_seconds. One thread rebuilds while the others keep using the previous index.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Sequence[Tuple[int, float, float]]],
+        refresh_seconds: int
+    ):
+        self.__loader = loader
+        self.__refresh_seconds = refresh_seconds
+        self.__index: Optional[GeoIndex] = None
+        self.__built_at = 0.0
+        self.__lock = threading.Lock()
+
+    def get_index(self) -> GeoIndex:
+        if self.__index is None or time.monotonic() - self.__built_at > self.__refresh_seconds:
+            # first build blocks everyone, later ones only the thread which got the lock
+            if self.__lock.acquire(blocking=self.__index is None):
+                try:
+                    if self.__index is None or time.monotonic() - self.__built_at > self.__refresh_seconds:
+                        self.refresh()
+                except Exception as ex:
+                    if self.__index is None:
+                        raise ex
+                    logger.error("Can't refresh geo index, serving previous one: %s", ex.__repr__())
+                    self.__built_at = time.monotonic()
+                finally:
+                    self.__lock.release()
+        return self.__index
+
+    def refresh(self) -> None:
+        rows = self.__loader()
+        self.__index = GeoIndex(
+            ids=[row[0] for row in rows],
+            latitudes=[row[1] for row in rows],
+            longitudes=[row[2] for row in rows],
+        )
+        self.__built_at = time.monotonic()
+        logger.info("Geo index rebuilt with %s points", len(rows))
+
+    def query_radius(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        limit: Optional[int] = None,
+        allowed_ids: Optional[Collection[int]] = None
+    ) -> List[Tuple[int, float]]:
+        return self.get_index().query_radius(latitude, longitude, radius_km, limit, allowed_ids)
@@ -0,0 +1,100 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+from app.config import config
+
+
+def get_version_etag(*versions: Any) -> str:
+    """ weak ETag from row versions (ids, updated times, counts), no need to build the body """
+    digest = hashlib.md5("|".join(str(version) for version in versions).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def get_content_etag(content: bytes) -> str:
+    """ weak ETag from serialized body, weak since CompressionMiddleware may re-encode it """
+    return f'W/"{hashlib.md5(content).hexdigest()}"'
+
+
+def get_opaque_tag(etag: str) -> str:
+    """ ETag without weak prefix, for weak comparison """
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def is_not_modified(
+    request: Request,
+    etag: Optional[str],
+    last_modified: Optional[datetime]
+) -> bool:
+    """ If-None-Match wins over If-Modified-Since when both are sent (RFC 9110 13.2.2) """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag is None:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        opaque_tag = get_opaque_tag(etag)
+        return any(get_opaque_tag(tag) == opaque_tag for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        modified_since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if modified_since.tzinfo is None:
+        modified_since = modified_since.replace(tzinfo=timezone.utc)
+    # http dates have second precision
+    return last_modified.replace(microsecond=0) <= modified_since
+
+
+def set_cache_headers(
+    response: Response,
+    etag: Optional[str],
+    last_modified: Optional[datetime] = None,
+    max_age: Optional[int] = None
+) -> None:
+    if etag:
+        response.headers["ETag"] = etag
+    if last_modified:
+        response.headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    max_age = config.HTTP_CACHE_MAX_AGE_SECONDS if max_age is None else max_age
+    response.headers["Cache-Control"] = f"public, max-age={max_age}, must-revalidate"
+
+
+def check_conditional_request(
+    request: Request,
+    response: Response,
+    etag: Optional[str],
+    last_modified: Optional[datetime] = None,
+    max_age: Optional[int] = None
+) -> Optional[Response]:
+    """
+    Returns a 304 response when the client's copy is still fresh, else sets the
+    validators on `response` (the one injected by FastAPI) and returns None.
+    Call it with cheap row versions before loading and serializing the body
+    """
+    if is_not_modified(request, etag, last_modified):
+        not_modified_response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+        set_cache_headers(not_modified_response, etag, last_modified, max_age)
+        return not_modified_response
+    set_cache_headers(response, etag, last_modified, max_age)
+    return None
+
+
+def get_conditional_raw_response(
+    request: Request,
+    response: Response,
+    max_age: Optional[int] = None
+) -> Response:
+    """ 304 or `response` with ETag, for responses only known once serialized (e.g. cached bytes) """
+    etag = get_content_etag(response.body)
+    if is_not_modified(request, etag, None):
+        response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag, max_age=max_age)
+    return response
@@ -1,11 +1,16 @@
+from app.dependencies.metrics import observe_external_call
+
+
 class PaymentGatewayUtils:
     """ Utility class for payment gateway """
 
     def create_order(self):
-        return "order_id"
+        with observe_external_call("payment_gateway", "create_order"):
+            return "order_id"
 
     def verify_payment(self, order_id):
-        return True
+        with observe_external_call("payment_gateway", "verify_payment"):
+            return True
 
 
 pg_utils = PaymentGatewayUtils()
@@ -0,0 +1,103 @@
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+MAX_TERM_LENGTH = 12
+MAX_WORDS_PER_LABEL = 4
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def get_terms(normalized_label: str) -> Set[str]:
+    """ index terms of a label: the label from each of its first few words, truncated """
+    words = normalized_label.split(" ")
+    return {
+        " ".join(words[i:])[:MAX_TERM_LENGTH]
+        for i in range(min(len(words), MAX_WORDS_PER_LABEL))
+    }
+
+
+class PrefixIndex:
+    """
+    Word prefix index over labels: a sorted array of unique terms searched with bisect,
+    each pointing to the keys of labels containing it. Terms are truncated, longer
+    queries are verified against the label itself. Safe to update while being read.
+    """
+
+    def __init__(self, items: Iterable[Tuple[Hashable, str]] = ()):
+        self.__labels: Dict[Hashable, Tuple[str, str]] = {}
+        self.__postings: Dict[str, Set[Hashable]] = {}
+        self.__lock = threading.Lock()
+        for key, label in items:
+            normalized_label = normalize_text(label)
+            if not normalized_label:
+                continue
+            self.__labels[key] = (label, normalized_label)
+            for term in get_terms(normalized_label):
+                self.__postings.setdefault(term, set()).add(key)
+        self.__terms: List[str] = sorted(self.__postings)
+
+    def __len__(self) -> int:
+        return len(self.__labels)
+
+    def __remove(self, key: Hashable) -> None:
+        _, normalized_label = self.__labels.pop(key)
+        for term in get_terms(normalized_label):
+            keys = self.__postings[term]
+            keys.discard(key)
+            if not keys:
+                del self.__postings[term]
+                del self.__terms[bisect_left(self.__terms, term)]
+
+    def upsert(self, key: Hashable, label: str) -> None:
+        normalized_label = normalize_text(label)
+        with self.__lock:
+            if key in self.__labels:
+                self.__remove(key)
+            if not normalized_label:
+                return
+            self.__labels[key] = (label, normalized_label)
+            for term in get_terms(normalized_label):
+                if term not in self.__postings:
+                    self.__postings[term] = set()
+                    insort(self.__terms, term)
+                self.__postings[term].add(key)
+
+    def remove(self, key: Hashable) -> None:
+        with self.__lock:
+            if key in self.__labels:
+                self.__remove(key)
+
+    def search(self, prefix: str, limit: int) -> List[Tuple[Hashable, str]]:
+        """ (key, label) of labels having a word sequence starting with prefix, whole label matches first """
+        query = normalize_text(prefix)
+        if not query:
+            return []
+        term_prefix = query[:MAX_TERM_LENGTH]
+
+        label_matches, word_matches = [], []
+        seen = set()
+        with self.__lock:
+            i = bisect_left(self.__terms, term_prefix)
+            # stop once there are enough whole label matches or plenty of word matches to choose from
+            while (i < len(self.__terms) and len(label_matches) < limit
+                   and len(label_matches) + len(word_matches) < 3 * limit):
+                term = self.__terms[i]
+                if not term.startswith(term_prefix):
+                    break
+                for key in self.__postings[term]:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    label, normalized_label = self.__labels[key]
+                    if normalized_label.startswith(query):
+                        label_matches.append((key, label))
+                    elif f" {query}" in f" {normalized_label}":
+                        word_matches.append((key, label))
+                    if len(label_matches) >= limit or len(label_matches) + len(word_matches) >= 3 * limit:
+                        break
+                i += 1
+
+        return (label_matches + word_matches)[:limit]
@@ -1,12 +1,54 @@
-import orjson
+from decimal import Decimal
 from typing import Any
 
+import orjson
 from fastapi import Response
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import InstanceState
+
+
+def get_json_default(obj: Any) -> Any:
+    """
+    orjson fallback for types it does not serialize natively, as jsonable_encoder would. Mapped
+    instances give their loaded columns, relationships are left out instead of followed
+    """
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, Row):
+        return obj._asdict()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    state = inspect(obj, raiseerr=False)
+    if isinstance(state, InstanceState):
+        return {key: value for key, value in state.dict.items() if key in state.mapper.column_attrs}
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps_json(content: Any) -> bytes:
+    """ JSON of content, bytes (or a list of bytes) are taken as already serialized JSON """
+    if isinstance(content, bytes):
+        return content
+    if isinstance(content, list) and content and all(isinstance(item, bytes) for item in content):
+        return b"[" + b",".join(content) + b"]"
+    return orjson.dumps(content, default=get_json_default)
 
 
 class CustomJSONResponse(Response):
+    """
+    Content wrapped in {"data": ..., "successful": true}. Endpoints returning an instance of it skip
+    FastAPI's jsonable_encoder: content may then hold pydantic models, dataclasses, enums, datetimes,
+    Decimals, result rows and mapped instances, serialized by orjson in one pass, or bytes of serialized JSON
+    """
     media_type = "application/json"
 
     def render(self, content: Any) -> bytes:
-        resp = {"data": content, "successful": True}
-        return orjson.dumps(resp)
+        return b'{"data":' + dumps_json(content) + b',"successful":true}'
+
+
+def get_raw_json_response(data: bytes, status_code: int = 200) -> Response:
+    """ response for already serialized data, wrapped in the same envelope as CustomJSONResponse """
+    return CustomJSONResponse(content=data, status_code=status_code)
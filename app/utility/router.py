@@ -1,33 +1,164 @@
-import json
-from typing import Callable
+import random
+import re
+import time
+from typing import Any, Callable
 
-from fastapi import Request, Response
+import orjson
+from fastapi import Request, Response, status
+from fastapi.exceptions import RequestValidationError
 from fastapi.routing import APIRoute
+from starlette.exceptions import HTTPException
 
-from app.dependencies.logger import ApplicationLogger
+from app.config import config
+from app.dependencies.logger import ApplicationLogger, log_context
+from app.dependencies.metrics import observe_request
+from app.dependencies.profiler import profile_request, profiled
+from app.dependencies.query_stats import QueryStats, get_server_timing, log_repeated_statements, query_stats
+from app.dependencies.tracing import trace_request
+from app.utility.auth import is_admin_token
 
 logger = ApplicationLogger.get_logger(__name__)
 
+# values of json fields, form fields and query params whose name contains one of these
+SENSITIVE_FIELDS = r"[\w-]*(?:password|pswd|token|secret|otp|authorization)[\w-]*"
+SENSITIVE_FIELD_NAME = re.compile(SENSITIVE_FIELDS, re.IGNORECASE)
+# for bodies which aren't valid JSON (e.g. truncated), nested values are redacted up to their first closing bracket
+SENSITIVE_JSON_VALUE = re.compile(
+    rf'("{SENSITIVE_FIELDS}"\s*:\s*)("(?:[^"\\]|\\.)*"?|\[[^\]]*\]?|{{[^}}]*}}?|[^,}}\]\s]+)', re.IGNORECASE
+)
+SENSITIVE_FORM_VALUE = re.compile(rf"((?:^|&){SENSITIVE_FIELDS}=)[^&]*", re.IGNORECASE)
+UNLOGGED_CONTENT_TYPES = ("multipart/form-data", "application/octet-stream", "image/")
+PROFILE_FLAG_VALUES = ("1", "true")
+REDACTED = "***"
+
+
+def redact_json(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if SENSITIVE_FIELD_NAME.fullmatch(key) else redact_json(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact_json(item) for item in value]
+    return value
+
+
+def redact(text: str) -> str:
+    """ text with values of sensitive fields replaced, JSON is parsed and other text matched by pattern """
+    try:
+        return orjson.dumps(redact_json(orjson.loads(text))).decode()
+    except orjson.JSONDecodeError:
+        text = SENSITIVE_JSON_VALUE.sub(rf'\1"{REDACTED}"', text)
+        return SENSITIVE_FORM_VALUE.sub(rf"\1{REDACTED}", text)
+
+
+def is_profile_requested(request: Request) -> bool:
+    """ an admin asked to profile the request with the X-Profile header or _profile query param """
+    flag = request.headers.get("X-Profile") or request.query_params.get("_profile")
+    return flag is not None and flag.lower() in PROFILE_FLAG_VALUES and is_admin_token(
+        request.headers.get("X-Auth-Token")
+    )
+
+
+def get_loggable_body(body: bytes) -> str:
+    """ body capped at REQUEST_LOG_MAX_BODY_BYTES, with sensitive values redacted """
+    max_bytes = config.REQUEST_LOG_MAX_BODY_BYTES
+    text = redact(body[:max_bytes].decode("utf-8", errors="replace"))
+    if len(body) > max_bytes:
+        text += f"... ({len(body)} bytes)"
+    return text
+
 
 class RequestResponseLoggingRoute(APIRoute):
+    """
+    Logs method, path, status and latency of every request, and request / response bodies
+    of a sample of them (REQUEST_LOG_SAMPLE_RATE, overridable per route path in
+    REQUEST_LOG_ROUTE_SAMPLE_RATES). Records carry the route path and latency as fields.
+    Latency and status of every request also go to the route metrics. SQL statements are
+    counted per request, repeated ones logged as likely N+1 and, outside production, the
+    totals returned in a Server-Timing header. Requests are traced when TRACE_EXPORTER is set and
+    profiled on an admin's request or when sampled, the profile id is returned in X-Profile-ID
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any):
+        super().__init__(path, profiled(endpoint), **kwargs)
+
     def get_route_handler(self) -> Callable:
         original_route_handler = super().get_route_handler()
+        sample_rate = config.REQUEST_LOG_ROUTE_SAMPLE_RATES.get(self.path, config.REQUEST_LOG_SAMPLE_RATE)
 
         async def custom_route_handler(request: Request) -> Response:
-            logger.info(f"{request.method} {request.url.path}?{request.url.query}")
-            req_body = await request.body()
-            if req_body:
-                # req_json = json.loads(req_body.decode("utf-8"))
-                # logger.info(f"Request Body: {json.dumps(req_json)}")
+            start_time = time.perf_counter()
+            log_context_token = log_context.set({"route": self.path})
+            # set when called inside track_queries (tests), the request's stats are added to it
+            outer_query_stats = query_stats.get()
+            query_stats_token = query_stats.set(QueryStats())
+            status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+            span_attributes = {"http.method": request.method, "http.route": self.path}
+            with trace_request(f"{request.method} {self.path}", span_attributes) as span:
                 try:
-                    logger.info(f"Request Body: {req_body.decode('utf-8')}")
-                except Exception as ex:
-                    pass
-
-            response: Response = await original_route_handler(request)
-            resp_json = json.loads(response.body.decode("utf-8"))
-            logger.info(f"Response Body: {json.dumps(resp_json)}")
-            logger.info(f"Response Status Code: {response.status_code}")
+                    response = await handle_request(request, start_time)
+                    status_code = response.status_code
+                    return response
+                except HTTPException as ex:
+                    status_code = ex.status_code
+                    raise
+                except RequestValidationError:
+                    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+                    raise
+                finally:
+                    if span:
+                        span.attributes["http.status_code"] = status_code
+                        span.error = status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR
+                    observe_request(request.method, self.path, status_code, time.perf_counter() - start_time)
+                    request_query_stats = query_stats.get()
+                    log_repeated_statements(request_query_stats)
+                    query_stats.reset(query_stats_token)
+                    if outer_query_stats is not None:
+                        outer_query_stats.add(request_query_stats)
+                    log_context.reset(log_context_token)
+
+        async def handle_request(request: Request, start_time: float) -> Response:
+            log_bodies = sample_rate > 0 and random.random() < sample_rate
+
+            if log_bodies:
+                content_type = request.headers.get("content-type", "")
+                if content_type.startswith(UNLOGGED_CONTENT_TYPES):
+                    logger.info(
+                        "Request Body: <%s, %s bytes>",
+                        content_type.split(";")[0],
+                        request.headers.get("content-length")
+                    )
+                else:
+                    # the body is cached on the request, the endpoint reads the same bytes
+                    req_body = await request.body()
+                    if req_body:
+                        logger.info("Request Body: %s", get_loggable_body(req_body))
+
+            with profile_request(requested=is_profile_requested(request)) as profile_id:
+                response: Response = await original_route_handler(request)
+            if profile_id:
+                response.headers["X-Profile-ID"] = profile_id
+
+            response_body = getattr(response, "body", None)
+            if log_bodies and response_body:
+                logger.info("Response Body: %s", get_loggable_body(response_body))
+            duration = time.perf_counter() - start_time
+            latency_ms = round(duration * 1000, 1)
+            stats = query_stats.get()
+            logger.info(
+                "%s %s %s %s %sms %s queries",
+                request.method, request.url.path, redact(request.url.query), response.status_code, latency_ms,
+                stats.count,
+                extra={
+                    "status_code": response.status_code,
+                    "latency_ms": latency_ms,
+                    "db_queries": stats.count,
+                    "db_ms": round(stats.duration * 1000, 1),
+                }
+            )
+            if config.ENVIRONMENT != "production":
+                response.headers["Server-Timing"] = get_server_timing(stats, duration)
 
             return response
 
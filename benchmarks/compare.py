@@ -0,0 +1,43 @@
+import argparse
+import json
+from typing import Any, Dict, Optional
+
+# Compares two load test results step by step, e.g. of the base and the head of a branch
+#
+#   python -m benchmarks.compare load-test-base.json load-test-head.json
+
+METRICS = ("throughput", "p50_ms", "p95_ms", "p99_ms", "queries_per_request", "errors")
+
+
+def get_change(before: Optional[float], after: Optional[float]) -> str:
+    if not before or after is None:
+        return f"{before} -> {after}"
+    return f"{before} -> {after} ({(after - before) / before:+.1%})"
+
+
+def compare(before: Dict[str, Any], after: Dict[str, Any]) -> None:
+    print(f"{before['commit']} -> {after['commit']}")
+    for scenario, after_scenario in after["scenarios"].items():
+        before_scenario = before["scenarios"].get(scenario)
+        if not before_scenario:
+            continue
+        for step, after_step in after_scenario["steps"].items():
+            before_step = before_scenario["steps"].get(step)
+            if not before_step:
+                continue
+            print(f"{scenario} / {step}")
+            for metric in METRICS:
+                print(f"  {metric:<20} {get_change(before_step[metric], after_step[metric])}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two load test results")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+    with open(args.before) as before_file, open(args.after) as after_file:
+        compare(json.load(before_file), json.load(after_file))
+
+
+if __name__ == "__main__":
+    main()
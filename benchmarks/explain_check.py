@@ -0,0 +1,201 @@
+import argparse
+import json
+import sys
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from benchmarks.generate_data import GENERATED_PASSWORD
+from benchmarks.stand_ins import install_stand_ins
+
+# Checks that the queries of the main endpoints use indexes on a dataset loaded with
+# benchmarks.generate_data: each endpoint is called in process, with the stand-ins of the load test,
+# its SQL statements are captured and EXPLAINed, and a sequential scan of a table of more than
+# SEQ_SCAN_MAX_ROWS rows fails the check. The booking endpoints book one slot.
+#
+#   python -m benchmarks.generate_data --scale 0.01 && python -m benchmarks.explain_check
+
+API_V1_PREFIX = "/api/v1"
+SEQ_SCAN_MAX_ROWS = 10000
+EXPLAINED_STATEMENTS = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+
+class StatementCapture:
+    """ distinct statements run through any engine while capturing, with parameters of the first run """
+
+    def __init__(self):
+        self.statements: Optional[Dict[str, Any]] = None
+        event.listen(Engine, "before_cursor_execute", self.before_cursor_execute)
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if self.statements is None or executemany:
+            return
+        if statement.lstrip().upper().startswith(EXPLAINED_STATEMENTS):
+            self.statements.setdefault(statement, parameters)
+
+    def capture(self) -> None:
+        self.statements = {}
+
+    def stop(self) -> Dict[str, Any]:
+        statements, self.statements = self.statements, None
+        return statements
+
+
+def get_plan_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from get_plan_nodes(child)
+
+
+def get_short_statement(statement: str) -> str:
+    """ statement on one line without its selected columns """
+    statement = " ".join(statement.split())
+    if statement.startswith("SELECT ") and " FROM " in statement:
+        statement = "SELECT ... " + statement[statement.index(" FROM ") + 1:]
+    return statement[:300]
+
+
+def get_large_seq_scans(cursor, statement: str, parameters: Any, table_sizes: Dict[str, float]) -> List[str]:
+    """ large tables the statement's plan scans sequentially """
+    cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return [
+        node["Relation Name"]
+        for node in get_plan_nodes(plan[0]["Plan"])
+        if node["Node Type"] == "Seq Scan" and table_sizes.get(node.get("Relation Name"), 0) > SEQ_SCAN_MAX_ROWS
+    ]
+
+
+def get_sample_values(cursor) -> Dict[str, Any]:
+    """ ids of popular rows of the generated data to call the endpoints with """
+    def fetch(query: str) -> Tuple:
+        cursor.execute(query)
+        row = cursor.fetchone()
+        if not row:
+            raise RuntimeError(f"No data for {query}, load data with benchmarks.generate_data first")
+        return row
+
+    customer_email_id, = fetch(
+        "SELECT customer.email_id FROM booking JOIN customer ON customer.id = booking.customer_id "
+        "WHERE customer.email_id LIKE 'customer%@example.com' ORDER BY booking.id DESC LIMIT 1"
+    )
+    category_id, = fetch(
+        "SELECT category_id FROM experience WHERE status = 'approved' GROUP BY category_id "
+        "ORDER BY count(*) DESC LIMIT 1"
+    )
+    experience_id, host_id, slot_id = fetch(
+        "SELECT experience.id, experience.host_id, experience_slot.id FROM experience_slot "
+        "JOIN experience ON experience.id = experience_slot.experience_id "
+        "WHERE experience.status = 'approved' AND experience_slot.is_active "
+        "AND experience_slot.start_time > now() AND experience_slot.remaining_guest_limit > 0 LIMIT 1"
+    )
+    artist_id, = fetch("SELECT artist_id FROM artist_slot ORDER BY id DESC LIMIT 1")
+    return {
+        "customer_email_id": customer_email_id,
+        "category_id": category_id,
+        "experience_id": experience_id,
+        "host_id": host_id,
+        "slot_id": slot_id,
+        "artist_id": artist_id,
+    }
+
+
+def get_endpoint_calls(client, values: Dict[str, Any]) -> Iterator[Tuple[str, Any]]:
+    """ (name, response) of each endpoint called, in an order where later calls use earlier responses """
+    def call(method: str, path: str, **kwargs):
+        return client.request(method, API_V1_PREFIX + path, **kwargs)
+
+    today = date.today()
+    yield "GET /categories", call("GET", "/categories")
+    yield "POST /experience/category/all", call(
+        "POST", "/experience/category/all", params={"category_id": values["category_id"]}
+    )
+    yield "GET /experience", call("GET", "/experience", params={"experience_id": values["experience_id"]})
+    yield "GET /experience/similar", call(
+        "GET", "/experience/similar", params={"experience_id": values["experience_id"]}
+    )
+    yield "GET /experience/host/all", call("GET", "/experience/host/all", params={"host_id": values["host_id"]})
+    yield "GET /supplier/all_artists", call("GET", "/supplier/all_artists")
+    yield "GET /supplier/profile", call("GET", "/supplier/profile", params={"supplier_id": values["artist_id"]})
+    yield "GET /supplier/artist/calendar", call("GET", "/supplier/artist/calendar", params={
+        "artist_id": values["artist_id"],
+        "start_date": today.isoformat(),
+        "end_date": (today + timedelta(days=30)).isoformat(),
+    })
+
+    response = call(
+        "POST", "/login/access-token",
+        params={"user_type": "customer", "login_type": "email_id"},
+        data={"username": values["customer_email_id"], "password": GENERATED_PASSWORD},
+    )
+    yield "POST /login/access-token", response
+    if response.status_code != 200:
+        return
+    headers = {"X-Auth-Token": response.json()["data"]["access_token"]}
+    yield "GET /customer/bookings", call("GET", "/customer/bookings", headers=headers)
+
+    booking_request = {
+        "booking_type": "experience", "payment_method": "pg", "slot_id": values["slot_id"], "no_of_guests": 1
+    }
+    yield "POST /booking/checkout", call("POST", "/booking/checkout", json=booking_request, headers=headers)
+    response = call("POST", "/booking/initiate", json=booking_request, headers=headers)
+    yield "POST /booking/initiate", response
+    if response.status_code != 200:
+        return
+    booking_id = response.json()["data"]["booking_id"]
+    yield "POST /booking/confirm", call("POST", f"/booking/confirm/{booking_id}", headers=headers)
+
+
+def main() -> None:
+    argparse.ArgumentParser(description="Check that the main endpoints' queries use indexes").parse_args()
+
+    install_stand_ins()
+    from fastapi.testclient import TestClient
+
+    from app.dependencies.db import db_engine_provider
+    from app.main import app
+
+    connection = db_engine_provider.get().raw_connection()
+    cursor = connection.cursor()
+    cursor.execute(
+        "SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' AND relnamespace = current_schema()::regnamespace"
+    )
+    table_sizes = dict(cursor.fetchall())
+    values = get_sample_values(cursor)
+    connection.rollback()
+
+    statement_capture = StatementCapture()
+    failed = False
+    with TestClient(app) as client:
+        calls = get_endpoint_calls(client, values)
+        while True:
+            statement_capture.capture()
+            name, response = next(calls, (None, None))
+            statements = statement_capture.stop()
+            if name is None:
+                break
+            if response.status_code >= 400:
+                failed = True
+                print(f"FAIL {name}: status {response.status_code} {response.text[:200]}")
+                continue
+            seq_scans = [
+                (statement, tables) for statement, parameters in statements.items()
+                if (tables := get_large_seq_scans(cursor, statement, parameters, table_sizes))
+            ]
+            connection.rollback()
+            if seq_scans:
+                failed = True
+            print(f"{'FAIL' if seq_scans else 'OK  '} {name}: {len(statements)} statements")
+            for statement, tables in seq_scans:
+                print(f"     sequential scan of {', '.join(tables)} in: {get_short_statement(statement)}")
+    connection.close()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,595 @@
+import argparse
+import io
+import itertools
+import time
+import zlib
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import psycopg2
+
+from app.controller.api_v1.experience.utils import normalize_city
+from app.controller.api_v1.security.utils import get_password_hash
+from app.dependencies.db import db_engine_provider
+from app.models import BaseModel
+# models of all tables loaded, for create_all
+from app.models import artist_slot, booking, category, customer, experience, payment, promo_code, supplier  # noqa: F401
+
+# Synthetic, referentially consistent data at production scale, loaded with COPY. Popularity is
+# skewed (Zipf) for experiences, hosts, artists, customers, categories and cities, so a few rows get
+# most bookings as in production. Rows are appended after the current max ids, generated from --seed
+# (same seed, same data). Every user's password is GENERATED_PASSWORD
+#
+#   python -m benchmarks.generate_data --scale 0.01
+#   python -m benchmarks.generate_data --customers 1000000 --bookings 20000000
+#
+# then rebuild the experience documents, popularity and similar experiences (README, scheduled jobs)
+
+FULL_SCALE = {
+    "customers": 1000000,
+    "suppliers": 50000,
+    "experiences": 200000,
+    "experience_slots": 5000000,
+    "artist_slots": 500000,
+    "bookings": 20000000,
+}
+CHUNK_SIZE = 100000
+GENERATED_PASSWORD = "password"
+NULL = "\\N"
+DAY = 86400
+# slots and bookings span the past PAST_DAYS and the next FUTURE_DAYS
+PAST_DAYS = 365
+FUTURE_DAYS = 90
+HOST_SHARE = 0.7
+IMAGES_PER_EXPERIENCE = 3
+# every ARTIST_BOOKING_EVERY-th booking is an artist booking, while artist slots are left
+ARTIST_BOOKING_EVERY = 20
+
+CITIES = (
+    ("Bengaluru", "Karnataka", 12.9716, 77.5946),
+    ("Mumbai", "Maharashtra", 19.0760, 72.8777),
+    ("New Delhi", "Delhi", 28.6139, 77.2090),
+    ("Hyderabad", "Telangana", 17.3850, 78.4867),
+    ("Pune", "Maharashtra", 18.5204, 73.8567),
+    ("Chennai", "Tamil Nadu", 13.0827, 80.2707),
+    ("Kolkata", "West Bengal", 22.5726, 88.3639),
+    ("Gurugram", "Haryana", 28.4595, 77.0266),
+    ("Ahmedabad", "Gujarat", 23.0225, 72.5714),
+    ("Jaipur", "Rajasthan", 26.9124, 75.7873),
+    ("Goa", "Goa", 15.2993, 74.1240),
+    ("Chandigarh", "Chandigarh", 30.7333, 76.7794),
+    ("Kochi", "Kerala", 9.9312, 76.2673),
+    ("Lucknow", "Uttar Pradesh", 26.8467, 80.9462),
+    ("Indore", "Madhya Pradesh", 22.7196, 75.8577),
+    ("Mysuru", "Karnataka", 12.2958, 76.6394),
+    ("Udaipur", "Rajasthan", 24.5854, 73.7125),
+    ("Rishikesh", "Uttarakhand", 30.0869, 78.2676),
+    ("Shillong", "Meghalaya", 25.5788, 91.8933),
+    ("Puducherry", "Puducherry", 11.9416, 79.8083),
+)
+EXPERIENCE_CATEGORIES = (
+    "Workshops", "Food & Drinks", "Adventure", "Art & Culture", "Wellness", "Music", "Nature", "Heritage Walks",
+    "Photography", "Sports", "Nightlife", "Kids",
+)
+ARTIST_CATEGORIES = (
+    "Singer", "Band", "DJ", "Stand-up Comedian", "Dancer", "Magician", "Painter", "Photographer",
+)
+LANGUAGES = ("english", "hindi", "kannada", "tamil", "telugu", "marathi", "bengali")
+LANGUAGE_WEIGHTS = (0.45, 0.3, 0.07, 0.06, 0.05, 0.04, 0.03)
+FIRST_NAMES = (
+    "Aarav", "Vivaan", "Aditya", "Arjun", "Sai", "Reyansh", "Ishaan", "Kabir", "Rohan", "Rahul",
+    "Ananya", "Diya", "Aadhya", "Saanvi", "Ira", "Myra", "Priya", "Sneha", "Kavya", "Meera",
+)
+LAST_NAMES = (
+    "Sharma", "Verma", "Iyer", "Rao", "Reddy", "Nair", "Patel", "Shah", "Gupta", "Mehta",
+    "Das", "Banerjee", "Singh", "Kaur", "Joshi", "Kulkarni", "Menon", "Pillai", "Chopra", "Bose",
+)
+TITLE_WORDS = ("Hands-on", "Sunset", "Guided", "Weekend", "Beginner's", "Evening", "Local", "Secret", "Classic")
+
+
+def get_zipf_cdf(size: int, exponent: float, rng: np.random.Generator) -> np.ndarray:
+    """ cumulative weights of `size` items with Zipf popularity, in random order """
+    weights = rng.permutation(1 / np.arange(1, size + 1) ** exponent)
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
+
+
+def sample(cdf: np.ndarray, size: int, rng: np.random.Generator) -> np.ndarray:
+    return np.minimum(np.searchsorted(cdf, rng.random(size)), len(cdf) - 1)
+
+
+def pick(options: Tuple, size: int, rng: np.random.Generator, weights: Tuple = None) -> np.ndarray:
+    return np.asarray(options)[rng.choice(len(options), size, p=weights)]
+
+
+def format_times(seconds: np.ndarray) -> np.ndarray:
+    return np.datetime_as_string(seconds.astype("datetime64[s]"), timezone="UTC")
+
+
+def format_amounts(amounts: np.ndarray) -> np.ndarray:
+    return np.char.mod("%.2f", amounts)
+
+
+def with_nulls(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """ values where mask, NULL elsewhere """
+    return np.where(mask, values.astype(str), NULL)
+
+
+def get_fitting_bookings(
+    slots: np.ndarray, guests: np.ndarray, booked_guests: np.ndarray, guest_limits: np.ndarray
+) -> np.ndarray:
+    """ whether each booking fits its slot, taken in order. Guests of earlier ones which don't fit count too """
+    order = np.argsort(slots, kind="stable")
+    sorted_slots, sorted_guests = slots[order], guests[order]
+    cumulative = np.cumsum(sorted_guests)
+    group_starts = np.flatnonzero(np.r_[True, sorted_slots[1:] != sorted_slots[:-1]])
+    group_sizes = np.diff(np.r_[group_starts, len(sorted_slots)])
+    # guests of the slot's earlier bookings in this batch, then of the booking itself
+    guests_in_slot = cumulative - np.repeat(cumulative[group_starts] - sorted_guests[group_starts], group_sizes)
+    fits = np.empty(len(slots), dtype=bool)
+    fits[order] = booked_guests[sorted_slots] + guests_in_slot <= guest_limits[sorted_slots]
+    return fits
+
+
+def copy_rows(cursor, table: str, columns: Dict[str, Any], no_of_rows: int) -> None:
+    """ COPY rows given by column, a column is a str constant or a sequence of no_of_rows values """
+    values: List[Any] = []
+    for column in columns.values():
+        if isinstance(column, str):
+            values.append(itertools.repeat(column, no_of_rows))
+        elif isinstance(column, np.ndarray):
+            values.append(column.astype(str).tolist())
+        else:
+            values.append(column)
+    rows = io.StringIO("\n".join(map("\t".join, zip(*values))) + "\n")
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", rows)
+
+
+class DataGenerator:
+    """ generates the tables in dependency order, keeping the columns later tables refer to """
+
+    def __init__(self, connection, counts: Dict[str, int], seed: int):
+        self.connection = connection
+        self.cursor = connection.cursor()
+        self.counts = counts
+        self.seed = seed
+        self.now = int(time.time())
+        self.today = self.now - self.now % DAY
+        self.city_cdf = get_zipf_cdf(len(CITIES), 1.0, self.get_rng("cities"))
+        self.first_ids: Dict[str, int] = {}
+
+    def get_rng(self, *key: Any) -> np.random.Generator:
+        """ generator for a part of the data, independent of the parts generated before it """
+        entropy = [self.seed] + [zlib.crc32(part.encode()) if isinstance(part, str) else part for part in key]
+        return np.random.default_rng(entropy)
+
+    def get_first_id(self, table: str) -> int:
+        self.cursor.execute(f"SELECT coalesce(max(id), 0) + 1 FROM {table}")
+        self.first_ids[table] = self.cursor.fetchone()[0]
+        return self.first_ids[table]
+
+    def load(self, table: str, no_of_rows: int, generate_chunk, name: str = None) -> None:
+        """ COPY rows of a table in chunks of generate_chunk(chunk_no, first_index, size) and commit """
+        start_time = time.monotonic()
+        for chunk_no, first_index in enumerate(range(0, no_of_rows, CHUNK_SIZE)):
+            size = min(CHUNK_SIZE, no_of_rows - first_index)
+            copy_rows(self.cursor, table, generate_chunk(chunk_no, first_index, size), size)
+        self.cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+        )
+        self.connection.commit()
+        print(f"{name or table:<20} {no_of_rows:>10} rows in {time.monotonic() - start_time:.1f}s")
+
+    def get_created_times(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        return self.now - rng.integers(0, 3 * 365 * DAY, size)
+
+    def get_user_columns(
+        self, prefix: str, phone_prefix: str, ids: np.ndarray, rng: np.random.Generator
+    ) -> Dict[str, Any]:
+        size = len(ids)
+        return {
+            "id": ids,
+            "name": np.char.add(np.char.add(pick(FIRST_NAMES, size, rng), " "), pick(LAST_NAMES, size, rng)),
+            "email_id": [f"{prefix}{user_id}@example.com" for user_id in ids.tolist()],
+            "phone_no": [f"{phone_prefix}{user_id:09d}" for user_id in ids.tolist()],
+            "hashed_password": self.hashed_password,
+            "is_active": "true",
+        }
+
+    def generate(self) -> None:
+        self.hashed_password = get_password_hash(GENERATED_PASSWORD)
+        self.generate_categories()
+        self.generate_customers()
+        self.generate_suppliers()
+        self.generate_experiences()
+        self.generate_experience_images()
+        self.generate_experience_slots_and_bookings()
+        self.cursor.execute("ANALYZE")
+        self.connection.commit()
+
+    def generate_categories(self) -> None:
+        first_id = self.get_first_id("category")
+        names = EXPERIENCE_CATEGORIES + ARTIST_CATEGORIES
+        self.experience_category_ids = first_id + np.arange(len(EXPERIENCE_CATEGORIES))
+        self.load("category", len(names), lambda chunk_no, first_index, size: {
+            "id": first_id + np.arange(size),
+            "type": ["experience"] * len(EXPERIENCE_CATEGORIES) + ["artist"] * len(ARTIST_CATEGORIES),
+            "name": list(names),
+            "tag_line": [f"Best {name.lower()} near you" for name in names],
+            "main_image_url": [f"category/{category_id}.jpg" for category_id in range(first_id, first_id + size)],
+            "thumbnail_image_url": [
+                f"category/{category_id}_thumb.jpg" for category_id in range(first_id, first_id + size)
+            ],
+        })
+
+    def generate_customers(self) -> None:
+        first_id = self.get_first_id("customer")
+
+        def generate_chunk(chunk_no: int, first_index: int, size: int) -> Dict[str, Any]:
+            rng = self.get_rng("customer", chunk_no)
+            return {
+                **self.get_user_columns("customer", "9", first_id + first_index + np.arange(size), rng),
+                "created_time": format_times(self.get_created_times(size, rng)),
+            }
+
+        self.load("customer", self.counts["customers"], generate_chunk)
+
+    def generate_suppliers(self) -> None:
+        first_id = self.get_first_id("supplier")
+        no_of_suppliers = self.counts["suppliers"]
+        rng = self.get_rng("supplier")
+        is_host = rng.random(no_of_suppliers) < HOST_SHARE
+        # at least a host and an artist
+        is_host[:2] = (True, False)
+        self.supplier_cities = sample(self.city_cdf, no_of_suppliers, rng)
+        self.host_indexes = np.flatnonzero(is_host)
+        self.artist_indexes = np.flatnonzero(~is_host)
+        self.supplier_first_id = first_id
+
+        def generate_chunk(chunk_no: int, first_index: int, size: int) -> Dict[str, Any]:
+            rng = self.get_rng("supplier", chunk_no)
+            indexes = first_index + np.arange(size)
+            ids = first_id + indexes
+            chunk_is_host = is_host[indexes]
+            cities = self.supplier_cities[indexes]
+            city_names = np.array([CITIES[city][0] for city in cities])
+            latitudes = np.array([CITIES[city][2] for city in cities]) + rng.normal(0, 0.05, size)
+            longitudes = np.array([CITIES[city][3] for city in cities]) + rng.normal(0, 0.05, size)
+            languages = np.char.add(
+                np.char.add(pick(LANGUAGES, size, rng, LANGUAGE_WEIGHTS), ", "), pick(LANGUAGES, size, rng)
+            )
+            return {
+                **self.get_user_columns("supplier", "8", ids, rng),
+                "type": np.where(chunk_is_host, "host", "artist"),
+                "description": "Passionate about sharing what I love with guests",
+                "gender": pick(("male", "female", "others"), size, rng, (0.55, 0.43, 0.02)),
+                "address": [f"{number}, Main Road" for number in rng.integers(1, 500, size).tolist()],
+                "city": city_names,
+                "normalized_city": np.char.lower(city_names),
+                "state": np.array([CITIES[city][1] for city in cities]),
+                "country": "India",
+                "latitude": latitudes.round(6),
+                "longitude": longitudes.round(6),
+                "language": np.char.title(languages),
+                "profile_image": [f"supplier/{supplier_id}.jpg" for supplier_id in ids.tolist()],
+                "primary_category": with_nulls(pick(ARTIST_CATEGORIES, size, rng), ~chunk_is_host),
+                "starting_price": with_nulls(
+                    (rng.lognormal(np.log(8000), 0.5, size) // 500 * 500).astype(int), ~chunk_is_host
+                ),
+                "status": pick(
+                    ("approved", "approval_pending", "created", "rejected"), size, rng, (0.85, 0.08, 0.04, 0.03)
+                ),
+                "created_time": format_times(self.get_created_times(size, rng)),
+            }
+
+        self.load("supplier", no_of_suppliers, generate_chunk)
+
+    def generate_experiences(self) -> None:
+        first_id = self.get_first_id("experience")
+        no_of_experiences = self.counts["experiences"]
+        rng = self.get_rng("experience")
+        host_cdf = get_zipf_cdf(len(self.host_indexes), 0.8, rng)
+        category_cdf = get_zipf_cdf(len(EXPERIENCE_CATEGORIES), 0.8, rng)
+        self.experience_hosts = self.host_indexes[sample(host_cdf, no_of_experiences, rng)]
+        self.experience_categories = sample(category_cdf, no_of_experiences, rng)
+        self.experience_prices = np.maximum(rng.lognormal(np.log(1200), 0.6, no_of_experiences) // 50 * 50, 100)
+        self.experience_guest_limits = rng.choice((6, 10, 15, 20, 30), no_of_experiences)
+        self.experience_durations = rng.choice((60, 90, 120, 180, 240), no_of_experiences)
+        is_approved = rng.random(no_of_experiences) < 0.88
+        # only approved experiences are booked, the most popular ones far more often
+        weights = np.diff(get_zipf_cdf(no_of_experiences, 1.1, rng), prepend=0) * is_approved
+        self.experience_weights = weights / weights.sum()
+        self.experience_first_id = first_id
+
+        def generate_chunk(chunk_no: int, first_index: int, size: int) -> Dict[str, Any]:
+            rng = self.get_rng("experience", chunk_no)
+            indexes = first_index + np.arange(size)
+            # most experiences are in their host's city
+            cities = np.where(
+                rng.random(size) < 0.8, self.supplier_cities[self.experience_hosts[indexes]],
+                sample(self.city_cdf, size, rng)
+            )
+            city_names = np.array([CITIES[city][0] for city in cities])
+            categories = self.experience_categories[indexes]
+            category_names = np.asarray(EXPERIENCE_CATEGORIES)[categories]
+            return {
+                "id": first_id + indexes,
+                "host_id": self.supplier_first_id + self.experience_hosts[indexes],
+                "category_id": self.experience_category_ids[categories],
+                "host_declaration": "I have the rights and licenses to host this experience",
+                "title": np.char.add(np.char.add(pick(TITLE_WORDS, size, rng), " "), category_names),
+                "description": "A memorable experience with a local host",
+                "activities": "Introduction, main activity, refreshments",
+                "mode": pick(("physical", "virtual"), size, rng, (0.9, 0.1)),
+                "min_age": rng.choice((0, 12, 16, 18), size),
+                "guest_limit": self.experience_guest_limits[indexes],
+                "price_per_guest": self.experience_prices[indexes].astype(np.int64),
+                "venue_address": [f"{number}, Cross Road" for number in rng.integers(1, 500, size).tolist()],
+                "venue_city": city_names,
+                "venue_state": np.array([CITIES[city][1] for city in cities]),
+                "venue_country": "India",
+                "normalized_venue_city": [normalize_city(city) for city in city_names.tolist()],
+                "latitude": (np.array([CITIES[city][2] for city in cities]) + rng.normal(0, 0.05, size)).round(6),
+                "longitude": (np.array([CITIES[city][3] for city in cities]) + rng.normal(0, 0.05, size)).round(6),
+                "language": pick(LANGUAGES, size, rng, LANGUAGE_WEIGHTS),
+                "duration": self.experience_durations[indexes],
+                "status": np.where(
+                    is_approved[indexes], "approved", pick(("approval_pending", "rejected"), size, rng, (0.7, 0.3))
+                ),
+                "created_time": format_times(self.get_created_times(size, rng)),
+            }
+
+        self.load("experience", no_of_experiences, generate_chunk)
+
+    def generate_experience_images(self) -> None:
+        first_id = self.get_first_id("experience_image")
+
+        def generate_chunk(chunk_no: int, first_index: int, size: int) -> Dict[str, Any]:
+            indexes = first_index + np.arange(size)
+            experience_ids = self.experience_first_id + indexes // IMAGES_PER_EXPERIENCE
+            return {
+                "id": first_id + indexes,
+                "experience_id": experience_ids,
+                "url": [
+                    f"experience/{experience_id}/{index % IMAGES_PER_EXPERIENCE}.jpg"
+                    for experience_id, index in zip(experience_ids.tolist(), indexes.tolist())
+                ],
+            }
+
+        self.load("experience_image", self.counts["experiences"] * IMAGES_PER_EXPERIENCE, generate_chunk)
+
+    def get_start_times(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        """ on the hour between 8:00 and 20:00, from PAST_DAYS ago to FUTURE_DAYS ahead """
+        days = rng.integers(-PAST_DAYS, FUTURE_DAYS, size)
+        return self.today + days * DAY + rng.integers(8, 21, size) * 3600
+
+    def sample_experience_bookings(self, chunk_no: int, size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """ slot indexes and no of guests of a chunk of bookings, the same on every call """
+        rng = self.get_rng("booking", chunk_no)
+        experiences = sample(self.experience_cdf, size, rng)
+        slots = self.slot_first_indexes[experiences] + (
+            rng.random(size) * self.slot_counts[experiences]
+        ).astype(int)
+        return slots, rng.integers(1, 5, size)
+
+    def is_artist_booking(self, indexes: np.ndarray) -> np.ndarray:
+        return (indexes % ARTIST_BOOKING_EVERY == 0) & (indexes // ARTIST_BOOKING_EVERY < len(self.booked_artist_slots))
+
+    def allocate_experience_bookings(
+        self, chunk_no: int, first_index: int, size: int, booked_guests: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        slot indexes and no of guests of a chunk of bookings, whose experience bookings are added to
+        booked_guests. A booking its slot has no room for spills over to a random slot with room, with
+        at most as many guests as fit, so no slot is booked over its guest limit. Allocating the chunks
+        in order on zeroed booked_guests gives the same bookings on every run
+        """
+        slots, guests = self.sample_experience_bookings(chunk_no, size)
+        pending = np.flatnonzero(~self.is_artist_booking(first_index + np.arange(size)))
+        rng = self.get_rng("booking_spill", chunk_no)
+        while len(pending):
+            fits = get_fitting_bookings(slots[pending], guests[pending], booked_guests, self.slot_guest_limits)
+            booked_guests += np.bincount(slots[pending[fits]], guests[pending[fits]], len(booked_guests))
+            pending = pending[~fits]
+            if not len(pending):
+                break
+            open_slots = np.flatnonzero(booked_guests < self.slot_guest_limits)
+            if not len(open_slots):
+                raise ValueError("Experience slots can't hold the bookings, generate more slots or fewer bookings")
+            slots[pending] = open_slots[rng.integers(0, len(open_slots), len(pending))]
+            guests[pending] = np.minimum(
+                guests[pending], self.slot_guest_limits[slots[pending]] - booked_guests[slots[pending]]
+            )
+        return slots, guests
+
+    def generate_experience_slots_and_bookings(self) -> None:
+        no_of_experiences = self.counts["experiences"]
+        no_of_slots = max(self.counts["experience_slots"], no_of_experiences)
+        no_of_bookings = self.counts["bookings"]
+        rng = self.get_rng("experience_slot")
+        # every experience has a slot, popular ones more
+        slot_weights = 0.5 / no_of_experiences + 0.5 * self.experience_weights
+        self.slot_counts = 1 + rng.multinomial(no_of_slots - no_of_experiences, slot_weights / slot_weights.sum())
+        self.slot_first_indexes = np.cumsum(self.slot_counts) - self.slot_counts
+        slot_experiences = np.repeat(np.arange(no_of_experiences), self.slot_counts)
+        self.slot_guest_limits = self.experience_guest_limits[slot_experiences]
+        slot_start_times = self.get_start_times(no_of_slots, rng)
+        self.experience_cdf = np.cumsum(self.experience_weights)
+
+        rng = self.get_rng("artist_slot")
+        no_of_artist_slots = self.counts["artist_slots"] if len(self.artist_indexes) else 0
+        artist_cdf = get_zipf_cdf(len(self.artist_indexes), 0.9, rng) if no_of_artist_slots else None
+        artist_slot_artists = self.artist_indexes[sample(artist_cdf, no_of_artist_slots, rng)] \
+            if no_of_artist_slots else np.array([], dtype=int)
+        artist_slot_prices = rng.lognormal(np.log(8000), 0.5, no_of_artist_slots) // 500 * 500
+        artist_slot_start_times = self.get_start_times(no_of_artist_slots, rng)
+        self.booked_artist_slots = rng.choice(
+            no_of_artist_slots, min(no_of_artist_slots, -(-no_of_bookings // ARTIST_BOOKING_EVERY)), replace=False
+        )
+
+        # guests booked per slot, for remaining guest limits, slots of popular experiences are sold out
+        booked_guests = np.zeros(no_of_slots)
+        for chunk_no, first_index in enumerate(range(0, no_of_bookings, CHUNK_SIZE)):
+            self.allocate_experience_bookings(
+                chunk_no, first_index, min(CHUNK_SIZE, no_of_bookings - first_index), booked_guests
+            )
+
+        first_slot_id = self.get_first_id("experience_slot")
+
+        def generate_slot_chunk(chunk_no: int, first_index: int, size: int) -> Dict[str, Any]:
+            indexes = first_index + np.arange(size)
+            experiences = slot_experiences[indexes]
+            start_times = slot_start_times[indexes]
+            return {
+                "id": first_slot_id + indexes,
+                "experience_id": self.experience_first_id + experiences,
+                "start_time": format_times(start_times),
+                "end_time": format_times(start_times + self.experience_durations[experiences] * 60),
+                "remaining_guest_limit": (self.slot_guest_limits[indexes] - booked_guests[indexes]).astype(int),
+                "is_active": np.where(self.get_rng("experience_slot", chunk_no).random(size) < 0.97, "true", "false"),
+            }
+
+        self.load("experience_slot", no_of_slots, generate_slot_chunk)
+
+        first_artist_slot_id = self.get_first_id("artist_slot")
+        is_booked = np.zeros(no_of_artist_slots, dtype=bool)
+        is_booked[self.booked_artist_slots] = True
+
+        def generate_artist_slot_chunk(chunk_no: int, first_index: int, size: int) -> Dict[str, Any]:
+            rng = self.get_rng("artist_slot", chunk_no)
+            indexes = first_index + np.arange(size)
+            start_times = artist_slot_start_times[indexes]
+            booked = is_booked[indexes]
+            cities = self.supplier_cities[artist_slot_artists[indexes]]
+            return {
+                "id": first_artist_slot_id + indexes,
+                "artist_id": self.supplier_first_id + artist_slot_artists[indexes],
+                "price": format_amounts(artist_slot_prices[indexes]),
+                "start_time": format_times(start_times),
+                "end_time": format_times(start_times + rng.integers(2, 5, size) * 3600),
+                "venue_address": with_nulls(np.full(size, "Party Hall, Ring Road"), booked),
+                "venue_city": with_nulls(np.array([CITIES[city][0] for city in cities]), booked),
+                "venue_state": with_nulls(np.array([CITIES[city][1] for city in cities]), booked),
+                "venue_country": with_nulls(np.full(size, "India"), booked),
+                "is_booked": np.where(booked, "true", "false"),
+            }
+
+        self.load("artist_slot", no_of_artist_slots, generate_artist_slot_chunk)
+
+        first_booking_id = self.get_first_id("booking")
+        first_payment_id = self.get_first_id("payment")
+        customer_cdf = get_zipf_cdf(self.counts["customers"], 0.7, self.get_rng("customer_popularity"))
+        first_customer_id = self.first_ids["customer"]
+        # chunks are generated in order, so bookings are allocated as when counting booked guests
+        allocated_guests = np.zeros(no_of_slots)
+
+        def generate_booking_chunk(chunk_no: int, first_index: int, size: int) -> Dict[str, Any]:
+            indexes = first_index + np.arange(size)
+            ids = first_booking_id + indexes
+            slots, guests = self.allocate_experience_bookings(chunk_no, first_index, size, allocated_guests)
+            is_artist = self.is_artist_booking(indexes)
+            artist_slots = self.booked_artist_slots[np.where(is_artist, indexes // ARTIST_BOOKING_EVERY, 0)]
+            experiences = slot_experiences[slots]
+            rng = self.get_rng("booking_details", chunk_no)
+
+            guests = np.where(is_artist, rng.integers(20, 200, size), guests)
+            sub_totals = np.where(
+                is_artist, artist_slot_prices[artist_slots], self.experience_prices[experiences] * guests
+            )
+            service_taxes = (sub_totals * 0.18).round(2)
+            start_times = np.where(is_artist, artist_slot_start_times[artist_slots], slot_start_times[slots])
+            created_times = np.minimum(start_times - rng.integers(3600, 30 * DAY, size), self.now)
+            is_past = start_times < self.now
+            outcomes = rng.random(size)
+            statuses = np.where(
+                is_past,
+                np.where(outcomes < 0.85, "completed", np.where(outcomes < 0.93, "cancelled", "failed")),
+                np.where(
+                    outcomes < 0.85, "confirmed",
+                    np.where(outcomes < 0.95, np.where(is_artist, "pending_with_artist", "pending"), "cancelled")
+                )
+            )
+            is_cancelled = statuses == "cancelled"
+            is_confirmed = np.isin(statuses, ("confirmed", "completed", "cancelled"))
+            booking_columns = {
+                "id": ids,
+                "booking_uuid": [f"LB{booking_id:016d}" for booking_id in ids.tolist()],
+                "booking_type": np.where(is_artist, "artist", "experience"),
+                "customer_id": first_customer_id + sample(customer_cdf, size, rng),
+                "supplier_id": self.supplier_first_id + np.where(
+                    is_artist, artist_slot_artists[artist_slots], self.experience_hosts[experiences]
+                ),
+                "experience_slot_id": with_nulls(first_slot_id + slots, ~is_artist),
+                "artist_slot_id": with_nulls(first_artist_slot_id + artist_slots, is_artist),
+                "no_of_guests": guests,
+                "status": statuses,
+                "sub_total": format_amounts(sub_totals),
+                "service_tax": format_amounts(service_taxes),
+                "promo_discount": "0.00",
+                "payable_amount": format_amounts(sub_totals + service_taxes),
+                "cancellation_time": with_nulls(format_times(created_times + DAY), is_cancelled),
+                "cancelled_by": with_nulls(pick(("customer", "supplier"), size, rng, (0.8, 0.2)), is_cancelled),
+                "cancellation_reason": with_nulls(np.full(size, "Change of plans"), is_cancelled),
+                "confirmation_time": with_nulls(format_times(np.minimum(created_times + 300, self.now)), is_confirmed),
+                "created_time": format_times(created_times),
+            }
+            copy_rows(self.cursor, "booking", booking_columns, size)
+
+            is_pg = rng.random(size) < 0.9
+            payment_statuses = np.where(
+                is_confirmed, "success", np.where(statuses == "failed", "failed", "pending")
+            )
+            return {
+                "id": first_payment_id + indexes,
+                "booking_id": ids,
+                "amount": booking_columns["payable_amount"],
+                "status": payment_statuses,
+                "transaction_code": with_nulls(np.char.add("TXN", ids.astype(str)), payment_statuses == "success"),
+                "payment_method": np.where(is_pg, "pg", "cod"),
+                "pg_order_id": with_nulls(np.char.add("order_", ids.astype(str)), is_pg),
+                "created_time": booking_columns["created_time"],
+            }
+
+        # a chunk of bookings is copied before its payments, in the payment table's transaction
+        self.load("payment", no_of_bookings, generate_booking_chunk, name="booking, payment")
+        self.cursor.execute("SELECT setval(pg_get_serial_sequence('booking', 'id'), (SELECT max(id) FROM booking))")
+        self.connection.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load synthetic data at production scale with COPY")
+    parser.add_argument("--scale", type=float, default=1.0, help="share of the full scale dataset")
+    for table, count in FULL_SCALE.items():
+        parser.add_argument(f"--{table.replace('_', '-')}", type=int, help=f"no of rows, {count} at full scale")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    counts = {
+        table: max(1, getattr(args, table) if getattr(args, table) is not None else int(count * args.scale))
+        for table, count in FULL_SCALE.items()
+    }
+    counts["suppliers"] = max(2, counts["suppliers"])
+    engine = db_engine_provider.get()
+    BaseModel.metadata.create_all(engine)
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        # rows are consistent by construction, foreign keys are not checked if allowed (superuser), which
+        # halves the load time of bookings
+        try:
+            cursor.execute("SET session_replication_role TO replica")
+            connection.commit()
+        except psycopg2.errors.InsufficientPrivilege:
+            connection.rollback()
+            print("Foreign keys are checked, loading as superuser is faster")
+        # nothing to lose if a load is interrupted, it is rerun
+        cursor.execute("SET synchronous_commit TO off")
+        start_time = time.monotonic()
+        DataGenerator(connection, counts, args.seed).generate()
+        print(f"Loaded in {time.monotonic() - start_time:.0f}s")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+import argparse
+import asyncio
+import json
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.seed import seed
+
+# HTTP load test of the main user journeys. Each scenario runs for --duration seconds with
+# --concurrency clients looping over it, one scenario after another. Latency percentiles, throughput
+# and SQL queries per request (from the Server-Timing header) are written as JSON, keyed by the git
+# commit, for comparing runs with benchmarks/compare.py. Starts benchmarks.serve unless --url is given
+#
+#   python -m benchmarks.load_test --concurrency 20 --duration 30 --output load-test-$(git rev-parse --short HEAD).json
+
+API_V1_PREFIX = "/api/v1"
+SERVER_START_TIMEOUT_SECONDS = 60
+QUERIES_PATTERN = re.compile(r'desc="(\d+) queries"')
+
+
+class Results:
+    """ latencies, errors and queries of each step of a scenario """
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.queries: Dict[str, List[int]] = defaultdict(list)
+
+    def record(self, step: str, response: Optional[httpx.Response], duration: float) -> None:
+        self.latencies[step].append(duration)
+        if response is None or response.status_code >= 400:
+            self.errors[step] += 1
+        if response is not None:
+            match = QUERIES_PATTERN.search(response.headers.get("server-timing", ""))
+            if match:
+                self.queries[step].append(int(match.group(1)))
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        steps = {
+            step: {
+                "count": len(latencies),
+                "errors": self.errors[step],
+                "throughput": round(len(latencies) / duration, 1),
+                "p50_ms": get_percentile(latencies, 50),
+                "p95_ms": get_percentile(latencies, 95),
+                "p99_ms": get_percentile(latencies, 99),
+                "queries_per_request": (
+                    round(sum(self.queries[step]) / len(self.queries[step]), 1) if self.queries[step] else None
+                ),
+            }
+            for step, latencies in self.latencies.items()
+        }
+        all_latencies = [latency for latencies in self.latencies.values() for latency in latencies]
+        return {
+            "count": len(all_latencies),
+            "errors": sum(self.errors.values()),
+            "throughput": round(len(all_latencies) / duration, 1),
+            "p50_ms": get_percentile(all_latencies, 50),
+            "p95_ms": get_percentile(all_latencies, 95),
+            "p99_ms": get_percentile(all_latencies, 99),
+            "steps": steps,
+        }
+
+
+def get_percentile(latencies: List[float], percentile: int) -> Optional[float]:
+    """ nearest-rank percentile in ms """
+    if not latencies:
+        return None
+    latencies = sorted(latencies)
+    index = max(0, -(-len(latencies) * percentile // 100) - 1)
+    return round(latencies[index] * 1000, 2)
+
+
+async def call(
+    client: httpx.AsyncClient, results: Results, step: str, method: str, path: str, **kwargs
+) -> Optional[httpx.Response]:
+    start_time = time.perf_counter()
+    try:
+        response = await client.request(method, API_V1_PREFIX + path, **kwargs)
+    except httpx.HTTPError:
+        response = None
+    results.record(step, response, time.perf_counter() - start_time)
+    return response
+
+
+async def log_in(client: httpx.AsyncClient, results: Results, fixtures: Dict[str, Any]) -> Optional[str]:
+    response = await call(
+        client, results, "login", "POST", "/login/access-token",
+        params={"user_type": "customer", "login_type": "email_id"},
+        data={"username": fixtures["customer_email_id"], "password": fixtures["customer_password"]},
+    )
+    if response is None or response.status_code != 200:
+        return None
+    return response.json()["data"]["access_token"]
+
+
+class Scenario:
+    """ one iteration of a user journey, `set_up` runs once per client before measuring """
+
+    async def set_up(self, client: httpx.AsyncClient, fixtures: Dict[str, Any], client_no: int) -> None:
+        pass
+
+    async def run(self, client: httpx.AsyncClient, results: Results, fixtures: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+
+class BrowseCategories(Scenario):
+    async def run(self, client, results, fixtures):
+        await call(client, results, "categories", "GET", "/categories")
+        await call(client, results, "category experiences", "POST", "/experience/category/all",
+                   params={"category_id": fixtures["category_id"]})
+
+
+class ViewExperience(Scenario):
+    async def run(self, client, results, fixtures):
+        await call(client, results, "experience", "GET", "/experience",
+                   params={"experience_id": fixtures["experience_id"]})
+        await call(client, results, "similar experiences", "GET", "/experience/similar",
+                   params={"experience_id": fixtures["experience_id"]})
+
+
+class BookExperience(Scenario):
+    """ checkout, initiate and confirm, clients book different slots as customers mostly would """
+
+    def __init__(self):
+        self.token: Optional[str] = None
+        self.slot_id: Optional[int] = None
+
+    async def set_up(self, client, fixtures, client_no):
+        self.token = await log_in(client, Results(), fixtures)
+        self.slot_id = fixtures["slot_ids"][client_no % len(fixtures["slot_ids"])]
+
+    async def run(self, client, results, fixtures):
+        headers = {"X-Auth-Token": self.token or ""}
+        booking_request = {
+            "booking_type": "experience", "payment_method": "pg", "slot_id": self.slot_id, "no_of_guests": 1
+        }
+        response = await call(client, results, "checkout", "POST", "/booking/checkout",
+                              json=booking_request, headers=headers)
+        if response is None or response.status_code != 200:
+            return
+        response = await call(client, results, "initiate", "POST", "/booking/initiate",
+                              json=booking_request, headers=headers)
+        if response is None or response.status_code != 200:
+            return
+        booking_id = response.json()["data"]["booking_id"]
+        await call(client, results, "confirm", "POST", f"/booking/confirm/{booking_id}", headers=headers)
+
+
+class LogIn(Scenario):
+    async def run(self, client, results, fixtures):
+        await log_in(client, results, fixtures)
+
+
+SCENARIOS: Dict[str, Callable[[], Scenario]] = {
+    "browse_categories": BrowseCategories,
+    "view_experience": ViewExperience,
+    "book_experience": BookExperience,
+    "login": LogIn,
+}
+
+
+async def run_client(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    results: Results,
+    fixtures: Dict[str, Any],
+    end_time: float
+) -> None:
+    while time.perf_counter() < end_time:
+        await scenario.run(client, results, fixtures)
+
+
+async def run_scenario(
+    url: str, name: str, fixtures: Dict[str, Any], concurrency: int, duration: float, warm_up: float
+) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        scenarios = [SCENARIOS[name]() for _ in range(concurrency)]
+        await asyncio.gather(*(
+            scenario.set_up(client, fixtures, client_no) for client_no, scenario in enumerate(scenarios)
+        ))
+
+        async def run_clients(results: Results, seconds: float) -> float:
+            start_time = time.perf_counter()
+            await asyncio.gather(*(
+                run_client(client, scenario, results, fixtures, start_time + seconds) for scenario in scenarios
+            ))
+            return time.perf_counter() - start_time
+
+        if warm_up:
+            await run_clients(Results(), warm_up)
+        results = Results()
+        elapsed = await run_clients(results, duration)
+    return results.summary(elapsed)
+
+
+def get_git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def start_server(port: int, external_latency_ms: float) -> subprocess.Popen:
+    server = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.serve",
+        "--port", str(port), "--external-latency-ms", str(external_latency_ms)
+    ])
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Benchmark server exited with {server.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}{API_V1_PREFIX}/health-check").status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("Benchmark server did not start")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the main user journeys")
+    parser.add_argument("--url", help="app to test, by default benchmarks.serve is started on --port")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=20, help="seconds measured per scenario")
+    parser.add_argument("--warm-up", type=float, default=3, help="seconds run per scenario before measuring")
+    parser.add_argument("--external-latency-ms", type=float, default=0,
+                        help="latency of stubbed external calls, for the started server")
+    parser.add_argument("--output", help="file for the JSON results, printed if not given")
+    args = parser.parse_args()
+
+    # the app's POSTGRES_* settings must point at the database the tested app uses
+    fixtures = seed()
+    server = None if args.url else start_server(args.port, args.external_latency_ms)
+    url = args.url or f"http://127.0.0.1:{args.port}"
+    try:
+        scenario_results = {
+            name: asyncio.run(run_scenario(url, name, fixtures, args.concurrency, args.duration, args.warm_up))
+            for name in args.scenarios
+        }
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    output = json.dumps({
+        "commit": get_git_commit(),
+        "time": datetime.now(timezone.utc).isoformat(),
+        "url": url,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "external_latency_ms": args.external_latency_ms,
+        "scenarios": scenario_results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+import pytz
+from jose import jwt
+
+from app.config import config
+from app.controller.api_v1.booking.utils import generate_booking_uuid, get_checkout_details
+from app.controller.api_v1.experience.schema import Experience as ExperienceResponse, ExperienceSlot
+from app.controller.api_v1.experience.utils import validate_new_slot
+# models the mapped relationships refer to, which the benchmarked modules don't import
+from app.models import artist_slot, category, payment, supplier  # noqa: F401
+from app.models.experience import ExperienceMode
+from app.models.promo_code import PromoCode, PromoCodeStatus, PromoCodeType
+from app.utility.auth import get_token_key
+from app.utility.cloud_storage import get_cloud_file_path
+from app.utility.constants import EMAIL_TEMPLATES_DIR, JWT_ENCODE_ALGORITHM
+from app.utility.email_sender import email_sender
+from app.utility.response import CustomJSONResponse
+
+# Micro-benchmarks of CPU-bound helpers on hot paths. Each is timed as the best of REPEATS runs of
+# enough calls to take TARGET_RUN_SECONDS, and compared with the time saved in BASELINES_PATH: the
+# run fails when one is slower than its baseline by more than --tolerance. Absolute times only
+# compare on the machine they were measured on, so baselines are saved locally (the file is not
+# versioned), e.g. on the base branch before measuring a change. Without baselines times are only
+# reported
+#
+#   git checkout main && python -m benchmarks.micro --save
+#   git checkout <branch> && python -m benchmarks.micro
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+REPEATS = 7
+TARGET_RUN_SECONDS = 0.2
+DEFAULT_TOLERANCE = 0.25
+
+
+class PromoCodeSession:
+    """ stands in for the session in get_promo_discount, which only looks up one promo code """
+
+    def __init__(self, promo: PromoCode):
+        self.promo = promo
+
+    def query(self, *entities):
+        return self
+
+    def filter(self, *criteria):
+        return self
+
+    def first(self):
+        return self.promo
+
+
+def get_promo_code(promo_code_type: PromoCodeType) -> PromoCode:
+    now = datetime.now(tz=pytz.utc)
+    return PromoCode(
+        id=1,
+        code="WEEKEND20",
+        promo_code_type=promo_code_type,
+        min_purchase_amount=Decimal("500.00"),
+        max_discount_amount=Decimal("300.00"),
+        flat_discount_amount=Decimal("150.00"),
+        discount_percent=Decimal("20.00"),
+        start_time=now - timedelta(days=1),
+        end_time=now + timedelta(days=1),
+        visible=True,
+        status=PromoCodeStatus.active,
+    )
+
+
+def get_existing_slots(no_of_slots: int) -> List[SimpleNamespace]:
+    """ hourly slots with an hour between them, sorted as the endpoint passes them """
+    first_start_time = datetime.now(tz=pytz.utc) + timedelta(days=1)
+    return [
+        SimpleNamespace(
+            start_time=first_start_time + timedelta(hours=2 * i),
+            end_time=first_start_time + timedelta(hours=2 * i + 1)
+        )
+        for i in range(no_of_slots)
+    ]
+
+
+def get_experience(experience_id: int) -> ExperienceResponse:
+    start_time = datetime.now(tz=pytz.utc) + timedelta(days=1)
+    return ExperienceResponse(
+        host_id=experience_id % 500,
+        host_name="Ananya Rao",
+        host_profile_image=None,
+        experience_id=experience_id,
+        category="Workshops",
+        host_declaration="I am the owner of the venue and hold the required licenses",
+        title="Pottery on the wheel for beginners",
+        description="Learn to centre clay and throw a bowl. " * 10,
+        activities="Wedging, centring, throwing, trimming",
+        mode=ExperienceMode.physical,
+        min_age=12,
+        guest_limit=10,
+        price_per_guest=1200,
+        venue_address="12, 4th Cross, Indiranagar",
+        venue_city="Bengaluru",
+        venue_state="Karnataka",
+        venue_country="India",
+        latitude=12.9719,
+        longitude=77.6412,
+        language="english",
+        duration=120,
+        image_urls=[f"{config.S3_BUCKET_URL}/experience/{experience_id}-{i}.jpg" for i in range(4)],
+        slots=[
+            ExperienceSlot(
+                id=experience_id * 10 + i,
+                start_time=start_time + timedelta(days=i),
+                end_time=start_time + timedelta(days=i, hours=2),
+                remaining_guest_limit=10
+            )
+            for i in range(5)
+        ],
+    )
+
+
+def get_benchmarks() -> Dict[str, Callable[[], Any]]:
+    existing_slots = get_existing_slots(200)
+    new_slot_start_time = existing_slots[100].end_time
+    flat_promo_session = PromoCodeSession(get_promo_code(PromoCodeType.discount_flat))
+    percent_promo_session = PromoCodeSession(get_promo_code(PromoCodeType.discount_percent))
+    token = jwt.encode({
+        "id": 1,
+        "username": "customer@example.com",
+        "email_id": "customer@example.com",
+        "phone_no": "9876543210",
+        "user_type": "customer",
+        "exp": time.time() + 3600,
+    }, config.SECRET_KEY, algorithm=JWT_ENCODE_ALGORITHM)
+    with open(EMAIL_TEMPLATES_DIR + "/artist_booking.html") as f:
+        email_template = f.read()
+    experience = get_experience(1)
+    experiences = [get_experience(i) for i in range(50)]
+    experience_documents = [experience.json().encode() for experience in experiences]
+    response = CustomJSONResponse()
+
+    return {
+        "validate_new_slot (200 slots)": lambda: validate_new_slot(
+            new_slot_start_time, new_slot_start_time + timedelta(hours=1), existing_slots
+        ),
+        "get_checkout_details (no promo code)": lambda: get_checkout_details(2400.0, None, None),
+        "get_checkout_details (flat promo code)": lambda: get_checkout_details(
+            2400.0, "WEEKEND20", flat_promo_session
+        ),
+        "get_checkout_details (percent promo code)": lambda: get_checkout_details(
+            2400.0, "WEEKEND20", percent_promo_session
+        ),
+        "generate_booking_uuid": generate_booking_uuid,
+        "get_token_key": lambda: get_token_key(token),
+        "get_cloud_file_path": lambda: get_cloud_file_path("IMG_20230311_184512.jpg", "experience"),
+        "EmailSender.get_email_message": lambda: email_sender.get_email_message(
+            destination_emails=["customer@example.com"],
+            email_subject="Booking request accepted",
+            email_body=email_template,
+            environment={"customer_name": "Rahul", "artist_name": "Ananya Rao", "booking_uuid": "LB2303111845121234"},
+        ),
+        "CustomJSONResponse.render (experience)": lambda: response.render(experience),
+        "CustomJSONResponse.render (50 experiences)": lambda: response.render(experiences),
+        "CustomJSONResponse.render (50 documents)": lambda: response.render(experience_documents),
+    }
+
+
+def get_time_per_call(function: Callable[[], Any]) -> float:
+    """ best of REPEATS runs in µs per call, with garbage collection off as timeit does """
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return get_best_time_per_call(function)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def get_best_time_per_call(function: Callable[[], Any]) -> float:
+    no_of_calls = 1
+    while True:
+        start_time = time.perf_counter()
+        for _ in range(no_of_calls):
+            function()
+        elapsed = time.perf_counter() - start_time
+        if elapsed >= TARGET_RUN_SECONDS / 10:
+            break
+        no_of_calls *= 10
+    no_of_calls = max(1, int(no_of_calls * TARGET_RUN_SECONDS / elapsed))
+
+    best = float("inf")
+    for _ in range(REPEATS):
+        start_time = time.perf_counter()
+        for _ in range(no_of_calls):
+            function()
+        best = min(best, (time.perf_counter() - start_time) / no_of_calls)
+    return best * 1000000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of hot helpers, compared with baselines")
+    parser.add_argument("--save", action="store_true", help=f"save the times as baselines in {BASELINES_PATH}")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown over the baseline, as a fraction")
+    parser.add_argument("--filter", default="", help="only benchmarks whose name contains it")
+    args = parser.parse_args()
+
+    baselines: Dict[str, float] = {}
+    if os.path.exists(BASELINES_PATH):
+        with open(BASELINES_PATH) as baselines_file:
+            baselines = json.load(baselines_file)
+
+    times = {}
+    regressions = []
+    for name, function in get_benchmarks().items():
+        if args.filter not in name:
+            continue
+        times[name] = round(get_time_per_call(function), 3)
+        baseline = baselines.get(name)
+        if baseline is None:
+            print(f"{name:<45} {times[name]:>10.3f} µs")
+            continue
+        change = (times[name] - baseline) / baseline
+        regressed = change > args.tolerance
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<45} {times[name]:>10.3f} µs  baseline {baseline:>10.3f} µs  {change:+.1%}"
+              f"{'  REGRESSED' if regressed else ''}")
+
+    if args.save:
+        baselines.update(times)
+        with open(BASELINES_PATH, "w") as baselines_file:
+            json.dump(baselines, baselines_file, indent=2, sort_keys=True)
+            baselines_file.write("\n")
+        return
+    if not baselines:
+        print(f"No baselines in {BASELINES_PATH}, save them with --save on the base branch to compare")
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than baseline by more than {args.tolerance:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from sqlalchemy.orm import Session
+
+from app.controller.api_v1.experience.documents import refresh_experience_documents
+from app.controller.api_v1.security.utils import get_password_hash
+from app.dependencies.db import SessionLocal, db_engine_provider
+from app.models import BaseModel
+from app.models.category import Category, CategoryType
+from app.models.customer import Customer
+from app.models.experience import Experience, ExperienceMode, ExperienceSlot, ExperienceStatus
+from app.models.supplier import Supplier, SupplierStatus, SupplierType
+
+# Fixtures the load test scenarios run against, created once and found again by their email ids /
+# names on later runs. Slots have room for more guests than any run books
+CUSTOMER_EMAIL_ID = "load-test-customer@leisurebites.local"
+CUSTOMER_PASSWORD = "load-test-password"
+HOST_EMAIL_ID = "load-test-host@leisurebites.local"
+CATEGORY_NAME = "Load Test"
+NO_OF_SLOTS = 10
+SLOT_GUEST_LIMIT = 100000000
+
+
+def get_or_create_fixtures(db: Session) -> Dict[str, Any]:
+    customer = db.query(Customer).filter(Customer.email_id == CUSTOMER_EMAIL_ID).first()
+    if not customer:
+        customer = Customer(
+            name="Load Test Customer",
+            email_id=CUSTOMER_EMAIL_ID,
+            phone_no="0000000001",
+            hashed_password=get_password_hash(CUSTOMER_PASSWORD),
+        )
+        db.add(customer)
+
+    host = db.query(Supplier).filter(Supplier.email_id == HOST_EMAIL_ID).first()
+    if not host:
+        host = Supplier(
+            type=SupplierType.host,
+            name="Load Test Host",
+            email_id=HOST_EMAIL_ID,
+            phone_no="0000000002",
+            status=SupplierStatus.approved,
+        )
+        db.add(host)
+
+    category = db.query(Category).filter(
+        Category.type == CategoryType.experience,
+        Category.name == CATEGORY_NAME
+    ).first()
+    if not category:
+        category = Category(type=CategoryType.experience, name=CATEGORY_NAME, tag_line="Experiences to load test")
+        db.add(category)
+    db.flush()
+
+    experience = db.query(Experience).filter(Experience.host_id == host.id).first()
+    if not experience:
+        experience = Experience(
+            host_id=host.id,
+            category_id=category.id,
+            host_declaration="Load test",
+            title="Load Test Experience",
+            description="Experience booked by the load test",
+            mode=ExperienceMode.physical,
+            min_age=0,
+            guest_limit=SLOT_GUEST_LIMIT,
+            price_per_guest=500,
+            venue_address="1 Test Street",
+            venue_city="Bengaluru",
+            venue_state="Karnataka",
+            venue_country="India",
+            normalized_venue_city="bengaluru",
+            language="English",
+            duration=60,
+            status=ExperienceStatus.approved,
+        )
+        db.add(experience)
+        db.flush()
+
+    # slots in the past are not bookable, keep NO_OF_SLOTS upcoming ones
+    now = datetime.now(timezone.utc)
+    upcoming_slots = db.query(ExperienceSlot).filter(
+        ExperienceSlot.experience_id == experience.id,
+        ExperienceSlot.is_active.is_(True),
+        ExperienceSlot.start_time >= now + timedelta(days=1)
+    ).order_by(ExperienceSlot.start_time).all()
+    for day in range(len(upcoming_slots), NO_OF_SLOTS):
+        start_time = now + timedelta(days=day + 7)
+        slot = ExperienceSlot(
+            experience_id=experience.id,
+            start_time=start_time,
+            end_time=start_time + timedelta(hours=1),
+            remaining_guest_limit=SLOT_GUEST_LIMIT,
+        )
+        db.add(slot)
+        upcoming_slots.append(slot)
+    db.flush()
+
+    refresh_experience_documents([experience.id], db)
+    db.commit()
+    return {
+        "customer_email_id": CUSTOMER_EMAIL_ID,
+        "customer_password": CUSTOMER_PASSWORD,
+        "category_id": category.id,
+        "experience_id": experience.id,
+        "slot_ids": [slot.id for slot in upcoming_slots],
+    }
+
+
+def seed() -> Dict[str, Any]:
+    """ creates missing tables and the fixtures, returns the ids scenarios use """
+    BaseModel.metadata.create_all(db_engine_provider.get())
+    db = SessionLocal()
+    try:
+        return get_or_create_fixtures(db)
+    finally:
+        db.close()
@@ -0,0 +1,29 @@
+import argparse
+
+import uvicorn
+
+from benchmarks.stand_ins import install_stand_ins
+
+# The app in one uvicorn worker with Redis, S3, SES, SMTP and the payment gateway replaced by local
+# stand-ins (see stand_ins.py). One worker, as the in-memory Redis is not shared between processes.
+# Needs the Postgres of the app's POSTGRES_* settings
+#
+#   python -m benchmarks.serve --port 8100
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the app with local stand-ins for external services")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--external-latency-ms", type=float, default=0,
+                        help="latency of each stubbed S3, SES, SMTP and payment gateway call")
+    args = parser.parse_args()
+
+    install_stand_ins(args.external_latency_ms)
+    from app.main import app
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import time
+
+import fakeredis
+
+from app.dependencies.logger import ApplicationLogger
+from app.dependencies.redis import redis_client
+from app.dependencies.s3 import S3Utils
+from app.dependencies.ses import SESUtils
+from app.dependencies.smtp import SMTPUtils
+from app.utility.payment_gateway import PaymentGatewayUtils
+
+logger = ApplicationLogger.get_logger(__name__)
+
+# Local stand-ins for the services the app talks to besides Postgres, so that benchmarks need
+# nothing but a database: an in-memory Redis and S3, SES, SMTP and payment gateway calls answered
+# locally after a fixed latency. Installed in the benchmark server process before the app is imported
+
+
+def install_stand_ins(external_latency_ms: float = 0) -> None:
+    latency = external_latency_ms / 1000
+
+    # every module imported the same client object, so its pool is swapped rather than the client
+    redis_client.connection_pool = fakeredis.FakeRedis(
+        server=fakeredis.FakeServer(), decode_responses=True
+    ).connection_pool
+
+    def upload(self, *args, **kwargs) -> bool:
+        time.sleep(latency)
+        return True
+
+    def send_email(self, email_message, source_email, destination_emails) -> None:
+        time.sleep(latency)
+        logger.info("Email to %s not sent (benchmark)", ", ".join(destination_emails))
+
+    create_order = PaymentGatewayUtils.create_order
+    verify_payment = PaymentGatewayUtils.verify_payment
+
+    def create_order_after_latency(self):
+        time.sleep(latency)
+        return create_order(self)
+
+    def verify_payment_after_latency(self, order_id):
+        time.sleep(latency)
+        return verify_payment(self, order_id)
+
+    S3Utils.upload_file = upload
+    S3Utils.upload_file_obj = upload
+    SESUtils.send_email = send_email
+    SMTPUtils.send_email = send_email
+    PaymentGatewayUtils.create_order = create_order_after_latency
+    PaymentGatewayUtils.verify_payment = verify_payment_after_latency
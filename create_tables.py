@@ -1,5 +1,5 @@
-from app.dependencies.db import db_engine
+from app.dependencies.db import db_engine_provider
 from app.models import BaseModel
 
 if __name__ == "__main__":
-    BaseModel.metadata.create_all(db_engine)
+    BaseModel.metadata.create_all(db_engine_provider.get())
@@ -2,4 +2,4 @@
 
 cd /home/ubuntu/LeisureBites-Backend
 source venv/bin/activate
-uvicorn app.main:app --workers=1
+python -m app.server
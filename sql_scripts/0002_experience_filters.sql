@@ -0,0 +1,26 @@
+-- Experience filters: normalized city, language and duration (minutes)
+alter table experience
+    add column normalized_venue_city varchar(50),
+    add column language              varchar(50),
+    add column duration              integer;
+
+update experience
+set normalized_venue_city = lower(regexp_replace(trim(venue_city), '\s+', ' ', 'g'))
+where venue_city is not null;
+
+update experience
+set duration = slot_duration.minutes
+from (select experience_id, min(extract(epoch from end_time - start_time))::integer / 60 as minutes
+      from experience_slot
+      group by experience_id) as slot_duration
+where experience.id = slot_duration.experience_id
+  and experience.duration is null;
+
+create index ix_experience_normalized_venue_city
+    on experience (normalized_venue_city);
+
+create index ix_experience_language
+    on experience (language);
+
+create index ix_experience_duration
+    on experience (duration);
@@ -0,0 +1,8 @@
+-- Optional coordinates of experience venues and supplier addresses
+alter table experience
+    add column latitude  double precision,
+    add column longitude double precision;
+
+alter table supplier
+    add column latitude  double precision,
+    add column longitude double precision;
@@ -0,0 +1,23 @@
+-- Artist directory: normalized city and indexes for filters and keyset pagination
+alter table supplier
+    add column normalized_city varchar(50);
+
+update supplier
+set normalized_city = lower(regexp_replace(trim(city), '\s+', ' ', 'g'))
+where city is not null;
+
+create index ix_supplier_type_status_id
+    on supplier (type, status, id);
+
+create index ix_supplier_type_status_normalized_city
+    on supplier (type, status, normalized_city);
+
+create index ix_supplier_type_status_primary_category
+    on supplier (type, status, primary_category);
+
+create index ix_supplier_type_status_starting_price
+    on supplier (type, status, starting_price);
+
+create extension if not exists pg_trgm;
+create index ix_supplier_language_trgm
+    on supplier using gin (lower(language) gin_trgm_ops);
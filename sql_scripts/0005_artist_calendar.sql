@@ -0,0 +1,4 @@
+-- Artist availability calendar
+create index ix_artist_slot_artist_id_start_time
+    on artist_slot (artist_id, start_time)
+    where is_active;
@@ -0,0 +1,10 @@
+-- Denormalized read model of approved experiences, fill with python -m app.jobs.rebuild_experience_documents
+create table experience_document
+(
+    experience_id integer                                not null
+        primary key
+        references experience,
+    document      text                                   not null,
+    slots         text                                   not null,
+    updated_time  timestamp with time zone default now() not null
+);
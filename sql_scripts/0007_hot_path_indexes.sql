@@ -0,0 +1,22 @@
+-- migrate: no-transaction
+-- Indexes of hot-path lookups by foreign key, built without blocking writes
+create index concurrently if not exists ix_booking_customer_id
+    on booking (customer_id);
+
+create index concurrently if not exists ix_booking_supplier_id
+    on booking (supplier_id);
+
+create index concurrently if not exists ix_payment_booking_id
+    on payment (booking_id);
+
+create index concurrently if not exists ix_experience_category_id_status
+    on experience (category_id, status);
+
+create index concurrently if not exists ix_experience_host_id
+    on experience (host_id);
+
+create index concurrently if not exists ix_experience_slot_experience_id_start_time
+    on experience_slot (experience_id, start_time);
+
+create index concurrently if not exists ix_experience_image_experience_id
+    on experience_image (experience_id);
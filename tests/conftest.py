@@ -0,0 +1,113 @@
+from typing import Generator
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.controller.api_v1.experience.documents import refresh_experience_documents
+from app.dependencies.db import SessionLocal, db_engine_provider
+from app.dependencies.redis import redis_client
+from app.main import app
+from app.models import BaseModel
+from app.models.category import Category, CategoryType
+from app.models.experience import (
+    Experience,
+    ExperienceDocument,
+    ExperienceImage,
+    ExperienceMode,
+    ExperienceSlot,
+    ExperienceStatus
+)
+from app.models.supplier import Supplier, SupplierStatus, SupplierType
+
+TEST_HOST_EMAIL_ID = "test-host@leisurebites.local"
+TEST_CATEGORY_NAME = "Test Category"
+
+
+@pytest.fixture(scope="session")
+def database() -> None:
+    """ database of the POSTGRES_* settings, with missing tables created """
+    try:
+        BaseModel.metadata.create_all(db_engine_provider.get())
+    except OperationalError:
+        pytest.skip("Postgres of the POSTGRES_* settings is not reachable")
+
+
+@pytest.fixture
+def db(database: None) -> Generator[Session, None, None]:
+    # objects created by a test stay readable after commit without querying again
+    db = SessionLocal(expire_on_commit=False)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def client(database: None) -> TestClient:
+    return TestClient(app)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch) -> fakeredis.FakeRedis:
+    """ in-memory Redis behind redis_client for the test """
+    fake = fakeredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+    # every module imported the same client object, so its pool is swapped rather than the client
+    monkeypatch.setattr(redis_client, "connection_pool", fake.connection_pool)
+    return fake
+
+
+def delete_test_experiences(db: Session) -> None:
+    host = db.query(Supplier).filter(Supplier.email_id == TEST_HOST_EMAIL_ID).first()
+    if host:
+        experience_ids = db.query(Experience.id).filter(Experience.host_id == host.id).scalar_subquery()
+        for model in (ExperienceDocument, ExperienceSlot, ExperienceImage):
+            db.query(model).filter(model.experience_id.in_(experience_ids)).delete(synchronize_session=False)
+        db.query(Experience).filter(Experience.host_id == host.id).delete(synchronize_session=False)
+        db.delete(host)
+    db.query(Category).filter(Category.name == TEST_CATEGORY_NAME).delete(synchronize_session=False)
+    db.commit()
+
+
+@pytest.fixture
+def experience(db: Session) -> Generator[Experience, None, None]:
+    """ approved experience without slots, with its document, deleted after the test """
+    delete_test_experiences(db)
+    host = Supplier(
+        type=SupplierType.host,
+        name="Test Host",
+        email_id=TEST_HOST_EMAIL_ID,
+        phone_no="0000000101",
+        status=SupplierStatus.approved,
+    )
+    category = Category(type=CategoryType.experience, name=TEST_CATEGORY_NAME, tag_line="Experiences to test")
+    experience = Experience(
+        host=host,
+        category=category,
+        host_declaration="Test",
+        title="Test Experience",
+        description="Experience of the tests",
+        mode=ExperienceMode.physical,
+        min_age=0,
+        guest_limit=10,
+        price_per_guest=500,
+        venue_address="1 Test Street",
+        venue_city="Bengaluru",
+        venue_state="Karnataka",
+        venue_country="India",
+        normalized_venue_city="bengaluru",
+        language="English",
+        duration=60,
+        status=ExperienceStatus.approved,
+    )
+    db.add(experience)
+    db.flush()
+    refresh_experience_documents([experience.id], db)
+    db.commit()
+    try:
+        yield experience
+    finally:
+        db.rollback()
+        delete_test_experiences(db)
@@ -0,0 +1,156 @@
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+from app.config import config
+from app.utility import admission
+from app.utility.admission import AdmissionControlMiddleware, RouteClassLimiter, get_route_class
+
+
+@pytest.fixture(autouse=True)
+def admission_config(monkeypatch):
+    monkeypatch.setattr(config, "ADMISSION_LIMITS", {"booking": 1, "auth": 1, "catalog": 1})
+    monkeypatch.setattr(config, "ADMISSION_MAX_QUEUE", {"booking": 1, "auth": 0, "catalog": 0})
+    monkeypatch.setattr(config, "ADMISSION_QUEUE_TIMEOUT_SECONDS", 5)
+    monkeypatch.setattr(admission, "get_primary_pool_usage", lambda: 0.0)
+
+
+class BlockingApp:
+    """ answers 200 once released, requests in flight are counted """
+
+    def __init__(self):
+        self.released = asyncio.Event()
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send) -> None:
+        self.in_flight += 1
+        await self.released.wait()
+        self.in_flight -= 1
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def call(middleware: AdmissionControlMiddleware, path: str) -> Dict:
+    """ status, headers and body of a request to path """
+    messages: List[Dict] = []
+
+    async def receive() -> Dict:
+        return {"type": "http.request", "body": b""}
+
+    async def send(message: Dict) -> None:
+        messages.append(message)
+
+    await middleware({"type": "http", "path": config.API_V1_PREFIX + path}, receive, send)
+    return {
+        "status": messages[0]["status"],
+        "headers": dict(messages[0]["headers"]),
+        "body": messages[1]["body"],
+    }
+
+
+@pytest.mark.parametrize("path, route_class", [
+    ("/booking/initiate", admission.BOOKING),
+    ("/login/access-token", admission.AUTH),
+    ("/customer/register", admission.AUTH),
+    ("/experience/category/all", admission.CATALOG),
+    ("/health-check", None),
+    ("/metrics", None),
+])
+def test_route_class(path, route_class):
+    assert get_route_class(config.API_V1_PREFIX + path) == route_class
+
+
+def test_route_class_outside_api():
+    assert get_route_class("/docs") is None
+
+
+def test_limiter_queue_full():
+    async def run():
+        limiter = RouteClassLimiter(limit=1, max_queue=1)
+        assert await limiter.acquire()
+        queued = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.waiting == 1
+        # the queue is full, rejected without waiting
+        assert not await asyncio.wait_for(limiter.acquire(), timeout=0.1)
+
+        limiter.release()
+        assert await queued
+        assert limiter.waiting == 0
+
+    asyncio.run(run())
+
+
+def test_limiter_queue_timeout(monkeypatch):
+    monkeypatch.setattr(config, "ADMISSION_QUEUE_TIMEOUT_SECONDS", 0.05)
+
+    async def run():
+        limiter = RouteClassLimiter(limit=1, max_queue=5)
+        assert await limiter.acquire()
+        assert not await limiter.acquire()
+        assert limiter.waiting == 0
+
+        # the timed out waiter took no slot
+        limiter.release()
+        assert await limiter.acquire()
+
+    asyncio.run(run())
+
+
+def test_busy_response_when_queue_full():
+    async def run():
+        app = BlockingApp()
+        middleware = AdmissionControlMiddleware(app)
+        admitted = asyncio.create_task(call(middleware, "/experience/popular"))
+        await asyncio.sleep(0)
+
+        rejected = await call(middleware, "/experience/popular")
+        assert rejected["status"] == 503
+        assert rejected["headers"][b"retry-after"] == str(config.ADMISSION_RETRY_AFTER_SECONDS).encode()
+        assert int(rejected["headers"][b"content-length"]) == len(rejected["body"])
+        # other route classes and unlimited paths have their own limits
+        auth = asyncio.create_task(call(middleware, "/login/access-token"))
+        health_check = asyncio.create_task(call(middleware, "/health-check"))
+        await asyncio.sleep(0)
+        assert app.in_flight == 3
+
+        app.released.set()
+        assert (await admitted)["status"] == 200
+        assert (await auth)["status"] == 200
+        assert (await health_check)["status"] == 200
+        assert (await call(middleware, "/experience/popular"))["status"] == 200
+
+    asyncio.run(run())
+
+
+def test_queued_request_admitted_when_slot_frees():
+    async def run():
+        app = BlockingApp()
+        middleware = AdmissionControlMiddleware(app)
+        first = asyncio.create_task(call(middleware, "/booking/confirm"))
+        queued = asyncio.create_task(call(middleware, "/booking/confirm"))
+        await asyncio.sleep(0)
+        assert app.in_flight == 1
+
+        app.released.set()
+        assert (await first)["status"] == 200
+        assert (await queued)["status"] == 200
+
+    asyncio.run(run())
+
+
+def test_only_bookings_admitted_when_pool_saturated(monkeypatch):
+    monkeypatch.setattr(admission, "get_primary_pool_usage", lambda: config.ADMISSION_SHED_POOL_USAGE)
+
+    async def run():
+        app = BlockingApp()
+        app.released.set()
+        middleware = AdmissionControlMiddleware(app)
+
+        assert (await call(middleware, "/experience/popular"))["status"] == 503
+        assert (await call(middleware, "/login/access-token"))["status"] == 503
+        assert (await call(middleware, "/booking/confirm"))["status"] == 200
+        assert (await call(middleware, "/readiness"))["status"] == 200
+
+    asyncio.run(run())
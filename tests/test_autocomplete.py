@@ -0,0 +1,63 @@
+from app.controller.api_v1.search.schema import SuggestionType
+from app.controller.api_v1.search.utils import AutocompleteIndex, publish_autocomplete_event
+from app.dependencies.redis import redis_client
+
+LABELS = [
+    ((SuggestionType.experience.value, 1), "Pottery Workshop"),
+    ((SuggestionType.city.value, "pune"), "Pune"),
+]
+
+
+def get_index(loader=lambda: LABELS) -> AutocompleteIndex:
+    # polls the events on every search
+    return AutocompleteIndex(loader, refresh_seconds=900, poll_seconds=-1)
+
+
+def get_suggestions(index: AutocompleteIndex, prefix: str):
+    return [(suggestion.type, suggestion.id, suggestion.label) for suggestion in index.search(prefix, 10)]
+
+
+def test_events_applied(fake_redis):
+    index = get_index()
+    assert get_suggestions(index, "pottery") == [(SuggestionType.experience, 1, "Pottery Workshop")]
+
+    publish_autocomplete_event(SuggestionType.experience, 2, "Pottery for Kids")
+    publish_autocomplete_event(SuggestionType.experience, 1, "Clay Workshop")
+    publish_autocomplete_event(SuggestionType.city, "pune", None)
+    publish_autocomplete_event(SuggestionType.city, "goa", "Goa")
+
+    assert get_suggestions(index, "pottery") == [(SuggestionType.experience, 2, "Pottery for Kids")]
+    assert get_suggestions(index, "clay") == [(SuggestionType.experience, 1, "Clay Workshop")]
+    assert get_suggestions(index, "pune") == []
+    assert get_suggestions(index, "go") == [(SuggestionType.city, "goa", "Goa")]
+
+
+def test_events_before_build_not_replayed(fake_redis):
+    publish_autocomplete_event(SuggestionType.experience, 1, None)
+    index = get_index()
+
+    assert get_suggestions(index, "pottery") == [(SuggestionType.experience, 1, "Pottery Workshop")]
+
+
+def test_events_during_build_replayed(fake_redis):
+    def loader():
+        # published after the build started, possibly missed by the loaded labels
+        publish_autocomplete_event(SuggestionType.experience, 3, "Salsa Night")
+        return LABELS
+
+    index = get_index(loader)
+    index.search("salsa", 10)
+
+    # on the next poll
+    assert get_suggestions(index, "salsa") == [(SuggestionType.experience, 3, "Salsa Night")]
+
+
+def test_index_kept_when_events_unreadable(monkeypatch, fake_redis):
+    index = get_index()
+    index.search("pottery", 10)
+
+    def xread(*args, **kwargs):
+        raise ConnectionError("Connection refused")
+
+    monkeypatch.setattr(redis_client, "xread", xread)
+    assert get_suggestions(index, "pottery") == [(SuggestionType.experience, 1, "Pottery Workshop")]
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Optional
+
+import pytz
+
+from app.controller.api_v1.booking.utils import get_checkout_details
+from app.models.promo_code import PromoCode, PromoCodeStatus, PromoCodeType
+
+
+class PromoCodeSession:
+    """ stands in for the session in get_promo_discount, which only looks up one promo code """
+
+    def __init__(self, promo: Optional[PromoCode]):
+        self.promo = promo
+
+    def query(self, *entities):
+        return self
+
+    def filter(self, *criteria):
+        return self
+
+    def first(self):
+        return self.promo
+
+
+def get_promo_code(promo_code_type: PromoCodeType) -> PromoCode:
+    # NUMERIC columns load as Decimal
+    now = datetime.now(tz=pytz.utc)
+    return PromoCode(
+        id=7,
+        code="WEEKEND20",
+        promo_code_type=promo_code_type,
+        min_purchase_amount=Decimal("500.00"),
+        max_discount_amount=Decimal("300.00"),
+        flat_discount_amount=Decimal("150.00"),
+        discount_percent=Decimal("20.00"),
+        start_time=now - timedelta(days=1),
+        end_time=now + timedelta(days=1),
+        visible=True,
+        status=PromoCodeStatus.active,
+    )
+
+
+def test_checkout_without_promo_code():
+    checkout_details = get_checkout_details(1000.0, None, PromoCodeSession(None))
+    assert checkout_details.service_tax == 180.0
+    assert checkout_details.promo_discount == 0
+    assert checkout_details.payable_amount == 1180.0
+    assert checkout_details.promo_code_id is None
+
+
+def test_checkout_with_flat_promo_code():
+    session = PromoCodeSession(get_promo_code(PromoCodeType.discount_flat))
+    checkout_details = get_checkout_details(1000.0, "WEEKEND20", session)
+    assert checkout_details.promo_discount == 150.0
+    assert checkout_details.payable_amount == 1030.0
+    assert checkout_details.promo_code_id == 7
+    assert checkout_details.promo_error_message is None
+
+
+def test_checkout_with_percent_promo_code():
+    session = PromoCodeSession(get_promo_code(PromoCodeType.discount_percent))
+    checkout_details = get_checkout_details(1000.0, "WEEKEND20", session)
+    assert checkout_details.promo_discount == 200.0
+    assert checkout_details.payable_amount == 980.0
+    assert checkout_details.promo_code_id == 7
+
+
+def test_percent_promo_discount_is_capped():
+    session = PromoCodeSession(get_promo_code(PromoCodeType.discount_percent))
+    checkout_details = get_checkout_details(2400.0, "WEEKEND20", session)
+    assert checkout_details.promo_discount == 300.0
+    assert checkout_details.payable_amount == 2532.0
+
+
+def test_invalid_promo_code():
+    checkout_details = get_checkout_details(1000.0, "NOPE", PromoCodeSession(None))
+    assert checkout_details.promo_discount == 0
+    assert checkout_details.promo_error_message == "Invalid promo code"
@@ -0,0 +1,27 @@
+import pytest
+
+from app.utility.compression import get_accepted_encoding
+
+
+@pytest.mark.parametrize("accept_encoding, encoding", [
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip, deflate, br", "br"),
+    ("gzip, zstd", "zstd"),
+    ("GZIP", "gzip"),
+    ("gzip;q=0.5, br;q=1.0", "br"),
+    ("gzip ; q=0.8", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("br;q=0.000, gzip;q=0.1", "gzip"),
+    ("br;q=invalid, gzip", "gzip"),
+    ("*", "br"),
+    ("br;q=0, *", "zstd"),
+    ("br;q=0, zstd;q=0, *", "gzip"),
+    ("br;q=0, zstd;q=0, gzip;q=0, *", None),
+    ("*;q=0", None),
+    ("gzip, *;q=0", "gzip"),
+    (",, gzip,", "gzip"),
+])
+def test_get_accepted_encoding(accept_encoding, encoding):
+    assert get_accepted_encoding(accept_encoding) == encoding
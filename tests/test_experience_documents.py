@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.models.experience import Experience, ExperienceDocument, ExperienceSlot, ExperienceStatus
+from app.utility.auth import get_current_supplier
+
+
+def test_added_slot_is_in_experience_document(client: TestClient, experience: Experience):
+    app.dependency_overrides[get_current_supplier] = lambda: experience.host
+    start_time = (datetime.now(timezone.utc) + timedelta(days=3)).replace(microsecond=0)
+
+    response = client.post(
+        "/api/v1/experience/add-slot",
+        params={"experience_id": experience.id},
+        json={"start_time": start_time.isoformat(), "end_time": (start_time + timedelta(hours=1)).isoformat()},
+    )
+    assert response.status_code == 200
+
+    response = client.get("/api/v1/experience", params={"experience_id": experience.id})
+    assert response.status_code == 200
+    slots = response.json()["data"]["slots"]
+    assert len(slots) == 1
+    assert datetime.fromisoformat(slots[0]["start_time"]) == start_time
+    assert slots[0]["remaining_guest_limit"] == 10
+
+
+def test_experience_without_document_served_as_document(client: TestClient, db: Session, experience: Experience):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    upcoming_start = now + timedelta(days=2)
+    db.add_all([
+        ExperienceSlot(experience_id=experience.id, start_time=upcoming_start,
+                       end_time=upcoming_start + timedelta(hours=1), remaining_guest_limit=10),
+        ExperienceSlot(experience_id=experience.id, start_time=now - timedelta(days=2),
+                       end_time=now - timedelta(days=2) + timedelta(hours=1), remaining_guest_limit=10),
+        ExperienceSlot(experience_id=experience.id, start_time=now + timedelta(days=3),
+                       end_time=now + timedelta(days=3, hours=1), remaining_guest_limit=10, is_active=False),
+    ])
+    # e.g. approved in the database
+    db.query(ExperienceDocument).filter(ExperienceDocument.experience_id == experience.id).delete()
+    db.commit()
+
+    response = client.get("/api/v1/experience", params={"experience_id": experience.id})
+    assert response.status_code == 200
+    slots = response.json()["data"]["slots"]
+    assert [datetime.fromisoformat(slot["start_time"]) for slot in slots] == [upcoming_start]
+
+    db.expire_all()
+    assert db.get(ExperienceDocument, experience.id)
+    document_response = client.get("/api/v1/experience", params={"experience_id": experience.id})
+    assert document_response.json() == response.json()
+    assert document_response.headers["etag"] == response.headers["etag"]
+
+
+def test_unapproved_experience_not_found(client: TestClient, db: Session, experience: Experience):
+    experience.status = ExperienceStatus.approval_pending
+    db.query(ExperienceDocument).filter(ExperienceDocument.experience_id == experience.id).delete()
+    db.commit()
+
+    response = client.get("/api/v1/experience", params={"experience_id": experience.id})
+    assert response.status_code == 400
@@ -0,0 +1,37 @@
+from app.utility.geo import GeoIndex
+
+# a line of points 1 km apart heading north from (12.9, 77.6), one degree of latitude is ~111.2 km
+POINTS_PER_KM = 1 / 111.195
+
+
+def get_index(no_of_points: int) -> GeoIndex:
+    return GeoIndex(
+        ids=list(range(no_of_points)),
+        latitudes=[12.9 + i * POINTS_PER_KM for i in range(no_of_points)],
+        longitudes=[77.6] * no_of_points,
+    )
+
+
+def test_query_radius_nearest_first():
+    results = get_index(100).query_radius(12.9, 77.6, 10.5)
+    assert [point_id for point_id, _ in results] == list(range(11))
+    assert abs(results[10][1] - 10) < 0.01
+
+
+def test_query_radius_limit():
+    results = get_index(1000).query_radius(12.9, 77.6, 500, limit=5)
+    assert [point_id for point_id, _ in results] == [0, 1, 2, 3, 4]
+
+
+def test_query_radius_limit_applies_after_allowed_ids():
+    # the allowed points are not among the 5 nearest overall but are within radius
+    allowed_ids = {50, 60, 70, 900}
+    results = get_index(1000).query_radius(12.9, 77.6, 100, limit=5, allowed_ids=allowed_ids)
+    assert [point_id for point_id, _ in results] == [50, 60, 70]
+
+    results = get_index(1000).query_radius(12.9, 77.6, 100, limit=2, allowed_ids=allowed_ids)
+    assert [point_id for point_id, _ in results] == [50, 60]
+
+
+def test_query_radius_no_allowed_ids():
+    assert get_index(100).query_radius(12.9, 77.6, 50, limit=5, allowed_ids=[]) == []
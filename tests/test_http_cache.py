@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import Request, Response
+
+from app.utility.http_cache import (
+    check_conditional_request,
+    get_conditional_raw_response,
+    get_content_etag,
+    is_not_modified,
+)
+
+ETAG = 'W/"abc"'
+LAST_MODIFIED = datetime(2023, 3, 14, 10, 30, 15, 250000, tzinfo=timezone.utc)
+LAST_MODIFIED_HTTP_DATE = "Tue, 14 Mar 2023 10:30:15 GMT"
+
+
+def get_request(**headers: str) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+@pytest.mark.parametrize("if_none_match, not_modified", [
+    ('W/"abc"', True),
+    # weak comparison, a strong tag matches the weak one
+    ('"abc"', True),
+    ('"xyz"', False),
+    ('"xyz", W/"abc"', True),
+    ('"xyz",W/"abc" ', True),
+    ('"xyz", "uvw"', False),
+    ("*", True),
+    ('"ab"', False),
+])
+def test_if_none_match(if_none_match: str, not_modified: bool):
+    assert is_not_modified(get_request(if_none_match=if_none_match), ETAG, None) is not_modified
+
+
+def test_if_none_match_without_etag():
+    assert not is_not_modified(get_request(if_none_match="*"), None, LAST_MODIFIED)
+
+
+@pytest.mark.parametrize("if_modified_since, not_modified", [
+    # same second, http dates have no fractions
+    (LAST_MODIFIED_HTTP_DATE, True),
+    ("Tue, 14 Mar 2023 10:30:16 GMT", True),
+    ("Tue, 14 Mar 2023 10:30:14 GMT", False),
+    ("Tuesday, 14-Mar-23 10:30:15 GMT", True),
+    ("not a date", False),
+])
+def test_if_modified_since(if_modified_since: str, not_modified: bool):
+    assert is_not_modified(get_request(if_modified_since=if_modified_since), ETAG, LAST_MODIFIED) is not_modified
+
+
+def test_if_modified_since_without_last_modified():
+    assert not is_not_modified(get_request(if_modified_since=LAST_MODIFIED_HTTP_DATE), ETAG, None)
+
+
+def test_if_none_match_precedes_if_modified_since():
+    later = (LAST_MODIFIED + timedelta(days=1)).strftime("%a, %d %b %Y %H:%M:%S GMT")
+    changed = get_request(if_none_match='"xyz"', if_modified_since=later)
+    unchanged = get_request(if_none_match=ETAG, if_modified_since="Mon, 01 Jan 2001 00:00:00 GMT")
+
+    assert not is_not_modified(changed, ETAG, LAST_MODIFIED)
+    assert is_not_modified(unchanged, ETAG, LAST_MODIFIED)
+
+
+def test_no_validators():
+    assert not is_not_modified(get_request(), ETAG, LAST_MODIFIED)
+
+
+def test_check_conditional_request():
+    response = Response()
+    assert check_conditional_request(get_request(), response, ETAG, LAST_MODIFIED, max_age=60) is None
+    assert response.headers["etag"] == ETAG
+    assert response.headers["last-modified"] == LAST_MODIFIED_HTTP_DATE
+    assert response.headers["cache-control"] == "public, max-age=60, must-revalidate"
+
+    not_modified = check_conditional_request(get_request(if_none_match=ETAG), Response(), ETAG, LAST_MODIFIED)
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == ETAG
+
+
+def test_conditional_raw_response():
+    body = b'{"id": 1}'
+    response = get_conditional_raw_response(get_request(), Response(body))
+    assert response.status_code == 200
+    assert response.headers["etag"] == get_content_etag(body)
+
+    response = get_conditional_raw_response(get_request(if_none_match=get_content_etag(body)), Response(body))
+    assert response.status_code == 304
+    assert response.body == b""
@@ -0,0 +1,27 @@
+import json
+import os
+import subprocess
+import sys
+
+# importing the app should stay cheap for worker boot and test collection: engines, drivers and
+# AWS clients are created on first use
+IMPORT_TIME_BUDGET_SECONDS = 3.0
+LAZY_MODULES = ("boto3", "botocore", "psycopg2")
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_APP = """
+import json, sys, time
+start_time = time.perf_counter()
+import app.main
+print(json.dumps({"seconds": time.perf_counter() - start_time, "modules": sorted(sys.modules)}))
+"""
+
+
+def test_import_time_budget():
+    # a fresh interpreter, modules imported by other tests are cached in this one
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_APP], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.splitlines()[-1])
+    assert result["seconds"] < IMPORT_TIME_BUDGET_SECONDS
+    assert [module for module in LAZY_MODULES if module in result["modules"]] == []
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import text
+
+from app.dependencies.db import db_engine_provider
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_SCHEMA = "migrate_test"
+MIGRATOR_TIMEOUT_SECONDS = 60
+# the first migrator builds the index concurrently while the second waits for the migration lock
+TEST_MIGRATIONS = {
+    "0001_create_item.sql": "CREATE TABLE item (id serial PRIMARY KEY, name varchar(100));\n",
+    "0002_index_item_name.sql": (
+        "-- migrate: no-transaction\n"
+        "SELECT pg_sleep(2);\n"
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS item_name_idx ON item (name);\n"
+    ),
+}
+
+
+@pytest.fixture
+def test_schema(database: None):
+    """ empty schema the migrators of a test run in, dropped afterwards """
+    with db_engine_provider.get().begin() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {TEST_SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {TEST_SCHEMA}"))
+    try:
+        yield TEST_SCHEMA
+    finally:
+        with db_engine_provider.get().begin() as connection:
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {TEST_SCHEMA} CASCADE"))
+
+
+def test_concurrent_migrators(tmp_path, test_schema: str):
+    migrations_dir = tmp_path / "sql_scripts"
+    migrations_dir.mkdir()
+    for file_name, sql in TEST_MIGRATIONS.items():
+        (migrations_dir / file_name).write_text(sql)
+    env = {**os.environ, "PYTHONPATH": ROOT_DIR, "PGOPTIONS": f"-c search_path={test_schema}"}
+
+    migrators = [
+        subprocess.Popen(
+            [sys.executable, "-m", "app.migrate"], cwd=tmp_path, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        for _ in range(2)
+    ]
+    try:
+        for migrator in migrators:
+            _, stderr = migrator.communicate(timeout=MIGRATOR_TIMEOUT_SECONDS)
+            assert migrator.returncode == 0, stderr
+    finally:
+        for migrator in migrators:
+            migrator.kill()
+
+    with db_engine_provider.get().connect() as connection:
+        versions = connection.execute(text(f"SELECT version FROM {test_schema}.schema_migration ORDER BY 1"))
+        assert [version for version, in versions] == [1, 2]
+        index_valid = connection.execute(text(
+            "SELECT indisvalid FROM pg_index WHERE indexrelid = :index_name ::regclass"
+        ), {"index_name": f"{test_schema}.item_name_idx"}).scalar()
+        assert index_valid
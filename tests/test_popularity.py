@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import pytest
+import pytz
+from redis.exceptions import ConnectionError
+
+from app.controller.api_v1.experience import popularity
+from app.controller.api_v1.experience.popularity import (
+    get_popular_experience_ids,
+    get_popularity_key,
+    rebuild_popularity_rankings,
+    record_experience_booking,
+)
+
+CATEGORY_ID = 3
+CITY = "Bengaluru"
+
+
+class RebuildSession:
+    """ stands in for the session in rebuild_popularity_rankings, a booking is recorded while its query runs """
+
+    def __init__(self, rows, concurrent_booking=None):
+        self.rows = rows
+        self.concurrent_booking = concurrent_booking
+
+    def query(self, *entities):
+        return self
+
+    def join(self, *args):
+        return self
+
+    def filter(self, *criteria):
+        return self
+
+    def group_by(self, *clauses):
+        return self
+
+    def all(self):
+        if self.concurrent_booking:
+            record_experience_booking(**self.concurrent_booking)
+        return self.rows
+
+
+def get_ranking(fake_redis, key: str):
+    return [int(experience_id) for experience_id in fake_redis.zrevrange(key, 0, -1)]
+
+
+def test_rebuild_ranks_by_score(fake_redis):
+    rebuild_popularity_rankings(RebuildSession([(1, CATEGORY_ID, CITY, 2.0), (2, CATEGORY_ID, CITY, 5.0)]))
+
+    assert get_popular_experience_ids(None, None, 10) == [2, 1]
+    assert get_popular_experience_ids(CATEGORY_ID, CITY, 1) == [2]
+    assert not fake_redis.keys("*" + popularity.REBUILD_SUFFIX) + fake_redis.keys("*" + popularity.DELTA_SUFFIX)
+
+
+def test_rebuild_keeps_bookings_recorded_meanwhile(fake_redis):
+    concurrent_booking = {
+        "experience_id": 9,
+        "category_id": 4,
+        "venue_city": "Pune",
+        "confirmation_time": datetime.now(tz=pytz.utc),
+    }
+    rebuild_popularity_rankings(RebuildSession([(1, CATEGORY_ID, CITY, 2.0)], concurrent_booking))
+
+    assert get_ranking(fake_redis, get_popularity_key()) == [1, 9]
+    # scored on the new epoch, as the rebuilt scores
+    assert fake_redis.zscore(get_popularity_key(), 9) == pytest.approx(1, rel=1e-3)
+    # rankings only the booking recorded meanwhile is part of
+    assert get_ranking(fake_redis, get_popularity_key(category_id=4, city="Pune")) == [9]
+    assert fake_redis.get(popularity.REBUILD_EPOCH_KEY) is None
+    assert fake_redis.smembers(popularity.DELTA_KEYS_KEY) == set()
+    assert get_popularity_key(category_id=4) in fake_redis.smembers(popularity.RANKING_KEYS_KEY)
+
+
+def test_rebuild_drops_stale_rankings(fake_redis):
+    record_experience_booking(5, 8, "Goa", datetime.now(tz=pytz.utc))
+    rebuild_popularity_rankings(RebuildSession([(1, CATEGORY_ID, CITY, 2.0)]))
+
+    assert get_ranking(fake_redis, get_popularity_key()) == [1]
+    assert not fake_redis.exists(get_popularity_key(city="Goa"))
+
+
+def test_rebuild_clears_deltas_of_crashed_rebuild(fake_redis):
+    popularity.start_rebuild(0)
+    record_experience_booking(5, CATEGORY_ID, CITY, datetime.now(tz=pytz.utc))
+    fake_redis.delete(popularity.REBUILD_EPOCH_KEY)
+    rebuild_popularity_rankings(RebuildSession([(1, CATEGORY_ID, CITY, 2.0)]))
+
+    assert get_ranking(fake_redis, get_popularity_key()) == [1]
+
+
+def test_popular_ids_without_redis(monkeypatch, fake_redis):
+    def zrevrange(*args, **kwargs):
+        raise ConnectionError("Connection refused")
+
+    monkeypatch.setattr(popularity.redis_client, "zrevrange", zrevrange)
+    assert get_popular_experience_ids(None, None, 10) == []
+
+
+@pytest.mark.parametrize("category_id, city", [(None, None), (CATEGORY_ID, None), (None, CITY)])
+def test_recorded_booking_ranked(fake_redis, category_id, city):
+    record_experience_booking(1, CATEGORY_ID, CITY, datetime.now(tz=pytz.utc))
+    assert get_popular_experience_ids(category_id, city, 10) == [1]
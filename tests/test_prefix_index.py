@@ -0,0 +1,79 @@
+from app.utility.prefix_index import MAX_TERM_LENGTH, PrefixIndex
+
+LABELS = [
+    (1, "Pottery Workshop"),
+    (2, "Photography Basics"),
+    (3, "Photography Walk in the Old Town"),
+    (4, "Weekend Pottery"),
+    (5, "Salsa"),
+]
+
+
+def get_keys(results):
+    return [key for key, _ in results]
+
+
+def test_search_normalizes_case_and_spaces():
+    index = PrefixIndex(LABELS)
+
+    assert index.search("  POTTERY   work", 10) == [(1, "Pottery Workshop")]
+    assert get_keys(index.search("Sal", 10)) == [5]
+
+
+def test_whole_label_matches_first():
+    index = PrefixIndex(LABELS)
+
+    assert get_keys(index.search("pottery", 10)) == [1, 4]
+    assert get_keys(index.search("work", 10)) == [1]
+    assert index.search("ttery", 10) == []
+
+
+def test_queries_longer_than_terms_verified_against_label():
+    index = PrefixIndex(LABELS)
+    assert len("photography ") == MAX_TERM_LENGTH
+
+    assert sorted(get_keys(index.search("photography", 10))) == [2, 3]
+    assert get_keys(index.search("photography ", 10)) in ([2, 3], [3, 2])
+    assert get_keys(index.search("photography b", 10)) == [2]
+    assert get_keys(index.search("photography walk in", 10)) == [3]
+    assert index.search("photography x", 10) == []
+    assert get_keys(index.search("walk in the old", 10)) == [3]
+
+
+def test_only_first_words_indexed():
+    index = PrefixIndex(LABELS)
+
+    # fourth word of the label is indexed, fifth is not
+    assert get_keys(index.search("the old", 10)) == [3]
+    assert index.search("old town", 10) == []
+
+
+def test_limit():
+    index = PrefixIndex((key, f"Yoga class {key}") for key in range(10))
+
+    assert len(index.search("yoga", 3)) == 3
+    assert len(index.search("class", 4)) == 4
+    assert len(index.search("yoga", 20)) == 10
+
+
+def test_upsert_and_remove():
+    index = PrefixIndex(LABELS)
+
+    index.upsert(5, "Tango")
+    index.upsert(6, "Salsa Night")
+    index.remove(1)
+    index.remove(99)
+
+    assert get_keys(index.search("salsa", 10)) == [6]
+    assert get_keys(index.search("tango", 10)) == [5]
+    assert get_keys(index.search("pottery", 10)) == [4]
+    assert index.search("workshop", 10) == []
+    assert len(index) == 5
+
+
+def test_blank_labels_and_queries():
+    index = PrefixIndex([(1, "  "), (2, "Salsa")])
+    index.upsert(2, "")
+
+    assert len(index) == 0
+    assert index.search("   ", 10) == []
@@ -0,0 +1,29 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.dependencies.query_stats import assert_query_budget, track_queries
+from app.models.experience import Experience
+
+
+def test_endpoint_within_query_budget(client: TestClient, experience: Experience):
+    # experience detail is one lookup of its document
+    with assert_query_budget(1) as stats:
+        response = client.get("/api/v1/experience", params={"experience_id": experience.id})
+    assert response.status_code == 200
+    assert stats.count == 1
+
+
+def test_endpoint_over_query_budget(client: TestClient, experience: Experience):
+    with pytest.raises(AssertionError, match="queries executed, budget is 1"):
+        with assert_query_budget(1):
+            client.get("/api/v1/experience", params={"experience_id": experience.id})
+            client.get("/api/v1/experience", params={"experience_id": experience.id})
+
+
+def test_requests_add_their_queries_to_tracked_queries(client: TestClient, experience: Experience):
+    with track_queries() as stats:
+        response = client.get("/api/v1/experience/host/all", params={"host_id": experience.host_id})
+    assert response.status_code == 200
+    assert stats.count >= 2
+    # the request's own count is in its Server-Timing header
+    assert f'desc="{stats.count} queries"' in response.headers["server-timing"]
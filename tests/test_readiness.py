@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+
+from app.config import config
+from app.controller.api_v1.healthcheck import utils
+from app.controller.api_v1.healthcheck.utils import ReadinessCheck
+
+TIMEOUT_SECONDS = 0.2
+
+
+@pytest.fixture
+def hung_database(monkeypatch: pytest.MonkeyPatch) -> threading.Event:
+    """ database checks hang until the returned event is set, redis is reachable """
+    release = threading.Event()
+
+    def check_database(engine, engine_options):
+        release.wait()
+        return {"ok": True, "pool_usage": 0.0}
+
+    monkeypatch.setattr(config, "READINESS_TIMEOUT_SECONDS", TIMEOUT_SECONDS)
+    monkeypatch.setattr(config, "READINESS_CACHE_SECONDS", 0)
+    monkeypatch.setattr(utils, "check_database", check_database)
+    monkeypatch.setattr(utils, "check_redis", lambda: {"ok": True})
+    yield release
+    release.set()
+
+
+def test_hung_database_check_times_out(hung_database: threading.Event):
+    start_time = time.monotonic()
+    result = ReadinessCheck().get_result()
+    assert time.monotonic() - start_time < TIMEOUT_SECONDS * 3
+    assert result["ready"] is False
+    assert result["primary"] == {"ok": False, "error": "timeout"}
+    assert result["redis"] == {"ok": True}
+
+
+def test_ready_again_once_hung_check_returns(hung_database: threading.Event):
+    readiness_check = ReadinessCheck()
+    assert readiness_check.get_result()["ready"] is False
+    # the hung checks are not started again while they run
+    assert readiness_check.get_result()["ready"] is False
+    hung_database.set()
+    time.sleep(0.05)
+    assert readiness_check.get_result()["ready"] is True
+
+
+def test_probe_during_long_check_is_not_ready(monkeypatch: pytest.MonkeyPatch):
+    # a probe finding the check running for longer than the timeout does not get the previous result
+    release = threading.Event()
+    monkeypatch.setattr(config, "READINESS_TIMEOUT_SECONDS", TIMEOUT_SECONDS)
+    monkeypatch.setattr(config, "READINESS_CACHE_SECONDS", 0)
+    monkeypatch.setattr(utils, "check_database", lambda engine, engine_options: {"ok": True, "pool_usage": 0.0})
+    monkeypatch.setattr(utils, "check_redis", lambda: {"ok": True})
+    readiness_check = ReadinessCheck()
+    assert readiness_check.get_result()["ready"] is True
+
+    monkeypatch.setattr(utils, "wait", lambda futures, timeout: release.wait())
+    probe = threading.Thread(target=readiness_check.get_result)
+    probe.start()
+    try:
+        time.sleep(TIMEOUT_SECONDS / 4)
+        assert readiness_check.get_result()["ready"] is True
+        time.sleep(TIMEOUT_SECONDS)
+        assert readiness_check.get_result() == {"ready": False, "error": "check timed out"}
+    finally:
+        release.set()
+        probe.join()
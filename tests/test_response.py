@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Optional
+
+import orjson
+import pytest
+from pydantic import BaseModel
+
+from app.models.category import Category, CategoryType
+from app.models.experience import Experience, ExperienceSlot
+from app.utility.response import CustomJSONResponse, dumps_json
+
+START_TIME = datetime(2023, 3, 14, 10, 30, tzinfo=timezone.utc)
+
+
+class Price(BaseModel):
+    amount: Decimal
+    currency: Optional[str] = None
+
+
+def test_dumps_native_and_fallback_types():
+    content = {
+        "price": Price(amount=Decimal("499.50"), currency="INR"),
+        "amount": Decimal("10.25"),
+        "tags": {"outdoor"},
+        "start_time": START_TIME,
+        "type": CategoryType.experience,
+    }
+
+    assert orjson.loads(dumps_json(content)) == {
+        "price": {"amount": 499.5, "currency": "INR"},
+        "amount": 10.25,
+        "tags": ["outdoor"],
+        "start_time": "2023-03-14T10:30:00+00:00",
+        "type": "experience",
+    }
+
+
+def test_dumps_mapped_instances_columns():
+    category = Category(id=3, type=CategoryType.experience, name="Workshops")
+    slot = ExperienceSlot(id=7, start_time=START_TIME, remaining_guest_limit=4)
+    experience = Experience(id=5, title="Pottery", price_per_guest=Decimal("500.00"), category=category, slots=[slot])
+
+    assert orjson.loads(dumps_json(experience)) == {"id": 5, "title": "Pottery", "price_per_guest": 500.0}
+    assert orjson.loads(dumps_json([slot])) == [
+        {"id": 7, "start_time": "2023-03-14T10:30:00+00:00", "remaining_guest_limit": 4}
+    ]
+
+
+def test_dumps_serialized_json():
+    assert dumps_json(b'{"id":1}') == b'{"id":1}'
+    assert dumps_json([b'{"id":1}', b'{"id":2}']) == b'[{"id":1},{"id":2}]'
+
+
+def test_unknown_type_not_serialized():
+    with pytest.raises(TypeError):
+        dumps_json({"value": object()})
+
+
+def test_custom_json_response_envelope():
+    assert CustomJSONResponse([1, 2]).body == b'{"data":[1,2],"successful":true}'
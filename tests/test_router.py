@@ -0,0 +1,60 @@
+import orjson
+import pytest
+
+from app.utility import router
+from app.utility.router import REDACTED, get_loggable_body, redact
+
+
+@pytest.mark.parametrize("value", [
+    "s3cret",
+    ["s3cret", "other-s3cret"],
+    {"current": "s3cret", "new": {"value": "other-s3cret"}},
+    12345,
+])
+def test_json_values_redacted(value):
+    body = orjson.dumps({"email_id": "user@example.com", "password": value, "profile": {"api_token": value}})
+
+    redacted = redact(body.decode())
+
+    assert "s3cret" not in redacted and "12345" not in redacted
+    assert orjson.loads(redacted) == {
+        "email_id": "user@example.com",
+        "password": REDACTED,
+        "profile": {"api_token": REDACTED},
+    }
+
+
+def test_json_list_redacted():
+    body = '[{"otp": "4321", "phone_no": "9999999999"}, {"otp": ["4321"]}]'
+
+    assert orjson.loads(redact(body)) == [{"otp": REDACTED, "phone_no": "9999999999"}, {"otp": REDACTED}]
+
+
+@pytest.mark.parametrize("text", [
+    '{"password": "s3cret", "email_id": "user@exa',
+    '{"password": ["s3cret", "other-s3cret"], "email_id": "user@exa',
+    '{"token": {"value": "s3cret"}, "email_id": "user@exa',
+    '{"Authorization": s3cret, "email_id": "user@exa',
+])
+def test_invalid_json_redacted(text):
+    redacted = redact(text)
+
+    assert "s3cret" not in redacted
+    assert redacted.endswith('"email_id": "user@exa')
+
+
+def test_form_and_query_redacted():
+    redacted = redact("username=user&password=s3cret&new_password=x")
+
+    assert redacted == f"username=user&password={REDACTED}&new_password={REDACTED}"
+    assert redact("otp=4321") == f"otp={REDACTED}"
+
+
+def test_loggable_body_truncated(monkeypatch):
+    monkeypatch.setattr(router.config, "REQUEST_LOG_MAX_BODY_BYTES", 30)
+    body = b'{"password": ["s3cret", "other-s3cret"], "email_id": "user@example.com"}'
+
+    text = get_loggable_body(body)
+
+    assert "s3cret" not in text
+    assert text.endswith(f"... ({len(body)} bytes)")
@@ -0,0 +1,120 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.controller.api_v1.experience import similarity
+from app.controller.api_v1.experience.similarity import (
+    get_co_booking_vectors,
+    get_similar_experience_matrix,
+    get_similar_experience_ids,
+    rebuild_similar_experiences,
+)
+from app.models.experience import ExperienceMode
+
+
+def get_distinct_cities(no_of_experiences: int) -> np.ndarray:
+    # unknown cities, which never match
+    return -np.arange(1, no_of_experiences + 1)
+
+
+def test_neighbours_best_first_without_self():
+    # the score of two experiences of category 1 is the product of their features
+    category_ids = np.array([1, 1, 1, 1, 1, 2])
+    features = np.array([[1], [2], [3], [4], [5], [10]], dtype=np.float32)
+
+    neighbours = get_similar_experience_matrix(category_ids, get_distinct_cities(6), features, top_k=3)
+
+    assert neighbours.tolist() == [
+        [4, 3, 2],
+        [4, 3, 2],
+        [4, 3, 1],
+        [4, 2, 1],
+        [3, 2, 1],
+        # alone in its category
+        [-1, -1, -1],
+    ]
+
+
+def test_neighbours_padded_in_small_category():
+    category_ids = np.array([1, 1, 1])
+    features = np.array([[1], [2], [3]], dtype=np.float32)
+
+    neighbours = get_similar_experience_matrix(category_ids, get_distinct_cities(3), features, top_k=4)
+
+    assert neighbours.tolist() == [[2, 1, -1, -1], [2, 0, -1, -1], [1, 0, -1, -1]]
+
+
+def test_neighbours_same_across_block_boundaries(monkeypatch):
+    rng = np.random.default_rng(seed=1)
+    category_ids = rng.integers(0, 3, size=50)
+    city_ids = rng.integers(0, 4, size=50)
+    features = rng.random((50, 8), dtype=np.float32)
+    expected = get_similar_experience_matrix(category_ids, city_ids, features, top_k=5)
+
+    for block_size in (1, 3, 7):
+        monkeypatch.setattr(similarity, "BLOCK_SIZE", block_size)
+        assert (get_similar_experience_matrix(category_ids, city_ids, features, top_k=5) == expected).all()
+
+
+def test_same_city_preferred():
+    category_ids = np.array([1, 1, 1])
+    features = np.array([[1], [1], [1]], dtype=np.float32)
+
+    neighbours = get_similar_experience_matrix(category_ids, np.array([0, 1, 0]), features, top_k=2)
+
+    assert neighbours[0].tolist() == [2, 1]
+    assert neighbours[2].tolist() == [0, 1]
+
+
+def test_co_booking_vectors():
+    # experiences 0 and 1 have the same customers, 2 other ones, 3 no bookings
+    experience_index = np.array([0, 0, 0, 1, 1, 1, 2, 2, 2])
+    customer_index = np.array([0, 1, 2, 0, 1, 2, 3, 4, 5])
+
+    vectors = get_co_booking_vectors(experience_index, customer_index, no_of_experiences=4)
+
+    assert vectors[0] @ vectors[1] == pytest.approx(1)
+    assert abs(vectors[0] @ vectors[2]) < 0.5
+    assert not vectors[3].any()
+
+
+class SimilaritySession:
+    """ stands in for the session in rebuild_similar_experiences: experiences, then co-bookings """
+
+    def __init__(self, experiences, co_bookings):
+        self.results = [experiences, co_bookings]
+
+    def query(self, *entities):
+        return self
+
+    def join(self, *args):
+        return self
+
+    def filter(self, *criteria):
+        return self
+
+    def order_by(self, *clauses):
+        return self
+
+    def distinct(self):
+        return self
+
+    def all(self):
+        return self.results.pop(0)
+
+
+def test_rebuild_similar_experiences(fake_redis):
+    experiences = [
+        SimpleNamespace(id=experience_id, category_id=category_id, venue_city="Pune",
+                        mode=ExperienceMode.physical, price_per_guest=500)
+        for experience_id, category_id in [(11, 1), (12, 1), (13, 1), (14, 2)]
+    ]
+    # 11 and 13 are booked by the same customers, 12 by others, bookings of unknown experience 99 are ignored
+    co_bookings = [(11, 1), (11, 2), (13, 1), (13, 2), (12, 3), (99, 1)]
+
+    assert rebuild_similar_experiences(SimilaritySession(experiences, co_bookings)) == 3
+
+    assert get_similar_experience_ids(11, limit=10) == [13, 12]
+    assert get_similar_experience_ids(13, limit=1) == [11]
+    assert get_similar_experience_ids(14, limit=10) == []